@@ -0,0 +1,274 @@
+"""##########################################################
+A contraction hierarchy for answering many shortest-path queries on a fixed,
+undirected weighted graph (a WeightedListGraph or MapGraph).
+
+Preprocessing contracts the nodes one at a time, least important first. When a
+node is contracted, a "shortcut" edge is added between two of its remaining
+neighbors whenever the path through the node is the only shortest path between
+them (checked with a small "witness" search). Every node then keeps only its
+edges to more important nodes, the "upward" graph. Because the graph is
+undirected, the downward graph is the same set of edges followed the other
+way, so one upward adjacency table serves both sides of the query.
+
+A query runs Dijkstra's algorithm upward from both the start and the goal and
+takes the best node where the two searches meet. Shortcuts remember the node
+they skip over, so the path can be unpacked back into original edges.
+"""
+
+import heapq
+import time
+
+
+class ContractionHierarchy(object):
+    """Preprocesses a weighted graph into a contraction hierarchy, and answers shortest-path queries on it.
+    The results have the same form as a UCSMacAdvisor search with a BestFirstSearchSolver: the cost of the
+    cheapest path, and the list of nodes on the path before the goal."""
+
+    def __init__(self, graph, witnessLimit = 500):
+        """Takes in a weighted graph, and optionally the maximum number of nodes a witness search may settle
+        before giving up and adding the shortcut anyway (which is always safe, just not minimal). It runs the
+        preprocessing right away, and records how long it took and how many shortcuts it added."""
+        self.numNodes = graph.getSize()
+        self.witnessLimit = witnessLimit
+        self.rank = [None] * self.numNodes
+        self.upEdges = [{} for i in range(self.numNodes)]
+        self.numShortcuts = 0
+        self.queryCount = 0
+        self.totalQueryTime = 0.0
+        self.lastQueryTime = 0.0
+        self.lastNodesVisited = 0
+        startTime = time.perf_counter()
+        self._preprocess(graph)
+        self.preprocessTime = time.perf_counter() - startTime
+
+
+    # -------------------------
+    # Preprocessing
+
+    def _preprocess(self, graph):
+        """Builds the working adjacency table (one dictionary per node mapping each neighbor to the weight of
+        the edge and the node the edge skips over, None for an original edge), then contracts the nodes in
+        order of importance, using lazy updates of the importance values."""
+        self.adj = [{} for i in range(self.numNodes)]
+        for node in range(self.numNodes):
+            for (neigh, wgt) in graph.getNeighbors(node):
+                if neigh != node:
+                    self._addEdge(node, neigh, wgt, None)
+        self.deletedNeighbors = [0] * self.numNodes
+        heap = [(self._importance(node), node) for node in range(self.numNodes)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            (priority, node) = heapq.heappop(heap)
+            newPriority = self._importance(node)
+            if heap and newPriority > heap[0][0]:
+                # importance went up since it was queued, so try again later
+                heapq.heappush(heap, (newPriority, node))
+                continue
+            self._contract(node)
+            self.rank[node] = order
+            order += 1
+        self.adj = None
+
+
+    def _addEdge(self, node1, node2, wgt, middle):
+        """Adds an undirected edge to the working adjacency table, unless a cheaper one is already there"""
+        old = self.adj[node1].get(node2)
+        if old is None or wgt < old[0]:
+            self.adj[node1][node2] = (wgt, middle)
+            self.adj[node2][node1] = (wgt, middle)
+
+
+    def _importance(self, node):
+        """Computes how important a node is, for choosing the contraction order: the edge difference (the
+        number of shortcuts contracting it would add, minus the number of edges it would remove) plus the number
+        of its neighbors that have already been contracted, which spreads contraction evenly over the graph."""
+        numShortcuts = len(self._findShortcuts(node))
+        return numShortcuts - len(self.adj[node]) + self.deletedNeighbors[node]
+
+
+    def _findShortcuts(self, node):
+        """Returns the list of shortcuts, as (neighbor1, neighbor2, weight) tuples, that are needed to contract
+        the node: one for each pair of its neighbors whose only shortest path goes through it."""
+        neighs = list(self.adj[node].items())
+        shortcuts = []
+        for i in range(len(neighs)):
+            (source, (sourceWgt, sourceMid)) = neighs[i]
+            targets = {}
+            for j in range(i + 1, len(neighs)):
+                (target, (targetWgt, targetMid)) = neighs[j]
+                targets[target] = sourceWgt + targetWgt
+            if not targets:
+                continue
+            witnessDists = self._witnessSearch(source, node, targets)
+            for target in targets:
+                if witnessDists.get(target, float('inf')) > targets[target]:
+                    shortcuts.append((source, target, targets[target]))
+        return shortcuts
+
+
+    def _witnessSearch(self, source, avoidNode, targets):
+        """Runs a limited Dijkstra search from source in the uncontracted graph, never passing through avoidNode.
+        It stops once every target has been settled, once distances pass the longest path through avoidNode,
+        or once witnessLimit nodes have been settled. It returns the distances found."""
+        maxDist = max(targets.values())
+        dists = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        remaining = len(targets)
+        while heap and settled < self.witnessLimit:
+            (dist, node) = heapq.heappop(heap)
+            if dist > dists[node]:
+                continue
+            if dist > maxDist:
+                break
+            settled += 1
+            if node in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for (neigh, (wgt, middle)) in self.adj[node].items():
+                if neigh == avoidNode:
+                    continue
+                newDist = dist + wgt
+                if newDist < dists.get(neigh, float('inf')):
+                    dists[neigh] = newDist
+                    heapq.heappush(heap, (newDist, neigh))
+        return dists
+
+
+    def _contract(self, node):
+        """Contracts the node: adds the shortcuts it needs, moves its edges into the upward graph (all of its
+        remaining neighbors are more important than it), and removes it from the working adjacency table."""
+        for (node1, node2, wgt) in self._findShortcuts(node):
+            old = self.adj[node1].get(node2)
+            if old is None or wgt < old[0]:
+                if old is None:
+                    self.numShortcuts += 1
+                self._addEdge(node1, node2, wgt, node)
+        for (neigh, edgeInfo) in self.adj[node].items():
+            self.upEdges[node][neigh] = edgeInfo
+            del self.adj[neigh][node]
+            self.deletedNeighbors[neigh] += 1
+        self.adj[node] = {}
+
+
+    # -------------------------
+    # Queries
+
+    def query(self, startNode, goalNode):
+        """Takes in start and goal nodes, and returns a tuple containing the cost of the cheapest path
+        between them and the list of nodes on that path before the goal. If there is no path, it returns
+        (None, None). The time the query took is recorded."""
+        startTime = time.perf_counter()
+        result = self._runQuery(startNode, goalNode)
+        self.lastQueryTime = time.perf_counter() - startTime
+        self.totalQueryTime += self.lastQueryTime
+        self.queryCount += 1
+        return result
+
+
+    def _runQuery(self, startNode, goalNode):
+        """A private helper that does the work of a query: upward Dijkstra searches from both ends, run in
+        turn until neither can improve on the best meeting node, followed by unpacking of the path."""
+        inf = float('inf')
+        dists = [{startNode: 0}, {goalNode: 0}]
+        preds = [{startNode: None}, {goalNode: None}]
+        heaps = [[(0, startNode)], [(0, goalNode)]]
+        bestCost = inf
+        meetNode = None
+        if startNode == goalNode:
+            bestCost = 0
+            meetNode = startNode
+        self.lastNodesVisited = 0
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side]:
+                side = 1 - side
+            (dist, node) = heapq.heappop(heaps[side])
+            if dist >= bestCost:
+                # nothing left on this side can lead to a better path
+                heaps[side] = []
+                side = 1 - side
+                continue
+            if dist > dists[side][node]:
+                continue
+            self.lastNodesVisited += 1
+            otherDist = dists[1 - side].get(node)
+            if otherDist is not None and dist + otherDist < bestCost:
+                bestCost = dist + otherDist
+                meetNode = node
+            for (neigh, (wgt, middle)) in self.upEdges[node].items():
+                newDist = dist + wgt
+                if newDist < dists[side].get(neigh, inf):
+                    dists[side][neigh] = newDist
+                    preds[side][neigh] = node
+                    heapq.heappush(heaps[side], (newDist, neigh))
+            side = 1 - side
+        if meetNode is None:
+            return (None, None)
+        forwardNodes = self._chainTo(meetNode, preds[0])
+        backwardNodes = self._chainTo(meetNode, preds[1])
+        backwardNodes.reverse()
+        nodes = forwardNodes + backwardNodes[1:]
+        fullPath = [startNode]
+        for i in range(len(nodes) - 1):
+            fullPath.extend(self._unpackEdge(nodes[i], nodes[i + 1]))
+        return (bestCost, fullPath[:-1])
+
+
+    def _chainTo(self, node, preds):
+        """Follows the predecessor table back from the node to the node the search started from, and returns
+        the list of nodes in order from the search's start to the node"""
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = preds[node]
+        chain.reverse()
+        return chain
+
+
+    def _unpackEdge(self, node1, node2):
+        """Expands an edge of the hierarchy, which may be a shortcut, into the original edges it stands for.
+        Returns the list of nodes after node1 along the way, ending with node2."""
+        result = []
+        stack = [(node1, node2)]
+        while stack:
+            (fromNode, toNode) = stack.pop()
+            if self.rank[fromNode] < self.rank[toNode]:
+                middle = self.upEdges[fromNode][toNode][1]
+            else:
+                middle = self.upEdges[toNode][fromNode][1]
+            if middle is None:
+                result.append(toNode)
+            else:
+                # push the second half first, so the first half is unpacked first
+                stack.append((middle, toNode))
+                stack.append((fromNode, middle))
+        return result
+
+
+    # -------------------------
+    # Statistics
+
+    def getPreprocessTime(self):
+        """Returns the number of seconds the preprocessing took"""
+        return self.preprocessTime
+
+    def getNumShortcuts(self):
+        """Returns the number of shortcut edges added during preprocessing"""
+        return self.numShortcuts
+
+    def getLastQueryTime(self):
+        """Returns the number of seconds the most recent query took"""
+        return self.lastQueryTime
+
+    def getAverageQueryTime(self):
+        """Returns the average number of seconds per query so far, or 0 if there have been none"""
+        if self.queryCount == 0:
+            return 0.0
+        return self.totalQueryTime / self.queryCount
+
+    def getNodesVisited(self):
+        """Returns the number of nodes settled by the most recent query"""
+        return self.lastNodesVisited
@@ -11,6 +11,14 @@ and weighted subclasses"""
 # Improvements that could be made...
 # -- Make invalid indices raise an exception instead of returning -1...
 
+import heapq
+from array import array
+from bisect import bisect_left
+
+# Graphs with up to this many nodes get a dense matrix from makeMatrixGraph, larger ones a sparse one.
+# A dense weighted matrix of this size takes 36 MB.
+DENSE_NODE_LIMIT = 2000
+
 
 
 
@@ -28,8 +36,14 @@ class Graph:
         matrix classes should be instantiated, not this one."""
 
         self._numVerts = n
-        self._nodeData = nodeData
+        self._nodeData = list(nodeData)
         self._lastNode = len(self._nodeData)
+        # A reverse index from node data to the first node holding it, so findNode does not have to
+        # scan the list. Data that cannot be hashed is left out of it and counted instead.
+        self._dataIndex = {}
+        self._numUnindexed = 0
+        for node in range(self._lastNode):
+            self._indexNodeData(node)
 
 
     # -------------------------
@@ -46,9 +60,19 @@ class Graph:
             self._nodeData.append(nodeData)
             nodePos = self._lastNode
             self._lastNode += 1
+            self._indexNodeData(nodePos)
             return nodePos
 
 
+    def _indexNodeData(self, node):
+        """A private helper, adds a node's data to the reverse index, unless an earlier node
+        already has equal data, or the data cannot be hashed"""
+        try:
+            self._dataIndex.setdefault(self._nodeData[node], node)
+        except TypeError:
+            self._numUnindexed += 1
+
+
 
     def addEdge(self, node1, node2):
         """Takes two node indices and adds an edge between them.
@@ -90,7 +114,17 @@ class Graph:
 
     def findNode(self, data):
         """Takes in a data item, and returns the node index that contains
-        the data item, if it exists.  Otherwise it raises an exception"""
+        the data item, if it exists.  Otherwise it raises an exception.
+        It uses the reverse index, unless the data cannot be hashed or some node's data
+        could not be put in the index, in which case it scans the node data instead."""
+        if self._numUnindexed == 0:
+            try:
+                node = self._dataIndex.get(data)
+                if node is None:
+                    raise NoSuchNodeException(data)
+                return node
+            except TypeError:
+                pass
         if data in self._nodeData:
             return self._nodeData.index(data)
         else:
@@ -295,6 +329,12 @@ class WeightedListGraph(ListGraph):
         ListGraph.__init__(self, n, nodeData)
         self.goalNode = None
         self.pathPreds = {}
+        # Alongside each adjacency list, a dictionary from neighbor to weight, so that looking up
+        # an edge does not scan the list. If an edge is added twice, the first weight is kept,
+        # as it is the one a scan of the list would find.
+        self._weightMaps = []
+        for i in range(n):
+            self._weightMaps.append({})
 
 
     def addEdge(self, node1, node2, weight):
@@ -303,6 +343,8 @@ class WeightedListGraph(ListGraph):
         if node1 < self._numVerts and node2 < self._numVerts:
             self._adjList[node1].append((node2, weight))
             self._adjList[node2].append((node1, weight))
+            self._weightMaps[node1].setdefault(node2, weight)
+            self._weightMaps[node2].setdefault(node1, weight)
             return True
         elif node1 >= self._numVerts:
             raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
@@ -315,14 +357,12 @@ class WeightedListGraph(ListGraph):
         True if the edge was there and was removed, and False if no edge was there.
         This assumes undirected edges."""
         if node1 < self._numVerts and node2 < self._numVerts:
-            lst1 = self._adjList[node1]
-            lst2 = self._adjList[node2]
-            for (n, w) in lst1:
-                if node2 == n:
-                    lst1.remove((n, w))
-            for (n, w) in lst2:
-                if node1 == n:
-                    lst2.remove((n, w))
+            if node2 not in self._weightMaps[node1]:
+                return False
+            del self._weightMaps[node1][node2]
+            self._weightMaps[node2].pop(node1, None)
+            self._adjList[node1] = [(n, w) for (n, w) in self._adjList[node1] if n != node2]
+            self._adjList[node2] = [(n, w) for (n, w) in self._adjList[node2] if n != node1]
             return True
         elif node1 >= self._numVerts:
             raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
@@ -334,10 +374,7 @@ class WeightedListGraph(ListGraph):
         """Takes in two node indices, and returns True if they are connected
         and False if they are not."""
         if node1 < self._numVerts and node2 < self._numVerts:
-            for (n, w) in self._adjList[node1]:
-                if n == node2:
-                    return True
-            return False
+            return node2 in self._weightMaps[node1]
         elif node1 >= self._numVerts:
             raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
         else:
@@ -348,16 +385,77 @@ class WeightedListGraph(ListGraph):
         """Takes in two node indices, and returns the weight between them,
         or None if they are not connected."""
         if node1 < self._numVerts and node2 < self._numVerts:
-            for (n, w) in self._adjList[node1]:
-                if n == node2:
-                    return w
-            return None
+            return self._weightMaps[node1].get(node2)
         elif node1 >= self._numVerts:
             raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
         else:
             raise NodeIndexOutOfRangeException(0, self._numVerts, node2)
 
 
+    def dijkstra(self, startNode):
+        """Takes in a node index and runs Dijkstra's algorithm from it over the whole graph. It returns
+        two lists indexed by node: the cost of the cheapest path from startNode to each node (infinity
+        if the node cannot be reached), and the predecessor of each node on that path (None for the
+        start node and for unreachable nodes). Weights must not be negative."""
+        if startNode >= self._numVerts:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, startNode)
+        dists = [float('inf')] * self._numVerts
+        preds = [None] * self._numVerts
+        dists[startNode] = 0
+        heap = [(0, startNode)]
+        while heap:
+            (dist, node) = heapq.heappop(heap)
+            if dist > dists[node]:
+                # a stale entry, the node was already reached more cheaply
+                continue
+            for (neigh, wgt) in self._adjList[node]:
+                newDist = dist + wgt
+                if newDist < dists[neigh]:
+                    dists[neigh] = newDist
+                    preds[neigh] = node
+                    heapq.heappush(heap, (newDist, neigh))
+        return dists, preds
+
+
+    def freeze(self):
+        """Returns a CSRGraph with the same nodes, node data, and edges as this graph. The CSRGraph cannot
+        be changed, but it takes much less memory, and looking up neighbors and weights is faster."""
+        return CSRGraph(self._numVerts, list(self._nodeData), *self._buildCSRArrays())
+
+
+    def _buildCSRArrays(self):
+        """A private helper, returns the offset, target, and weight arrays of the compressed sparse row form of
+        the adjacency lists. Each node's edges are sorted by target, keeping the order of edges to the same target."""
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for node in range(self._numVerts):
+            edges = sorted(self._adjList[node], key=lambda edge: edge[0])
+            targets.extend([neigh for (neigh, wgt) in edges])
+            weights.extend([wgt for (neigh, wgt) in edges])
+            offsets.append(len(targets))
+        return offsets, targets, weights
+
+
+    def loadEdgeArrays(self, offsets, targets, weights):
+        """Takes in every node's edges in compressed sparse row form: an offset for each node into the
+        target and weight sequences, plus one more offset where the last node's edges end. It replaces all
+        the edges of the graph at once, keeping each node's edges in the order given. Since the graph is
+        undirected, each edge must be listed from both of its ends. This is much faster than adding the
+        edges one at a time, for loading a graph that was stored in this form."""
+        if len(targets) > 0:
+            for neigh in (min(targets), max(targets)):
+                if not 0 <= neigh < self._numVerts:
+                    raise NodeIndexOutOfRangeException(0, self._numVerts, neigh)
+        for node in range(self._numVerts):
+            start = offsets[node]
+            end = offsets[node + 1]
+            edges = list(zip(targets[start:end], weights[start:end]))
+            self._adjList[node] = edges
+            # built from the reversed list, so that if an edge is listed twice the first weight is kept
+            self._weightMaps[node] = dict(reversed(edges))
+
+
 
 
 
@@ -414,6 +512,455 @@ class WeightedMatrixGraph(MatrixGraph):
             raise NodeIndexOutOfRangeException(0, self._numVerts, node2)
 
 
+# ======================================================================
+class DenseMatrixGraph(Graph):
+    """A graph with vertices and edges, stored as an adjacency matrix packed into one flat bytearray,
+    row after row, with a 1 for each edge. This takes one byte per entry instead of a list slot, and
+    finding a node's neighbors searches its row with bytearray.find, which skips over the empty
+    entries in C, so the Python work is proportional to the number of neighbors, not the number of
+    nodes. Suited to graphs with up to a few thousand nodes; see SparseMatrixGraph for larger ones."""
+
+    def __init__(self, n, nodeData = []):
+        """Takes the number of nodes in the graph, and optionally
+        a list of data to associate with each node.  The matrix starts
+        with no edges."""
+        Graph.__init__(self, n, nodeData)
+        self._edgeFlags = bytearray(n * n)
+
+
+    def addEdge(self, node1, node2):
+        """Takes two node indices and adds an edge between them.  This
+        class represents undirected graphs"""
+        return self._setEdge(node1, node2, 1)
+
+
+    def addEdges(self, edges):
+        """Takes in a sequence of (node1, node2) pairs and adds an edge for each one. This is
+        quicker than calling addEdge for each pair, when building a graph all at once."""
+        self._setEdges(list(edges))
+
+
+    def _setEdge(self, node1, node2, flag):
+        """A private helper, sets both entries for the edge to the flag, 1 for an edge and 0 for none"""
+        n = self._numVerts
+        if node1 < n and node2 < n:
+            self._edgeFlags[node1 * n + node2] = flag
+            self._edgeFlags[node2 * n + node1] = flag
+            return True
+        elif node1 >= n:
+            raise NodeIndexOutOfRangeException(0, n, node1)
+        else:
+            raise NodeIndexOutOfRangeException(0, n, node2)
+
+
+    def _setEdges(self, edges):
+        """A private helper, checks the node indices of all the edges, given as sequences that start
+        with the two nodes, and then marks each edge in both entries"""
+        n = self._numVerts
+        for edge in edges:
+            if edge[0] >= n or edge[1] >= n:
+                raise NodeIndexOutOfRangeException(0, n, max(edge[0], edge[1]))
+        flags = self._edgeFlags
+        for edge in edges:
+            flags[edge[0] * n + edge[1]] = 1
+            flags[edge[1] * n + edge[0]] = 1
+
+
+    def removeEdge(self, node1, node2):
+        """Takes two nodes and removes any edge between them.  It returns
+        True if the edge was there and was removed, and False if no edge was there.
+        This assumes undirected edges."""
+        if self.areNeighbors(node1, node2):
+            self._setEdge(node1, node2, 0)
+            return True
+        return False
+
+
+    def getNeighbors(self, node):
+        """Takes in a node index, and returns a list of the indices of
+        the nodes neighbors."""
+        if node < self._numVerts:
+            rowStart = node * self._numVerts
+            return [pos - rowStart for pos in self._edgePositions(node)]
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node)
+
+
+    def _edgePositions(self, node):
+        """A private helper, returns the positions in the flat matrix of the edges in the node's row"""
+        rowStart = node * self._numVerts
+        rowEnd = rowStart + self._numVerts
+        flags = self._edgeFlags
+        positions = []
+        pos = flags.find(1, rowStart, rowEnd)
+        while pos >= 0:
+            positions.append(pos)
+            pos = flags.find(1, pos + 1, rowEnd)
+        return positions
+
+
+    def areNeighbors(self, node1, node2):
+        """Takes in two node indices, and returns True if they are connected
+        and False if they are not.  If the node indices are not valid, it raises an
+        exception."""
+        n = self._numVerts
+        if node1 < n and node2 < n:
+            return self._edgeFlags[node1 * n + node2] == 1
+        elif node1 >= n:
+            raise NodeIndexOutOfRangeException(0, n, node1)
+        else:
+            raise NodeIndexOutOfRangeException(0, n, node2)
+
+
+
+# ======================================================================
+class DenseWeightedMatrixGraph(DenseMatrixGraph):
+    """A weighted graph, stored as a DenseMatrixGraph's edge flags plus a flat array of floats
+    holding the weights. Weights are stored as floats, and may be negative."""
+
+    def __init__(self, n, nodeData = []):
+        """Takes the number of nodes in the graph, and optionally
+        a list of data to associate with each node."""
+        DenseMatrixGraph.__init__(self, n, nodeData)
+        self._weights = array('d', bytes(8 * n * n))
+
+
+    def addEdge(self, node1, node2, weight):
+        """Takes two node indices and a weight value, and adds an edge
+        between them.  This class represents undirected graphs"""
+        self._setEdge(node1, node2, 1)
+        n = self._numVerts
+        self._weights[node1 * n + node2] = weight
+        self._weights[node2 * n + node1] = weight
+        return True
+
+
+    def addEdges(self, edges):
+        """Takes in a sequence of (node1, node2, weight) triples and adds an edge for each one"""
+        edges = list(edges)
+        self._setEdges(edges)
+        n = self._numVerts
+        weights = self._weights
+        for (node1, node2, weight) in edges:
+            weights[node1 * n + node2] = weight
+            weights[node2 * n + node1] = weight
+
+
+    def getNeighbors(self, node):
+        """Takes in a node index, and returns a list of the indices of
+        the node's neighbors, and the weights on the edges to those neighbors."""
+        if node < self._numVerts:
+            rowStart = node * self._numVerts
+            weights = self._weights
+            return [(pos - rowStart, weights[pos]) for pos in self._edgePositions(node)]
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node)
+
+
+    def getWeight(self, node1, node2):
+        """Takes in two node indices, and returns the weight on the edge
+        between them, or None if there is no edge.  If the node indices are not
+        valid, it raises an exception."""
+        if self.areNeighbors(node1, node2):
+            return self._weights[node1 * self._numVerts + node2]
+        return None
+
+
+
+# ======================================================================
+class SparseMatrixGraph(Graph):
+    """A graph with vertices and edges, stored as a sparse adjacency matrix: each row keeps only its
+    entries that hold an edge, in a dictionary from column to value. Memory grows with the number of
+    edges rather than the square of the number of nodes, and finding a node's neighbors does not look
+    at the other nodes at all."""
+
+    def __init__(self, n, nodeData = []):
+        """Takes the number of nodes in the graph, and optionally
+        a list of data to associate with each node.  The matrix starts
+        with no edges."""
+        Graph.__init__(self, n, nodeData)
+        self._rows = []
+        for i in range(n):
+            self._rows.append({})
+
+
+    def addEdge(self, node1, node2):
+        """Takes two node indices and adds an edge between them.  This
+        class represents undirected graphs"""
+        return self._setEdge(node1, node2, True)
+
+
+    def addEdges(self, edges):
+        """Takes in a sequence of (node1, node2) pairs and adds an edge for each one. This is
+        quicker than calling addEdge for each pair, when building a graph all at once."""
+        self._setEdges([(node1, node2, True) for (node1, node2) in edges])
+
+
+    def _setEdge(self, node1, node2, value):
+        """A private helper, stores the value in both entries for the edge"""
+        if node1 < self._numVerts and node2 < self._numVerts:
+            self._rows[node1][node2] = value
+            self._rows[node2][node1] = value
+            return True
+        elif node1 >= self._numVerts:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node2)
+
+
+    def _setEdges(self, triples):
+        """A private helper, checks all the node indices first, and then stores the value of
+        each (node1, node2, value) triple in both entries for its edge"""
+        n = self._numVerts
+        triples = list(triples)
+        for (node1, node2, value) in triples:
+            if node1 >= n or node2 >= n:
+                raise NodeIndexOutOfRangeException(0, n, max(node1, node2))
+        rows = self._rows
+        for (node1, node2, value) in triples:
+            rows[node1][node2] = value
+            rows[node2][node1] = value
+
+
+    def removeEdge(self, node1, node2):
+        """Takes two nodes and removes any edge between them.  It returns
+        True if the edge was there and was removed, and False if no edge was there.
+        This assumes undirected edges."""
+        if self.areNeighbors(node1, node2):
+            del self._rows[node1][node2]
+            self._rows[node2].pop(node1, None)
+            return True
+        return False
+
+
+    def getNeighbors(self, node):
+        """Takes in a node index, and returns a list of the indices of
+        the nodes neighbors."""
+        if node < self._numVerts:
+            return list(self._rows[node])
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node)
+
+
+    def areNeighbors(self, node1, node2):
+        """Takes in two node indices, and returns True if they are connected
+        and False if they are not.  If the node indices are not valid, it raises an
+        exception."""
+        if node1 < self._numVerts and node2 < self._numVerts:
+            return node2 in self._rows[node1]
+        elif node1 >= self._numVerts:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node2)
+
+
+
+# ======================================================================
+class SparseWeightedMatrixGraph(SparseMatrixGraph):
+    """A weighted graph, stored in a SparseMatrixGraph's dictionary rows. Once it is built, freeze
+    turns it into a CSRGraph, the compressed sparse row form."""
+
+    def addEdge(self, node1, node2, weight):
+        """Takes two node indices and a weight value, and adds an edge
+        between them.  This class represents undirected graphs"""
+        return self._setEdge(node1, node2, weight)
+
+
+    def addEdges(self, edges):
+        """Takes in a sequence of (node1, node2, weight) triples and adds an edge for each one"""
+        self._setEdges(edges)
+
+
+    def getNeighbors(self, node):
+        """Takes in a node index, and returns a list of the indices of
+        the node's neighbors, and the weights on the edges to those neighbors."""
+        if node < self._numVerts:
+            return list(self._rows[node].items())
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node)
+
+
+    def getWeight(self, node1, node2):
+        """Takes in two node indices, and returns the weight on the edge
+        between them, or None if there is no edge.  If the node indices are not
+        valid, it raises an exception."""
+        if self.areNeighbors(node1, node2):
+            return self._rows[node1][node2]
+        return None
+
+
+    def freeze(self):
+        """Returns a CSRGraph with the same nodes, node data, and edges as this graph"""
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for row in self._rows:
+            cols = sorted(row)
+            targets.extend(cols)
+            weights.extend([row[col] for col in cols])
+            offsets.append(len(targets))
+        return CSRGraph(self._numVerts, list(self._nodeData), offsets, targets, weights)
+
+
+
+def makeMatrixGraph(n, nodeData = [], weighted = False):
+    """Takes the number of nodes, optionally a list of node data, and whether the graph is weighted, and
+    returns an empty array-backed matrix graph: a dense one if there are at most DENSE_NODE_LIMIT nodes,
+    and a sparse one otherwise."""
+    if n <= DENSE_NODE_LIMIT:
+        if weighted:
+            return DenseWeightedMatrixGraph(n, nodeData)
+        return DenseMatrixGraph(n, nodeData)
+    elif weighted:
+        return SparseWeightedMatrixGraph(n, nodeData)
+    return SparseMatrixGraph(n, nodeData)
+
+
+
+# ======================================================================
+class CSRGraph(Graph):
+    """A weighted, undirected graph that can no longer be changed, stored in compressed sparse row (CSR) form:
+    one array holds the targets of all the edges, grouped by the node they leave, another holds their weights,
+    and a third holds, for each node, the offset where its group starts. This takes a few bytes per edge instead
+    of a tuple per edge, and the arrays can be shared with forked processes without being copied.
+    It answers the same questions as a WeightedListGraph, so the search advisors can use either one. Build one
+    by calling freeze on a WeightedListGraph."""
+
+    def __init__(self, n, nodeData, offsets, targets, weights):
+        """Takes the number of nodes, the list of node data, and the three CSR arrays. The edges of each
+        node must be sorted by their targets."""
+        Graph.__init__(self, n, nodeData)
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._targetView = memoryview(targets)
+        self._weightView = memoryview(weights)
+
+
+    def __getstate__(self):
+        """Memoryviews cannot be pickled, so this leaves them out when the graph is pickled,
+        for instance to send it to another process"""
+        state = self.__dict__.copy()
+        del state['_targetView']
+        del state['_weightView']
+        return state
+
+
+    def __setstate__(self, state):
+        """Rebuilds the memoryviews when an unpickled graph is set up"""
+        self.__dict__.update(state)
+        self._targetView = memoryview(self._targets)
+        self._weightView = memoryview(self._weights)
+
+
+    def addEdge(self, node1, node2, weight):
+        """A CSRGraph cannot be changed, so this raises an exception"""
+        raise FrozenGraphException()
+
+
+    def removeEdge(self, node1, node2):
+        """A CSRGraph cannot be changed, so this raises an exception"""
+        raise FrozenGraphException()
+
+
+    def getNumEdges(self):
+        """Returns the number of edges, counting each undirected edge once from each end"""
+        return len(self._targets)
+
+
+    def getNeighbors(self, node):
+        """Takes in a node index, and returns a NeighborView of the node's neighbors and the weights on the
+        edges to them. The view reads straight from the graph's arrays rather than copying them."""
+        if node < self._numVerts:
+            start = self._offsets[node]
+            end = self._offsets[node + 1]
+            return NeighborView(self._targetView[start:end], self._weightView[start:end])
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node)
+
+
+    def areNeighbors(self, node1, node2):
+        """Takes in two node indices, and returns True if they are connected
+        and False if they are not."""
+        return self.getWeight(node1, node2) is not None
+
+
+    def getWeight(self, node1, node2):
+        """Takes in two node indices, and returns the weight between them, or None if they are not connected.
+        Since each node's edges are sorted, this is a binary search."""
+        if node1 < self._numVerts and node2 < self._numVerts:
+            end = self._offsets[node1 + 1]
+            pos = bisect_left(self._targets, node2, self._offsets[node1], end)
+            if pos < end and self._targets[pos] == node2:
+                return self._weights[pos]
+            return None
+        elif node1 >= self._numVerts:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node1)
+        else:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, node2)
+
+
+    def dijkstra(self, startNode):
+        """Takes in a node index and runs Dijkstra's algorithm from it, just like WeightedListGraph.dijkstra,
+        returning the list of path costs and the list of predecessors."""
+        if startNode >= self._numVerts:
+            raise NodeIndexOutOfRangeException(0, self._numVerts, startNode)
+        offsets = self._offsets
+        targets = self._targets
+        weights = self._weights
+        dists = [float('inf')] * self._numVerts
+        preds = [None] * self._numVerts
+        dists[startNode] = 0
+        heap = [(0, startNode)]
+        while heap:
+            (dist, node) = heapq.heappop(heap)
+            if dist > dists[node]:
+                # a stale entry, the node was already reached more cheaply
+                continue
+            for pos in range(offsets[node], offsets[node + 1]):
+                neigh = targets[pos]
+                newDist = dist + weights[pos]
+                if newDist < dists[neigh]:
+                    dists[neigh] = newDist
+                    preds[neigh] = node
+                    heapq.heappush(heap, (newDist, neigh))
+        return dists, preds
+
+
+
+class NeighborView(object):
+    """A read-only sequence of (neighbor, weight) pairs for one node of a CSRGraph. It holds slices of the
+    graph's arrays, so making one does not copy the edges. Use getNodes or getWeights to get the neighbors or
+    the weights on their own."""
+
+    __slots__ = ('targets', 'weights')
+
+    def __init__(self, targets, weights):
+        self.targets = targets
+        self.weights = weights
+
+    def getNodes(self):
+        """Returns a read-only sequence of the neighbor indices"""
+        return self.targets
+
+    def getWeights(self):
+        """Returns a read-only sequence of the weights, in the same order as the neighbors"""
+        return self.weights
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __getitem__(self, index):
+        return (self.targets[index], self.weights[index])
+
+    def __iter__(self):
+        return zip(self.targets, self.weights)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+
 # ======================================================================
 class NodeIndexOutOfRangeException(Exception):
     """A special exception for catching when a node reference is invalid"""
@@ -439,6 +986,15 @@ class GraphFullException(Exception):
         return s
 
 
+class FrozenGraphException(Exception):
+    """A special exception for catching when a graph that cannot be changed,
+    like a CSRGraph, is asked to add or remove an edge"""
+
+    def __str__(self):
+        s = "This graph is frozen: edges may not be added or removed"
+        return s
+
+
 class NoSuchNodeException(Exception):
     """A special exception for catching when node data is input that
     doesn't match any node data in the graph"""
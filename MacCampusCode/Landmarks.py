@@ -0,0 +1,170 @@
+"""##########################################################
+Landmark distance tables for the ALT heuristic (A*, Landmarks, and the
+Triangle inequality).
+
+A handful of landmark vertices are chosen, and Dijkstra's algorithm is run
+from each of them. For any landmark L, the triangle inequality says that
+|d(L, v) - d(L, goal)| <= d(v, goal) on an undirected graph, so the largest
+such difference over all the landmarks is an admissible (and consistent)
+estimate of the distance from v to the goal. On a campus map, where paths
+wind around buildings, this is usually much closer to the true distance
+than the straight-line distance.
+
+The tables can be written to a file next to the graph file, so that they
+only need to be computed once.
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+
+class LandmarkTable(object):
+    """Holds the landmark vertices chosen for a graph, and one table of shortest-path distances from
+    each landmark to every vertex, stored as a compact array of floats."""
+
+    def __init__(self, graph, numLandmarks = 8, landmarks = None, distTables = None):
+        """Takes in a weighted graph (one with a dijkstra method, like a WeightedListGraph or MapGraph), and
+        the number of landmarks to use. It chooses the landmarks and computes the distance tables. The last
+        two optional inputs are used when the landmarks and tables have been read from a file instead."""
+        self.numNodes = graph.getSize()
+        if landmarks is None:
+            self.landmarks = []
+            self.distTables = []
+            self._chooseLandmarks(graph, min(numLandmarks, self.numNodes))
+        else:
+            self.landmarks = landmarks
+            self.distTables = distTables
+
+
+    def _chooseLandmarks(self, graph, numLandmarks):
+        """Chooses landmarks by farthest-point selection: the first is the vertex farthest from vertex 0,
+        and each later one is the vertex farthest from all the landmarks chosen so far. Vertices that no
+        landmark can reach count as infinitely far, so every connected piece of the graph gets a landmark
+        before any piece gets a second one."""
+        if numLandmarks == 0:
+            return
+        (firstDists, preds) = graph.dijkstra(0)
+        nextLandmark = self._farthestNode(firstDists, finiteOnly=True)
+        minDists = [float('inf')] * self.numNodes
+        while len(self.landmarks) < numLandmarks:
+            (dists, preds) = graph.dijkstra(nextLandmark)
+            self.landmarks.append(nextLandmark)
+            self.distTables.append(array('d', dists))
+            for node in range(self.numNodes):
+                if dists[node] < minDists[node]:
+                    minDists[node] = dists[node]
+            nextLandmark = self._farthestNode(minDists, finiteOnly=False)
+
+
+    def _farthestNode(self, dists, finiteOnly):
+        """Returns the node with the largest distance in the input list that is not already a landmark,
+        optionally skipping nodes whose distance is infinite."""
+        bestNode = None
+        bestDist = -1
+        for node in range(self.numNodes):
+            dist = dists[node]
+            if finiteOnly and dist == float('inf'):
+                continue
+            if dist > bestDist and node not in self.landmarks:
+                bestNode = node
+                bestDist = dist
+        return bestNode
+
+
+    def getLandmarks(self):
+        """Returns the list of landmark vertices"""
+        return self.landmarks
+
+
+    def heuristicDist(self, node1, node2):
+        """Estimates the distance between two nodes as the largest difference between their distances
+        to any landmark. Landmarks that cannot reach both nodes are skipped. This never overestimates the
+        true distance."""
+        best = 0
+        inf = float('inf')
+        for table in self.distTables:
+            dist1 = table[node1]
+            dist2 = table[node2]
+            if dist1 != inf and dist2 != inf:
+                diff = abs(dist1 - dist2)
+                if diff > best:
+                    best = diff
+        return best
+
+
+    def writeToFile(self, tableFile):
+        """Writes the landmarks and distance tables to a binary file: a header giving the number of nodes
+        and landmarks, the landmark vertices, and then each distance table."""
+        landmarkArray = array('l', self.landmarks)
+        tables = [array('d', table) for table in self.distTables]
+        if sys.byteorder == 'big':
+            landmarkArray.byteswap()
+            for table in tables:
+                table.byteswap()
+        with open(tableFile, 'wb') as filObj:
+            filObj.write(struct.pack(_HEADER_FORMAT, _MAGIC, landmarkArray.itemsize,
+                                     self.numNodes, len(self.landmarks)))
+            landmarkArray.tofile(filObj)
+            for table in tables:
+                table.tofile(filObj)
+
+
+_MAGIC = b'ALT1'
+_HEADER_FORMAT = '<4sIII'
+
+
+def readLandmarkFile(tableFile, graph):
+    """Takes in the name of a file written by LandmarkTable.writeToFile and the graph it was built for, and
+    returns the LandmarkTable stored in it. It returns None if the file is missing, or was written for a
+    graph with a different number of nodes."""
+    try:
+        filObj = open(tableFile, 'rb')
+    except OSError:
+        return None
+    with filObj:
+        header = filObj.read(struct.calcsize(_HEADER_FORMAT))
+        if len(header) != struct.calcsize(_HEADER_FORMAT):
+            return None
+        (magic, labelSize, numNodes, numLandmarks) = struct.unpack(_HEADER_FORMAT, header)
+        if magic != _MAGIC or numNodes != graph.getSize():
+            return None
+        landmarkArray = array('l')
+        if labelSize != landmarkArray.itemsize:
+            return None
+        try:
+            landmarkArray.fromfile(filObj, numLandmarks)
+            tables = []
+            for i in range(numLandmarks):
+                table = array('d')
+                table.fromfile(filObj, numNodes)
+                tables.append(table)
+        except EOFError:
+            return None
+    if sys.byteorder == 'big':
+        landmarkArray.byteswap()
+        for table in tables:
+            table.byteswap()
+    return LandmarkTable(graph, numLandmarks, list(landmarkArray), tables)
+
+
+def loadOrBuildLandmarks(graph, mapFile, numLandmarks = 8):
+    """Takes in a graph, the name of the file it was read from, and the number of landmarks. If a landmark
+    file for that map (same name with a .alt extension) exists, is newer than the map file, and has the right
+    number of landmarks, it is read in. Otherwise the table is built and written to that file for next time."""
+    tableFile = os.path.splitext(mapFile)[0] + ".alt"
+    try:
+        isFresh = os.path.getmtime(tableFile) >= os.path.getmtime(mapFile)
+    except OSError:
+        isFresh = False
+    if isFresh:
+        table = readLandmarkFile(tableFile, graph)
+        if table is not None and len(table.getLandmarks()) == min(numLandmarks, graph.getSize()):
+            return table
+    table = LandmarkTable(graph, numLandmarks)
+    try:
+        table.writeToFile(tableFile)
+    except OSError:
+        print("Could not write landmark file", tableFile)
+    return table
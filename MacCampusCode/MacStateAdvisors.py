@@ -6,31 +6,45 @@ class MacState(object):
     """This represents the state of a search on a graph.  It does not
     represent the entire graph, just the current location or vertex within the graph, and the
     series of vertices that have been traversed to get to this location.  That
-    is represented in the pathToMe instance variable inherited from the parent
-    class.  The cost is determined externally, by the task advisor.
+    is represented by a reference to the parent state, so that generating a state does not
+    copy the whole path. The path itself is only rebuilt when getPath is called.
+    The cost is determined externally, by the task advisor.
     NOTE: for many search algorithms, we need to store the state object in a set, and to be able to find equivalent
     states that may have different costs, but fundamentally refer to the same place in the map.
     Thus any state class you create MUST implement the __eq__ and __hash__ methods, which are used by Python's set
     data type. These methods should be based on the information about the location in the map. For this
     state, that means the row and column indices of the grid square this state represents."""
 
-    def __init__(self, label, path=None, cost=None):
+    def __init__(self, label, path=None, cost=None, parent=None):
         """Given the numerical label of the location of the current state, and optional path
-        and cost, initializes the state for the search"""
-        if path is None:
+        and cost, initializes the state for the search. Instead of a path, a state may be given
+        its parent state, in which case its path is the parent's path followed by the parent's label."""
+        if path is None and parent is None:
             self.pathToMe = []
         else:
             self.pathToMe = path
+        self.parent = parent
         self.myCost = cost
         self.label = label
 
     def setPath(self, newPath):
         """This is a method that Dijkstra's needs."""
         self.pathToMe = newPath
+        self.parent = None
 
     def getPath(self):
-        """Access the value of the pathToMe instance variable"""
-        return self.pathToMe
+        """Returns the list of vertex labels that leads to this state. If the state only knows its
+        parent, this walks up the parent references to the nearest state that has an explicit path,
+        and builds a new list from that path and the labels collected along the way."""
+        if self.pathToMe is not None:
+            return self.pathToMe
+        labels = []
+        state = self
+        while state.pathToMe is None:
+            state = state.parent
+            labels.append(state.label)
+        labels.reverse()
+        return state.pathToMe + labels
 
     def getCost(self):
         """Access the value of the myCost instance variable"""
@@ -57,7 +71,7 @@ class MacState(object):
         """To print this object, print the location number, followed by the
         path and cost"""
         strng = "Location #" + self.label
-        strng += "  " + str(self.pathToMe) + " " + str(self.myCost)
+        strng += "  " + str(self.getPath()) + " " + str(self.myCost)
         return strng
 
 
@@ -66,14 +80,14 @@ class AStarMacState(MacState):
     """This represents the state of a search on a graph.  It does not
 represent the graph, just the current location or vertex in the maze, and the
 series of vertices that have been traversed to get to this location.  That
-is represented in the pathToMe instance variable inherited from the parent
+is represented by the parent state inherited from the parent
 class.  The cost is determined externally."""
 
-    def __init__(self, label, path=None, costToHere=None, costToGoal=None):
-        """Given the row and column, the current path, and the two costs (cost so far and heuristic
-        cost to come, this creates a state/node for the search"""
+    def __init__(self, label, path=None, costToHere=None, costToGoal=None, parent=None):
+        """Given the row and column, the current path (or the parent state), and the two costs (cost so far
+        and heuristic cost to come, this creates a state/node for the search"""
 
-        MacState.__init__(self, label, path, costToHere + costToGoal)
+        MacState.__init__(self, label, path, costToHere + costToGoal, parent)
         self.costToHere = costToHere
         self.costToGoal = costToGoal
         self.myCost = self.costToHere + self.costToGoal
@@ -89,7 +103,7 @@ class.  The cost is determined externally."""
     def __str__(self):
         """Create a string for printing that contains the location number plus path and costs"""
         strng = "Location #" + self.label
-        strng += "  " + str(self.pathToMe) + " (" + str(self.costToHere)
+        strng += "  " + str(self.getPath()) + " (" + str(self.costToHere)
         strng += " + " + str(self.costToGoal) + ") = " + str(self.myCost)
         return strng
 
@@ -143,12 +157,10 @@ class MacTaskAdvisor(object):
 
     def _buildNeighborState(self, currState, neighLabel):
         """Given the current state and the location of the neighbor, this builds
-        a new state, computing the cost as appropriate for the class.
+        a new state, computing the cost as appropriate for the class. The new state refers back
+        to currState rather than copying its path.
         This will be overridden by most subclasses!"""
-        currLabel = currState.getLocation()
-        newPath = currState.getPath()[:]
-        newPath.append(currLabel)
-        return MacState(neighLabel, newPath)
+        return MacState(neighLabel, parent=currState)
 
 
 class UCSMacAdvisor(MacTaskAdvisor):
@@ -166,11 +178,9 @@ class UCSMacAdvisor(MacTaskAdvisor):
         a new state, computing the cost as appropriate for the class.
         In this case, the cost is the cost in currState plus the cost in the neighbor."""
         currLabel = currState.getLocation()
-        newPath = currState.getPath()[:]
-        newPath.append(currLabel)
         oldCost = currState.getCost()
         newCost = self.mac.getWeight(currLabel, neighLabel)
-        return MacState(neighLabel, newPath, oldCost + newCost)
+        return MacState(neighLabel, None, oldCost + newCost, currState)
 
 
 class AStarMacAdvisor(MacTaskAdvisor):
@@ -196,13 +206,35 @@ class AStarMacAdvisor(MacTaskAdvisor):
         new g = old g + new edge's weight,
         new h = distance to goal of new vertex"""
         currLabel = currState.getLocation()
-        newPath = currState.getPath()[:]
-        newPath.append(currLabel)
         newG = currState.getCostToHere() + self.mac.getWeight(currLabel, neighLabel)
         newH = self._calcDistToGoal(neighLabel)
-        return AStarMacState(neighLabel, newPath, newG, newH)
+        return AStarMacState(neighLabel, None, newG, newH, currState)
+
+    def heuristicToGoal(self, state):
+        """Returns the heuristic estimate of the distance from the location of the given state to the goal.
+        The bidirectional solver uses this to compute its potential function."""
+        return self._calcDistToGoal(state.getLocation())
 
     def _calcDistToGoal(self, vertexLabel):
         """Compute the distance to the goal using the standard Euclidean metric.  Compute
         the difference in x values and in y values, square each one, add them up, and take the square root"""
-        return self.mac.heuristicDist(vertexLabel, self.goal)
\ No newline at end of file
+        return self.mac.heuristicDist(vertexLabel, self.goal)
+
+
+class ALTMacAdvisor(AStarMacAdvisor):
+    """This class is a subclass of the AStarMacAdvisor. It estimates the distance to the goal using a
+    LandmarkTable (the ALT heuristic) as well as the straight-line distance, taking whichever is larger.
+    Both are admissible, so the larger one is too. It is intended to be paired with a BestFirstSearchSolver."""
+
+    def __init__(self, macMap, startLabel, goalLabel, landmarks):
+        """Given a map of a graph, the starting and goal locations, and a LandmarkTable built for that
+        graph, this initializes the variables that hold details of the problem"""
+        self.landmarks = landmarks
+        AStarMacAdvisor.__init__(self, macMap, startLabel, goalLabel)
+
+    def _calcDistToGoal(self, vertexLabel):
+        """Compute the distance to the goal as the larger of the landmark estimate and the straight-line
+        distance"""
+        landmarkDist = self.landmarks.heuristicDist(vertexLabel, self.goal)
+        straightDist = self.mac.heuristicDist(vertexLabel, self.goal)
+        return max(landmarkDist, straightDist)
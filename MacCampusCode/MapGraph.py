@@ -8,25 +8,36 @@ Susan Fox
 Spring 2014
 """
 
-from Graphs import WeightedListGraph
+from Graphs import WeightedListGraph, CSRGraph
+from array import array
+import hashlib
+import heapq
 import math
+import os
+import struct
+import sys
 
-class MapGraph(WeightedListGraph):
-    """The purpose of this subclass is to require the user to provide
-    the required qData for each node, which must be a coordinate pair,
-    either from some arbitrary global coordinate system, or based on GPS
-    values"""
+class MapGraphMixin(object):
+    """The parts of a map graph that depend only on the node locations and markers, shared by
+    MapGraph and CSRMapGraph so that the two cannot drift apart. A class using it must list it
+    before its graph base class, and call _initMapData once the node data has been stored."""
 
-    def __init__(self, n, nodeData):
-        """Takes the number of nodes in the graph, plus a list of
-        node qData.  The list MUST be the same length as the number of nodes,
-        and each value must be a pair of numbers giving the location in the world
-        of the related node.  If it is not, then an exception is raised."""
-        if len(nodeData) != n or (not self._goodNodeData(nodeData)):
+    def _initMapData(self):
+        """A private helper, sets up the marker dictionary and the spatial index over the nodes
+        that already have locations"""
+        self.markerMap = {}
+        self.spatialIndex = GridIndex(self._nodeData)
+
+
+    def addNodeData(self, nodeData):
+        """Takes a new node location, adds it to the next available node, and adds
+        it to the spatial index. It raises an exception if the location is not a pair
+        of numbers or if no node is available, and otherwise returns the node index."""
+        if not self._goodNodeData([nodeData]):
             raise(BadNodeDataException())
-        else:   
-            WeightedListGraph.__init__(self, n, nodeData)
-            self.markerMap = {}
+        node = super().addNodeData(nodeData)
+        self.spatialIndex.insert(node, nodeData)
+        return node
 
 
     def _goodNodeData(self, nodeData):
@@ -48,6 +59,62 @@ class MapGraph(WeightedListGraph):
         return True
 
 
+    def getMarkerInfo(self, node):
+        """Given a node, returns the marker qData, if any, or None if none."""
+        return self.markerMap.get(node, None)
+
+
+    def heuristicDist(self, node1, node2):
+        """Estimates the distance from any node to any other."""
+        return self._straightDist(node1, node2)
+    
+    
+    def _straightDist(self, node1, node2):
+        """For estimating the straightline distance between two points for short term"""
+        loc1 = self.getData(node1)
+        loc2 = self.getData(node2)
+
+        return math.hypot(loc1[0] - loc2[0], loc1[1] - loc2[1])
+
+
+    def findNearestNode(self, x, y):
+        """Takes in a location, and returns the node closest to it, or None if the graph has no nodes"""
+        return self.spatialIndex.nearest(x, y)
+
+
+    def findNearestNodes(self, x, y, k):
+        """Takes in a location and a count k, and returns a list of the k nodes closest to it, closest first"""
+        return self.spatialIndex.kNearest(x, y, k)
+
+
+    def findNodesWithin(self, x, y, radius):
+        """Takes in a location and a radius, and returns a list of the nodes no farther than the radius
+        from the location, closest first"""
+        return self.spatialIndex.withinRadius(x, y, radius)
+
+
+
+class MapGraph(MapGraphMixin, WeightedListGraph):
+    """The purpose of this subclass is to require the user to provide
+    the required qData for each node, which must be a coordinate pair,
+    either from some arbitrary global coordinate system, or based on GPS
+    values"""
+
+    def __init__(self, n, nodeData, checkData = True):
+        """Takes the number of nodes in the graph, plus a list of
+        node qData.  The list may not be longer than the number of nodes,
+        and each value must be a pair of numbers giving the location in the world
+        of the related node.  If it is not, then an exception is raised.
+        If the list is shorter, the remaining nodes get their locations later, from
+        addNodeData.  Checking every value can be skipped, by passing False for checkData,
+        when the data is known to be good, as when it is read back from a map cache file."""
+        if len(nodeData) > n or (checkData and not self._goodNodeData(nodeData)):
+            raise(BadNodeDataException())
+        else:   
+            WeightedListGraph.__init__(self, n, nodeData)
+            self._initMapData()
+
+
     def addEdge(self, node1, node2, weight = "default"):
         """takes two nodes and an optional weight and addes an edge
         to the graph.  If no weight is specified, then it uses the nodes' qData
@@ -64,23 +131,189 @@ class MapGraph(WeightedListGraph):
         self.markerMap[node] = markerData
 
 
-    def getMarkerInfo(self, node):
-        """Given a node, returns the marker qData, if any, or None if none."""
-        return self.markerMap.get(node, None)
+    def freeze(self):
+        """Returns a CSRMapGraph with the same nodes, locations, markers, and edges as this graph"""
+        frozen = CSRMapGraph(self._numVerts, list(self._nodeData), *self._buildCSRArrays())
+        frozen.markerMap = dict(self.markerMap)
+        return frozen
 
 
-    def heuristicDist(self, node1, node2):
-        """Estimates the distance from any node to any other."""
-        return self._straightDist(node1, node2)
-    
-    
-    def _straightDist(self, node1, node2):
-        """For estimating the straightline distance between two points for short term"""
-        loc1 = self.getData(node1)
-        loc2 = self.getData(node2)
 
-        return math.hypot(loc1[0] - loc2[0], loc1[1] - loc2[1])
-    
+class CSRMapGraph(MapGraphMixin, CSRGraph):
+    """A MapGraph that can no longer be changed, stored in compressed sparse row form. It has the
+    same marker information and straight-line distances as a MapGraph, so the A* advisors can use
+    either one. Build one by calling freeze on a MapGraph."""
+
+    def __init__(self, n, nodeData, offsets, targets, weights):
+        """Takes the number of nodes, the list of node locations, and the three CSR arrays"""
+        CSRGraph.__init__(self, n, nodeData, offsets, targets, weights)
+        self._initMapData()
+
+
+
+class GridIndex(object):
+    """A spatial index over node locations, for finding the nodes near a given location without looking at
+    every node. The plane is cut into square cells, and each cell that holds any nodes has a bucket listing
+    them. The cell size is chosen when the index is built so that there are about two nodes per cell, so a
+    query only has to look at the few cells around its location. Nodes added later are put in the bucket
+    for their cell, even if it lies outside the area the index was built for. Once twice as many nodes have
+    been added as the cell size was chosen for, the index is built again with a new cell size, so an index
+    that starts out empty, as in a MapGraph that gets its locations from addNodeData, stays quick."""
+
+    def __init__(self, locations):
+        """Takes in a list of (x, y) locations, where the location of node i is at index i, and
+        builds the index."""
+        self._build(list(enumerate(locations)))
+
+
+    def _build(self, entries):
+        """A private helper, takes in a list of (node, (x, y)) pairs, picks the cell size for them, and
+        fills the buckets with them"""
+        self.buckets = {}
+        self.numNodes = 0
+        self.sizedFor = len(entries)
+        self.cellSize = self._chooseCellSize([loc for (node, loc) in entries])
+        self.minCell = None
+        self.maxCell = None
+        for (node, loc) in entries:
+            self._addToBucket(node, loc)
+
+
+    def _chooseCellSize(self, locations):
+        """A private helper, picks a cell size that puts about two of the locations in each cell of
+        their bounding box. If the box has no area, it spreads them along its longer side instead."""
+        if len(locations) < 2:
+            return 1.0
+        xs = [loc[0] for loc in locations]
+        ys = [loc[1] for loc in locations]
+        width = max(xs) - min(xs)
+        height = max(ys) - min(ys)
+        if width > 0 and height > 0:
+            return math.sqrt(2 * width * height / len(locations))
+        elif width > 0 or height > 0:
+            return 2 * max(width, height) / len(locations)
+        return 1.0
+
+
+    def insert(self, node, loc):
+        """Takes in a node and its (x, y) location, and adds it to the index. If the index has doubled
+        in size since its cell size was chosen, it is built again."""
+        self._addToBucket(node, loc)
+        if self.numNodes >= 2 * max(self.sizedFor, 8):
+            entries = [(node, (x, y)) for bucket in self.buckets.values() for (node, x, y) in bucket]
+            self._build(entries)
+
+
+    def _addToBucket(self, node, loc):
+        """A private helper, adds a node and its (x, y) location to the bucket for its cell"""
+        (x, y) = loc
+        cell = self._cellOf(x, y)
+        self.buckets.setdefault(cell, []).append((node, x, y))
+        self.numNodes += 1
+        if self.minCell is None:
+            self.minCell = cell
+            self.maxCell = cell
+        else:
+            self.minCell = (min(self.minCell[0], cell[0]), min(self.minCell[1], cell[1]))
+            self.maxCell = (max(self.maxCell[0], cell[0]), max(self.maxCell[1], cell[1]))
+
+
+    def nearest(self, x, y):
+        """Takes in a location, and returns the node closest to it, or None if the index is empty"""
+        closest = self.kNearest(x, y, 1)
+        if closest == []:
+            return None
+        return closest[0]
+
+
+    def kNearest(self, x, y, k):
+        """Takes in a location and a count k, and returns a list of the k nodes closest to it (or all the
+        nodes, if there are fewer than k), closest first, with ties broken by node index. It looks at the
+        cells in square rings around the location's cell, working outward, and stops once every node not yet
+        seen must be farther away than the k closest found so far."""
+        if k <= 0 or self.numNodes == 0:
+            return []
+        (cellX, cellY) = self._cellOf(x, y)
+        # The rings that can hold nodes: none are nearer than the edge of the occupied cells, or farther
+        # than their far corner
+        firstRing = max(0, self.minCell[0] - cellX, cellX - self.maxCell[0],
+                        self.minCell[1] - cellY, cellY - self.maxCell[1])
+        lastRing = max(abs(cellX - self.minCell[0]), abs(cellX - self.maxCell[0]),
+                       abs(cellY - self.minCell[1]), abs(cellY - self.maxCell[1]))
+        best = []   # a heap of (-distance, -node), so the farthest of the k closest is on top
+        for ring in range(firstRing, lastRing + 1):
+            if 8 * ring > len(self.buckets):
+                # The ring has more cells than there are buckets (a few nodes are far from the rest),
+                # so it is quicker to go through the buckets, taking all those this ring or farther out
+                for (cell, bucket) in self.buckets.items():
+                    if max(abs(cell[0] - cellX), abs(cell[1] - cellY)) >= ring:
+                        self._addClosest(best, k, bucket, x, y)
+                break
+            for cell in self._ringCells(cellX, cellY, ring):
+                self._addClosest(best, k, self.buckets.get(cell, ()), x, y)
+            # The location is inside its own cell, so any node beyond this ring is more than
+            # ring cells away from it
+            if len(best) == k and -best[0][0] <= ring * self.cellSize:
+                break
+        best.sort(reverse=True)
+        return [-negNode for (negDist, negNode) in best]
+
+
+    def _addClosest(self, best, k, bucket, x, y):
+        """A private helper, adds the nodes of a bucket to the heap of the k closest nodes found so far,
+        keeping only the k closest"""
+        for (node, nodeX, nodeY) in bucket:
+            entry = (-math.hypot(nodeX - x, nodeY - y), -node)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+
+    def withinRadius(self, x, y, radius):
+        """Takes in a location and a radius, and returns a list of the nodes no farther than the radius
+        from the location, closest first, with ties broken by node index. It only looks at the cells
+        that overlap the square around the circle."""
+        if self.numNodes == 0 or radius < 0:
+            return []
+        (lowX, lowY) = self._cellOf(x - radius, y - radius)
+        (highX, highY) = self._cellOf(x + radius, y + radius)
+        (lowX, lowY) = (max(lowX, self.minCell[0]), max(lowY, self.minCell[1]))
+        (highX, highY) = (min(highX, self.maxCell[0]), min(highY, self.maxCell[1]))
+        if (highX - lowX + 1) * (highY - lowY + 1) > len(self.buckets):
+            # more cells than buckets, so go through the buckets instead
+            cells = [cell for cell in self.buckets if lowX <= cell[0] <= highX and lowY <= cell[1] <= highY]
+        else:
+            cells = [(cellX, cellY) for cellX in range(lowX, highX + 1) for cellY in range(lowY, highY + 1)]
+        found = []
+        for cell in cells:
+            for (node, nodeX, nodeY) in self.buckets.get(cell, ()):
+                dist = math.hypot(nodeX - x, nodeY - y)
+                if dist <= radius:
+                    found.append((dist, node))
+        found.sort()
+        return [node for (dist, node) in found]
+
+
+    def _cellOf(self, x, y):
+        """A private helper, returns the (column, row) of the cell containing the location"""
+        return (math.floor(x / self.cellSize), math.floor(y / self.cellSize))
+
+
+    def _ringCells(self, cellX, cellY, ring):
+        """A private helper, returns the cells on the square ring the given number of cells out from
+        the given cell; ring 0 is the cell itself."""
+        if ring == 0:
+            return [(cellX, cellY)]
+        cells = []
+        for dx in range(-ring, ring + 1):
+            cells.append((cellX + dx, cellY - ring))
+            cells.append((cellX + dx, cellY + ring))
+        for dy in range(-ring + 1, ring):
+            cells.append((cellX - ring, cellY + dy))
+            cells.append((cellX + ring, cellY + dy))
+        return cells
+
 
 
 class BadNodeDataException(Exception):
@@ -97,7 +330,45 @@ class BadNodeDataException(Exception):
 # Function for creating a MapGraph from a file of qData
 # TODO: Think about whether this should be part of MapGraph itself?
 
-def readMapFile(mapFile):
+def readMapFile(mapFile, useCache = True, frozen = False):
+    """Takes in a filename for a occupancy-grid map graph, and returns the map graph
+    it describes. Unless useCache is False, the parsed graph is kept in a binary cache
+    file next to the map file (same name with a .mgc extension), and later calls read
+    the cache instead of parsing the text, as long as the map file has not changed.
+    If frozen is True, it returns a CSRMapGraph instead of a MapGraph; from the cache,
+    that is built straight from the stored arrays, so it is the quickest to load."""
+    if not useCache:
+        graph = _parseMapFile(mapFile)
+    else:
+        cacheFile = os.path.splitext(mapFile)[0] + ".mgc"
+        try:
+            stats = os.stat(mapFile)
+        except OSError:
+            print("ERROR READING FILE, ABORTING")
+            return
+        cached = _readMapCache(cacheFile, mapFile, stats.st_size, stats.st_mtime_ns)
+        if cached is not None:
+            (arrays, cacheTime) = cached
+            if cacheTime != stats.st_mtime_ns:
+                # the cache was only accepted because the hash matched, so store the new time, or every
+                # later read would have to hash the map file again
+                try:
+                    _refreshMapCacheTime(cacheFile, stats.st_mtime_ns)
+                except OSError:
+                    print("Could not write map cache file", cacheFile)
+            return _graphFromArrays(arrays, frozen)
+        graph = _parseMapFile(mapFile)
+        if graph is not None:
+            try:
+                _writeMapCache(graph, cacheFile, stats.st_size, stats.st_mtime_ns, _hashFile(mapFile))
+            except OSError:
+                print("Could not write map cache file", cacheFile)
+    if graph is not None and frozen:
+        return graph.freeze()
+    return graph
+
+
+def _parseMapFile(mapFile):
     """Takes in a filename for a occupancy-grid map graph, and it reads
     in the qData from the file. It then generates the map appropriately."""
     try:
@@ -147,6 +418,9 @@ def readMapFile(mapFile):
             if row == numNodes:
                 # If reading nodes, and should be done, then go on
                 readingNodes = False
+                if len(allData) != numNodes:
+                    # a row was skipped, so some node has no location
+                    raise(BadNodeDataException())
                 graph = MapGraph(numNodes, allData)
         elif (not readingNodes) and lowerLine.startswith('markers:'):
             # If there are markers, then start reading them
@@ -169,3 +443,130 @@ def readMapFile(mapFile):
             print("Shouldn't get here", line)
     return graph
 
+
+
+# ------------------------------------------
+# The map cache file: a header, then the node locations as pairs of floats, then the edges
+# in compressed sparse row form (an offset for each node into a list of targets and a list of
+# weights, in the order the edges were added), then the positions of the edges in the order
+# that sorts each node's edges by target, as a CSRGraph needs, then the marker nodes and their
+# headings. The header records the size, modification time, and hash of the map file it was
+# made from.
+
+_CACHE_MAGIC = b'MGC2'
+_CACHE_HEADER_FORMAT = '<4sQq32sIII'
+
+
+def _hashFile(mapFile):
+    """Returns the SHA-256 digest of the contents of a file"""
+    with open(mapFile, 'rb') as filObj:
+        return hashlib.sha256(filObj.read()).digest()
+
+
+def _writeMapCache(graph, cacheFile, sourceSize, sourceTime, sourceHash):
+    """Takes in a MapGraph, the name of the cache file, and the size, modification time (in nanoseconds),
+    and hash of the map file it was read from, and writes the cache file."""
+    numNodes = graph.getSize()
+    coords = array('d')
+    for node in range(numNodes):
+        coords.extend(graph.getData(node))
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d')
+    sortOrder = array('q')
+    for node in range(numNodes):
+        edges = graph.getNeighbors(node)
+        start = len(targets)
+        targets.extend([neigh for (neigh, wgt) in edges])
+        weights.extend([wgt for (neigh, wgt) in edges])
+        sortOrder.extend(sorted(range(start, start + len(edges)), key=targets.__getitem__))
+        offsets.append(len(targets))
+    markerNodes = array('i', graph.markerMap.keys())
+    markerHeadings = array('d', graph.markerMap.values())
+    arrays = [coords, offsets, targets, weights, sortOrder, markerNodes, markerHeadings]
+    if sys.byteorder == 'big':
+        for arr in arrays:
+            arr.byteswap()
+    header = struct.pack(_CACHE_HEADER_FORMAT, _CACHE_MAGIC, sourceSize, sourceTime, sourceHash,
+                         numNodes, len(targets), len(markerNodes))
+    _replaceFile(cacheFile, [header] + arrays)
+
+
+def _refreshMapCacheTime(cacheFile, sourceTime):
+    """Takes in the name of a cache file and the new modification time (in nanoseconds) of its map file, and
+    rewrites the cache with that time in its header, leaving everything else as it was"""
+    with open(cacheFile, 'rb') as filObj:
+        data = bytearray(filObj.read())
+    fields = list(struct.unpack_from(_CACHE_HEADER_FORMAT, data))
+    fields[2] = sourceTime
+    struct.pack_into(_CACHE_HEADER_FORMAT, data, 0, *fields)
+    _replaceFile(cacheFile, [data])
+
+
+def _replaceFile(fileName, pieces):
+    """Takes in a filename and a list of bytes-like objects, and replaces the file with those pieces, one
+    after another. It writes to a temporary file first and then renames it, so another process never sees
+    a half-written file."""
+    tempFile = fileName + ".tmp" + str(os.getpid())
+    try:
+        with open(tempFile, 'wb') as filObj:
+            for piece in pieces:
+                filObj.write(piece)
+        os.replace(tempFile, fileName)
+    finally:
+        if os.path.exists(tempFile):
+            os.remove(tempFile)
+
+
+def _readMapCache(cacheFile, mapFile, sourceSize, sourceTime):
+    """Takes in the name of a cache file, the map file it should match, and that map file's current size and
+    modification time (in nanoseconds), and returns the list of arrays stored in the cache along with the
+    modification time recorded in it. The whole file is read at once. It returns None if the cache is missing
+    or damaged, or if it was made from a different version of the map file: the size must match, and if the
+    modification time does not, the hash is checked instead, so a map file that was only touched or copied
+    does not need to be parsed again."""
+    try:
+        with open(cacheFile, 'rb') as filObj:
+            data = filObj.read()
+    except OSError:
+        return None
+    headerSize = struct.calcsize(_CACHE_HEADER_FORMAT)
+    if len(data) < headerSize:
+        return None
+    (magic, size, mtime, sourceHash, numNodes, numEdges, numMarkers) = \
+        struct.unpack_from(_CACHE_HEADER_FORMAT, data)
+    if magic != _CACHE_MAGIC or size != sourceSize:
+        return None
+    if mtime != sourceTime and sourceHash != _hashFile(mapFile):
+        return None
+    arrays = [array('d'), array('q'), array('i'), array('d'), array('q'), array('i'), array('d')]
+    counts = [2 * numNodes, numNodes + 1, numEdges, numEdges, numEdges, numMarkers, numMarkers]
+    view = memoryview(data)
+    pos = headerSize
+    for (arr, count) in zip(arrays, counts):
+        end = pos + count * arr.itemsize
+        if end > len(data):
+            return None
+        arr.frombytes(view[pos:end])
+        pos = end
+    if sys.byteorder == 'big':
+        for arr in arrays:
+            arr.byteswap()
+    return (arrays, mtime)
+
+
+def _graphFromArrays(arrays, frozen):
+    """Takes in the arrays read from a cache file, and builds a CSRMapGraph from them if frozen is True,
+    or a MapGraph otherwise."""
+    (coords, offsets, targets, weights, sortOrder, markerNodes, markerHeadings) = arrays
+    numNodes = len(offsets) - 1
+    nodeData = list(zip(coords[0::2], coords[1::2]))
+    if frozen:
+        sortedTargets = array('i', map(targets.__getitem__, sortOrder))
+        sortedWeights = array('d', map(weights.__getitem__, sortOrder))
+        graph = CSRMapGraph(numNodes, nodeData, offsets, sortedTargets, sortedWeights)
+    else:
+        graph = MapGraph(numNodes, nodeData, checkData = False)
+        graph.loadEdgeArrays(offsets, targets, weights)
+    graph.markerMap = dict(zip(markerNodes, markerHeadings))
+    return graph
@@ -0,0 +1,153 @@
+"""##########################################################
+A route service for answering large batches of shortest-path queries on one
+loaded, unchanging weighted graph (a WeightedListGraph or MapGraph).
+
+Building a task advisor and a search solver for every query repeats a lot of
+work when many queries share a start. Instead, the queries in a batch are
+grouped by their start node, Dijkstra's algorithm is run once from each start,
+and every query with that start is answered from the one shortest-path tree.
+When there are many different starts, the groups are handed out to a pool of
+worker processes. Where the operating system supports it, the workers are
+forked after the graph is loaded, so they share the parent's copy of the graph
+instead of each getting their own.
+"""
+
+import multiprocessing
+import time
+
+from Graphs import NodeIndexOutOfRangeException
+
+
+# The graph the worker processes answer queries on. It is set in the parent just before the workers are
+# forked, so they inherit it, or by _initWorker in each worker when they are started fresh instead.
+_workerGraph = None
+
+
+class RouteService(object):
+    """Answers batches of (start, goal) queries on one graph. Each answer is a 3-tuple: the cost of the
+    cheapest path, the list of nodes on the path before the goal, and the number of seconds spent on that
+    query. If there is no path, the cost and the path are both None.
+    The pool of worker processes is started by the first batch that needs it and kept for later batches, so
+    call close when done with the service. The graph must not be changed while the service is in use."""
+
+    def __init__(self, graph, processes = 1, minGroupsPerProcess = 4):
+        """Takes in a weighted graph with a dijkstra method, the number of worker processes to use (None means
+        one per CPU, and 1 means all queries are answered in this process), and the smallest number of start
+        groups worth handing to each worker; batches with fewer groups than that are answered here, since
+        for them the cost of sending the work out is larger than the work."""
+        self.graph = graph
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = max(processes, 1)
+        self.minGroupsPerProcess = minGroupsPerProcess
+        self.pool = None
+        self.lastBatchTime = None
+        self.lastNumGroups = 0
+
+
+    def getLastBatchTime(self):
+        """Returns the number of seconds the last batch took, or None if there has not been one"""
+        return self.lastBatchTime
+
+    def getLastNumGroups(self):
+        """Returns the number of distinct start nodes, and so the number of Dijkstra runs, in the last batch"""
+        return self.lastNumGroups
+
+
+    def findRoutes(self, queries):
+        """Takes in a list of (start, goal) pairs of node indices, and returns a list with one tuple for each
+        query, in the same order: the cost of the cheapest path, the list of nodes on the path before the goal,
+        and the seconds spent on the query. For a query with no path, the cost and path are None. The time to
+        build a shortest-path tree is split evenly among the queries that share it."""
+        batchStart = time.perf_counter()
+        numNodes = self.graph.getSize()
+        groups = {}
+        for (index, (startNode, goalNode)) in enumerate(queries):
+            for node in (startNode, goalNode):
+                if not 0 <= node < numNodes:
+                    raise NodeIndexOutOfRangeException(0, numNodes, node)
+            groups.setdefault(startNode, []).append((index, goalNode))
+        tasks = list(groups.items())
+        self.lastNumGroups = len(tasks)
+
+        if self.processes > 1 and len(tasks) >= 2 * self.minGroupsPerProcess:
+            if self.pool is None:
+                self.pool = self._startPool()
+            chunkSize = max(1, len(tasks) // (self.processes * self.minGroupsPerProcess))
+            groupResults = self.pool.imap_unordered(_answerGroupInWorker, tasks, chunkSize)
+        else:
+            groupResults = (_answerGroup(self.graph, task) for task in tasks)
+
+        results = [None] * len(queries)
+        for answers in groupResults:
+            for (index, answer) in answers:
+                results[index] = answer
+        self.lastBatchTime = time.perf_counter() - batchStart
+        return results
+
+
+    def findRoute(self, startNode, goalNode):
+        """Answers a single query, returning the same tuple as one entry of findRoutes"""
+        return self.findRoutes([(startNode, goalNode)])[0]
+
+
+    def close(self):
+        """Shuts down the worker processes, if any were started"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+    def _startPool(self):
+        """A private helper, starts the worker processes. With the fork start method the workers inherit the
+        graph from this process, and pages of it are only copied if something writes to them. Otherwise, each
+        worker is sent its own copy of the graph once, when it starts."""
+        global _workerGraph
+        if "fork" in multiprocessing.get_all_start_methods():
+            _workerGraph = self.graph
+            context = multiprocessing.get_context("fork")
+            return context.Pool(self.processes)
+        context = multiprocessing.get_context()
+        return context.Pool(self.processes, initializer=_initWorker, initargs=(self.graph,))
+
+
+
+# ------------------------------------------
+# Functions the worker processes run. They must be at the top level of the module so that the
+# workers can find them.
+
+def _initWorker(graph):
+    """Stores the graph a freshly started worker process was sent"""
+    global _workerGraph
+    _workerGraph = graph
+
+
+def _answerGroupInWorker(task):
+    """Answers one group of queries in a worker process, on the graph the worker was given"""
+    return _answerGroup(_workerGraph, task)
+
+
+def _answerGroup(graph, task):
+    """Takes in a graph and a task, which is a start node and a list of (query index, goal node) pairs. It runs
+    Dijkstra's algorithm once from the start, and returns a list of (query index, answer) pairs, where each
+    answer is a tuple of the cost, the path before the goal, and the seconds spent."""
+    (startNode, goals) = task
+    treeStart = time.perf_counter()
+    (dists, preds) = graph.dijkstra(startNode)
+    treeShare = (time.perf_counter() - treeStart) / len(goals)
+    answers = []
+    for (index, goalNode) in goals:
+        pathStart = time.perf_counter()
+        if dists[goalNode] == float('inf'):
+            (cost, path) = (None, None)
+        else:
+            cost = dists[goalNode]
+            path = []
+            node = preds[goalNode]
+            while node is not None:
+                path.append(node)
+                node = preds[node]
+            path.reverse()
+        answers.append((index, (cost, path, treeShare + time.perf_counter() - pathStart)))
+    return answers
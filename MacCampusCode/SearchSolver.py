@@ -7,8 +7,9 @@ solvers for a specific problem.
  ==================================================================="""
 
 
-from FoxQueue import Queue, PriorityQueue
+from FoxQueue import Queue, IndexedPriorityQueue, LazyPriorityQueue, BucketPriorityQueue
 from FoxStack import Stack
+import time
 
 # Change this to true to see information about the search as it goes.
 verbose = False
@@ -23,7 +24,7 @@ class BestFirstSearchSolver(object):
     should be overridden by the subclass.
     These algorithms assume that the qData stored in the states implement the equality operators properly!"""
     
-    def __init__(self, taskAdvisor):
+    def __init__(self, taskAdvisor, fringeType = "auto"):
         """Creates a Best-First search solver, with the given task advisor. This takes in a "task advisor" and
         sets up the qData needed for the search, the fringe and visited sets, and the counts of
         how many nodes were created and visited.
@@ -31,18 +32,31 @@ class BestFirstSearchSolver(object):
         nodes visited (that corresponds more or less to the number of nodes added to the queue and the number of nodes
         removed from the queue (and not found to be redundant)).  In addition, there are instance variables for the
         search queues for both BFS and PQSearch, so that we can step through the algorithms rather than just running
-        them all at once"""
+        them all at once.
+        The optional fringeType selects the priority queue used for the fringe: "indexed" uses an
+        IndexedPriorityQueue, "heapq" uses a LazyPriorityQueue built on the heapq module, and "bucket" uses a
+        BucketPriorityQueue, which needs the task advisor to have a getMaxStepCost method. The default, "auto",
+        picks the bucket queue when the task advisor reports a bound on its integer step costs, and the indexed
+        queue otherwise."""
+        if fringeType not in {"auto", "indexed", "heapq", "bucket"}:
+            raise ValueError("fringeType must be one of 'auto', 'indexed', 'heapq', or 'bucket'")
         self.taskAdvisor = taskAdvisor
         self.nodesCreated = 0
         self.nodesVisited = 0
         self.fringe = None
         self.visited = None
+        self.fringeType = fringeType
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
 
     def _initializeCounts(self):
         """A private helper to initialize the counts, since they need to be initialized anew each time the
         search algorithms are called"""
         self.nodesCreated = 0
         self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
 
     def getNodesCreated(self):
         """Returns the value of self.nodesCreated"""
@@ -52,6 +66,19 @@ class BestFirstSearchSolver(object):
         """Returns the value of self.nodesVisited"""
         return self.nodesVisited
 
+    def getReopenCount(self):
+        """Returns the number of times a visited state was put back on the fringe with a lower cost"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times a fringe state was replaced by one with a lower cost"""
+        return self.decreaseKeyCount
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
 
     def initSearch(self):
         """This method sets up a priority-queue-based search process, initializing the fringe queue, the set of
@@ -60,18 +87,41 @@ class BestFirstSearchSolver(object):
         startState = self.taskAdvisor.getStartState()
         if self.taskAdvisor.isGoal(startState):
             return startState.getPath()
-        self.visited = set()
-        self.fringe = PriorityQueue()
-        self.fringe.insert(startState, startState.getCost())
+        self.visited = {}
+        self._setupFringe(startState)
         self.nodesCreated += 1
 
+    def _setupFringe(self, startState):
+        """This method sets up the proper kind of fringe set for this particular search.
+        In this case, it creates the priority queue selected by self.fringeType, and it inserts
+        the start state into it."""
+        maxStep = self._getMaxStepCost()
+        if self.fringeType == "heapq":
+            self.fringe = LazyPriorityQueue()
+        elif self.fringeType == "bucket" or (self.fringeType == "auto" and maxStep is not None):
+            if maxStep is None:
+                raise ValueError("The bucket fringe needs a task advisor that reports its maximum step cost")
+            self.fringe = BucketPriorityQueue(maxStep)
+        else:
+            self.fringe = IndexedPriorityQueue()
+        self.fringe.insert(startState, startState.getCost())
+
+
+    def _getMaxStepCost(self):
+        """Asks the task advisor for the largest cost of a single step, if it has a getMaxStepCost method.
+        Advisors only report it when every cost is a non-negative integer that never decreases along a path,
+        which is what the bucket queue needs. Returns None otherwise."""
+        if hasattr(self.taskAdvisor, "getMaxStepCost"):
+            return self.taskAdvisor.getMaxStepCost()
+        return None
+
 
     def searchLoop(self):
         """This method runs the search, repeatedly calling for the next step until either
         the search fails and False is returned, or the search completes"""
         while True:
             (nextState, neighbors, isDone) = self.searchStep()
-            if nextState == "Fail":
+            if isDone == "Fail":
                 return False
             elif isDone == "Done":
                 # is search is done then nextState actually holds the result
@@ -83,7 +133,17 @@ class BestFirstSearchSolver(object):
         """This method performs one step of a priority-queue search. It finds the next node in
         the priority queue, generates its children, and adds the appropriate ones to the priority queue
         It returns three values: the current state, the neighbors of the current state, and a status 
-        message.  The message is either "Done", "Fail", or "Not Done" for a normal step."""
+        message.  The message is either "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
         newNeighbors = []
         if self.fringe.isEmpty():
             return (False, False, "Fail")
@@ -96,7 +156,7 @@ class BestFirstSearchSolver(object):
             print("----------------------")
             print("Current state:", nextState)
         neighbors = self.taskAdvisor.generateNeighbors(nextState)
-        self.visited.add(nextState)
+        self.visited[nextState] = nextState
         self.nodesVisited += 1
 
         for n in neighbors:
@@ -115,10 +175,11 @@ class BestFirstSearchSolver(object):
                 if verbose:
                     print("    Neighbor was already in explored, cost is lower now", n, visitedMatch.getCost(), n.getCost())
                 self.fringe.insert(n, n.getCost())
-                self.visited.discard(visitedMatch)
-                self.visited.add(n)
+                del self.visited[visitedMatch]
+                self.visited[n] = n
                 newNeighbors.append(n)
                 self.nodesCreated += 1
+                self.reopenCount += 1
             elif fringeMatch and fringeMatch.getCost() > n.getCost():
                 # if state is in fringe but this one is better, add this one to fringe AND
                 if verbose:
@@ -129,6 +190,7 @@ class BestFirstSearchSolver(object):
                 self.fringe.insert(n, n.getCost())
                 newNeighbors.append(n)
                 self.nodesCreated += 1
+                self.decreaseKeyCount += 1
             elif visitedMatch:
                 if verbose:
                     print("    Neighbor was already in explored, skipping", n)
@@ -140,18 +202,16 @@ class BestFirstSearchSolver(object):
         return nextState, newNeighbors, "Not Done"
 
     def _hasBeenVisited(self, state):
-        """Given a state, it looks through the visited set and seeks a node
-        that is "equal" to the input state. It is up to the subclass to
-        define what it means for them to be equal. It returns the matching
+        """Given a state, it looks up the visited table and finds the node
+        that is "equal" to the input state. The table is a dictionary that maps each
+        state to the best state found so far for that location, so the lookup uses the
+        __hash__ and __eq__ methods of the state class. It returns the matching
         state, if any, or False if none"""
-        for s in self.visited:
-            if s == state:
-                return s
-        return False
+        return self.visited.get(state, False)
 
     def _hasBeenFringed(self, state):
-        """Given a state, it looks through the fringe set and seeks a node that is "equal" to the
-        input state.  It is up to the objects to define what it means for them to be equal.  It
+        """Given a state, it asks the fringe for a node that is "equal" to the input state. The
+        fringe is an indexed or lazy priority queue, so this is a dictionary lookup rather than a scan. It
         returns the matching state, if any, or False if none"""
         foundInfo = self.fringe.contains(state)
         if foundInfo:
@@ -190,12 +250,17 @@ class NoCostSearchSolver(object):
         self.fringe = None
         self.visited = None
         self.mode = mode
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
 
     def _initializeCounts(self):
         """A private helper to initialize the counts, since they need to be initialized anew each time the
         search algorithms are called"""
         self.nodesCreated = 0
         self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
 
     def getNodesCreated(self):
         """Returns the value of self.nodesCreated"""
@@ -205,6 +270,19 @@ class NoCostSearchSolver(object):
         """Returns the value of self.nodesVisited"""
         return self.nodesVisited
 
+    def getReopenCount(self):
+        """Returns the number of times a visited state was put back on the fringe with a lower cost"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times a fringe state was replaced by one with a lower cost"""
+        return self.decreaseKeyCount
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
     def initSearch(self):
         """This method sets up a priority-queue-based search process, initializing the fringe queue, the set of
         visited states, and adding the start state to the fringe queue."""
@@ -212,7 +290,7 @@ class NoCostSearchSolver(object):
         startState = self.taskAdvisor.getStartState()
         if self.taskAdvisor.isGoal(startState):
             return startState.getPath()
-        self.visited = set()
+        self.visited = {}
         if self.mode == "BFS":
             self.fringe = Queue()
         else:
@@ -235,7 +313,7 @@ class NoCostSearchSolver(object):
         the search fails and False is returned, or the search completes"""
         while True:
             (nextState, neighbors, isDone) = self.searchStep()
-            if nextState == "Fail":
+            if isDone == "Fail":
                 return False
             elif isDone == "Done":
                 # is search is done then nextState actually holds the result
@@ -247,7 +325,17 @@ class NoCostSearchSolver(object):
         """This method performs one step of a stack or queue search. It finds the next node in
         the stack/queue, generates its children, and adds the appropriate ones to the stack/queue.
         It returns three values: the current state, the neighbors of the current state, and a status
-        message.  The message is either "Done", "Fail", or "Not Done" for a normal step."""
+        message.  The message is either "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
         newNeighbors = []
         if self.fringe.isEmpty():
             return (False, False, "Fail")
@@ -260,7 +348,7 @@ class NoCostSearchSolver(object):
             print("----------------------")
             print("Current state:", nextState)
         neighbors = self.taskAdvisor.generateNeighbors(nextState)
-        self.visited.add(nextState)
+        self.visited[nextState] = nextState
         self.nodesVisited += 1
 
         for n in neighbors:
@@ -285,14 +373,11 @@ class NoCostSearchSolver(object):
         return nextState, newNeighbors, "Not Done"
 
     def _hasBeenVisited(self, state):
-        """Given a state, it looks through the visited set and seeks a node
+        """Given a state, it looks up the visited table and finds the node
         that is "equal" to the input state. It is up to the state class to
-        define what it means for them to be equal. It returns the matching
-        state, if any, or False if none"""
-        for s in self.visited:
-            if s == state:
-                return s
-        return False
+        define what it means for them to be equal, and to hash equal states the same way.
+        It returns the matching state, if any, or False if none"""
+        return self.visited.get(state, False)
 
     def _hasBeenFringed(self, state):
         """Given a state, it looks through the fringe set and seeks a node that is "equal" to the
@@ -305,3 +390,353 @@ class NoCostSearchSolver(object):
             return False
 
 
+
+
+class BidirectionalAStarSolver(object):
+    """This class contains a bidirectional A* search. It runs one search forward from the start and another
+    backward from the goal, always expanding a node from whichever fringe has the smaller key. Both searches use
+    the same "average" potential, p(v) = (hForward(v) - hBackward(v)) / 2, where hForward is the heuristic distance
+    to the goal and hBackward is the heuristic distance to the start. This potential is consistent whenever the two
+    heuristics are, so each direction behaves like Dijkstra's algorithm on the same reduced edge costs. The
+    best path found so far is recorded whenever one search generates a node the other search has already seen,
+    and the search stops once the smallest keys on the two fringes add up to at least the cost of that path,
+    at which point the path is optimal.
+    This assumes the edges are undirected: the backward advisor must be an advisor for the same map with the
+    start and goal swapped. The states must provide getCostToHere (as the A* states do), and both advisors must
+    provide a heuristicToGoal method."""
+
+    def __init__(self, forwardAdvisor, backwardAdvisor):
+        """Takes in the task advisor for the forward search and the task advisor for the backward search, and
+        sets up the qData needed for the search: a fringe and visited table for each direction, the cost
+        and meeting states of the best path found so far, and the counts of how many nodes were created and
+        visited (expanded) in the two directions together."""
+        self.advisors = [forwardAdvisor, backwardAdvisor]
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.fringes = None
+        self.visited = None
+        self.bestCost = None
+        self.meetingStates = None
+
+    def _initializeCounts(self):
+        """A private helper to initialize the counts, since they need to be initialized anew each time the
+        search algorithms are called"""
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+
+    def getNodesCreated(self):
+        """Returns the value of self.nodesCreated"""
+        return self.nodesCreated
+
+    def getNodesVisited(self):
+        """Returns the value of self.nodesVisited, the number of nodes expanded by both searches"""
+        return self.nodesVisited
+
+    def getPathCost(self):
+        """Returns the cost of the best path found so far, or None if no path has been found"""
+        if self.meetingStates is None:
+            return None
+        return self.bestCost
+
+
+    def initSearch(self):
+        """This method sets up the two searches, initializing the fringe queues and visited tables, and
+        adding the start state of each advisor to its fringe queue."""
+        self._initializeCounts()
+        self.fringes = [IndexedPriorityQueue(), IndexedPriorityQueue()]
+        self.visited = [{}, {}]
+        self.bestCost = float('inf')
+        self.meetingStates = None
+        starts = []
+        for side in [0, 1]:
+            startState = self.advisors[side].getStartState()
+            self.fringes[side].insert(startState, self._key(side, startState))
+            self.nodesCreated += 1
+            starts.append(startState)
+        if starts[0] == starts[1]:
+            self._recordMeeting(0, starts[0], starts[1])
+
+
+    def searchLoop(self):
+        """This method runs the search, repeatedly calling for the next step until either
+        the search fails and False is returned, or the search completes and the path is returned"""
+        while True:
+            (nextState, neighbors, isDone) = self.searchStep()
+            if isDone == "Fail":
+                return False
+            elif isDone == "Done":
+                # is search is done then nextState actually holds the path
+                return nextState
+            # Otherwise just do another step of the search
+
+
+    def searchStep(self):
+        """This method performs one step of the bidirectional search. It checks the stopping criterion,
+        and if the search is not done it expands the first node of the fringe with the smaller key.
+        It returns three values: the current state, the neighbors of the current state, and a status
+        message.  The message is either "Done", "Fail", or "Not Done" for a normal step. When the search
+        is done, the first value is the path from the start to the goal, in the same form as the path of
+        a goal state found by the BestFirstSearchSolver."""
+        if self.fringes[0].isEmpty() or self.fringes[1].isEmpty():
+            # one side has run out of nodes, so every path from it has been seen
+            if self.meetingStates is None:
+                return (False, False, "Fail")
+            return (self._buildPath(), [], "Done")
+        (forwardTop, forwardKey) = self.fringes[0].firstElement()
+        (backwardTop, backwardKey) = self.fringes[1].firstElement()
+        if forwardKey + backwardKey >= self.bestCost:
+            return (self._buildPath(), [], "Done")
+
+        if forwardKey <= backwardKey:
+            side = 0
+        else:
+            side = 1
+        nextState, priority = self.fringes[side].delete()
+        if verbose:
+            print("----------------------")
+            print("Current state (side " + str(side) + "):", nextState)
+        self.visited[side][nextState] = nextState
+        self.nodesVisited += 1
+
+        newNeighbors = []
+        for n in self.advisors[side].generateNeighbors(nextState):
+            if n in self.visited[side]:
+                # with a consistent potential, an expanded node already has its best cost
+                continue
+            fringeMatch = self.fringes[side].contains(n)
+            if fringeMatch and fringeMatch.getCostToHere() <= n.getCostToHere():
+                continue
+            # inserting replaces any costlier entry for the same location
+            self.fringes[side].insert(n, self._key(side, n))
+            newNeighbors.append(n)
+            self.nodesCreated += 1
+            otherMatch = self._findState(1 - side, n)
+            if otherMatch:
+                self._recordMeeting(side, n, otherMatch)
+        return nextState, newNeighbors, "Not Done"
+
+
+    def _key(self, side, state):
+        """Computes the priority of a state on the given side: its cost so far plus the potential, which is half
+        the difference between this side's heuristic and the other side's heuristic."""
+        ownEstimate = self.advisors[side].heuristicToGoal(state)
+        otherEstimate = self.advisors[1 - side].heuristicToGoal(state)
+        return state.getCostToHere() + (ownEstimate - otherEstimate) / 2
+
+    def _findState(self, side, state):
+        """Looks for a state equal to the input in the visited table or the fringe of the given side,
+        returning the matching state, if any, or False if none"""
+        match = self.visited[side].get(state, False)
+        if match:
+            return match
+        return self.fringes[side].contains(state)
+
+    def _recordMeeting(self, side, state, otherState):
+        """Given a state from one side and the matching state from the other side, this checks whether the
+        path through them is cheaper than the best so far, and records it if so."""
+        totalCost = state.getCostToHere() + otherState.getCostToHere()
+        if totalCost < self.bestCost:
+            self.bestCost = totalCost
+            if side == 0:
+                self.meetingStates = (state, otherState)
+            else:
+                self.meetingStates = (otherState, state)
+
+    def _buildPath(self):
+        """Joins the forward path to the meeting point with the reversed backward path from it. Like the
+        paths of the other searches, the result lists the locations before the goal, not the goal itself."""
+        (forwardState, backwardState) = self.meetingStates
+        backwardPath = backwardState.getPath()[:]
+        backwardPath.reverse()
+        fullPath = forwardState.getPath() + [forwardState.getLocation()] + backwardPath
+        return fullPath[:-1]
+
+
+
+class IDAStarSearchSolver(object):
+    """This class contains an iterative-deepening A* (IDA*) search. Instead of keeping a fringe and a visited
+    set, it runs a depth-first search that is cut off wherever a state's cost (f = g + h, for the A* states)
+    goes over a threshold. If that finds no goal, the threshold is raised to the smallest cost that was cut off,
+    and the depth-first search starts over. It only keeps the current path and the unexplored neighbors of the
+    states on it, so its memory grows with the depth of the search rather than the number of states. With an
+    admissible heuristic, the first goal found is a best one.
+    The depth-first search may reach the same state along many different paths. An optional transposition table
+    remembers, during each iteration, the cheapest cost-so-far with which each state was expanded, and skips a
+    state reached again without a cheaper cost. The table holds at most tableSize states, so memory stays
+    bounded; once it is full, new states are no longer added to it. A tableSize of 0 turns the table off.
+    Like the other solvers, it works with a task advisor, and it can be stepped through with searchStep."""
+
+    def __init__(self, taskAdvisor, tableSize = 0):
+        """Takes in the task advisor, and an optional maximum size for the transposition table
+        (0, the default, means no table). Sets up the counts of how many nodes were created and visited."""
+        if tableSize < 0:
+            raise ValueError("tableSize must not be negative")
+        self.taskAdvisor = taskAdvisor
+        self.tableSize = tableSize
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.fringe = None
+        self.visited = None
+        self.stack = None
+        self.table = None
+        self.startState = None
+        self.threshold = None
+        self.nextThreshold = None
+        self.startPending = False
+        self.iterations = 0
+        self.telemetry = None
+
+    def _initializeCounts(self):
+        """A private helper to initialize the counts, since they need to be initialized anew each time the
+        search algorithms are called"""
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.iterations = 0
+
+    def getNodesCreated(self):
+        """Returns the value of self.nodesCreated"""
+        return self.nodesCreated
+
+    def getNodesVisited(self):
+        """Returns the value of self.nodesVisited"""
+        return self.nodesVisited
+
+    def getReopenCount(self):
+        """Returns the number of states expanded after the first iteration, most of which repeat the work
+        of earlier iterations"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """IDA* has no fringe, so this is always 0; it is here so telemetry works with every solver"""
+        return self.decreaseKeyCount
+
+    def getIterations(self):
+        """Returns the number of depth-first iterations started so far"""
+        return self.iterations
+
+    def getThreshold(self):
+        """Returns the cost threshold of the current iteration"""
+        return self.threshold
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
+
+    def initSearch(self):
+        """This method sets up the search, starting the first iteration with the cost of the start state as
+        its threshold."""
+        self._initializeCounts()
+        self.startState = self.taskAdvisor.getStartState()
+        self.threshold = self.startState.getCost()
+        self.nodesCreated += 1
+        self._startIteration()
+
+    def _startIteration(self):
+        """A private helper that starts a new depth-first iteration from the start state with the current
+        threshold. The stack holds one entry for each state on the current path: a list of the state, its
+        neighbors, and the index of the next neighbor to try."""
+        self.iterations += 1
+        self.nextThreshold = float('inf')
+        self.stack = []
+        self.visited = {}    # the states on the current path
+        self.table = {}
+        self.startPending = True
+
+
+    def searchLoop(self):
+        """This method runs the search, repeatedly calling for the next step until either
+        the search fails and False is returned, or the search completes"""
+        while True:
+            (nextState, neighbors, isDone) = self.searchStep()
+            if isDone == "Fail":
+                return False
+            elif isDone == "Done":
+                return nextState
+
+
+    def searchStep(self):
+        """This method performs one step of the search: it finds the next state the depth-first search should
+        expand, skipping over states that are over the threshold (and starting a new iteration when this one
+        runs out), and generates its neighbors. It returns three values: the current state, its neighbors, and
+        a status message, "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
+        while True:
+            nextState = self._nextCandidate()
+            if nextState is None:
+                # this iteration is over, so raise the threshold and start again
+                if self.nextThreshold == float('inf'):
+                    return (False, False, "Fail")
+                self.threshold = self.nextThreshold
+                self._startIteration()
+                continue
+            if nextState.getCost() > self.threshold:
+                self.nextThreshold = min(self.nextThreshold, nextState.getCost())
+                continue
+            if self.taskAdvisor.isGoal(nextState):
+                return (nextState, [], "Done")
+            if self._inTable(nextState):
+                continue
+
+            if verbose:
+                print("----------------------")
+                print("Current state:", nextState, "threshold:", self.threshold)
+            neighbors = []
+            for n in self.taskAdvisor.generateNeighbors(nextState):
+                if n not in self.visited:
+                    neighbors.append(n)
+            self.nodesVisited += 1
+            self.nodesCreated += len(neighbors)
+            if self.iterations > 1:
+                self.reopenCount += 1
+            self.stack.append([nextState, neighbors, 0])
+            self.visited[nextState] = nextState
+            return (nextState, neighbors, "Not Done")
+
+    def _nextCandidate(self):
+        """A private helper that returns the next state for the depth-first search to consider: the start
+        state at the beginning of an iteration, and after that the next untried neighbor of the deepest state
+        on the path, backing up as states run out of neighbors. Returns None when the iteration is over."""
+        if self.startPending:
+            self.startPending = False
+            return self.startState
+        while self.stack:
+            frame = self.stack[-1]
+            (state, neighbors, index) = frame
+            if index < len(neighbors):
+                frame[2] = index + 1
+                return neighbors[index]
+            self.stack.pop()
+            del self.visited[state]
+        return None
+
+    def _inTable(self, state):
+        """A private helper that checks the transposition table. If the state was already expanded in this
+        iteration with a cost-so-far no larger than this one's, it returns True, so the state can be skipped.
+        Otherwise it records this state's cost-so-far, if there is room, and returns False."""
+        if self.tableSize == 0:
+            return False
+        if hasattr(state, "getCostToHere"):
+            costToHere = state.getCostToHere()
+        else:
+            costToHere = state.getCost()
+        oldCost = self.table.get(state)
+        if oldCost is not None and oldCost <= costToHere:
+            return True
+        if oldCost is not None or len(self.table) < self.tableSize:
+            self.table[state] = costToHere
+        return False
@@ -0,0 +1,75 @@
+"""  =================================================================
+File: SearchTelemetry.py
+
+This file contains a class that records statistics about each step of a
+search, for profiling the search solvers. To use it, create a SearchTelemetry
+object and pass it to the solver's setTelemetry method before running the
+search. Afterwards, the steps can be examined directly, or written out to a
+JSON or CSV file. Solvers without a telemetry object do no extra work.
+ ==================================================================="""
+
+import csv
+import json
+
+
+class SearchTelemetry(object):
+    """Records one row of statistics for each step of a search: the size of the fringe and of the
+    visited (closed) set after the step, how many times so far a visited state was reopened or a fringe
+    state was replaced by a cheaper one (a decrease-key), the node counts, and the time the step took."""
+
+    fieldNames = ["step", "status", "frontierSize", "closedSize", "reopenCount", "decreaseKeyCount",
+                  "nodesCreated", "nodesVisited", "stepTime"]
+
+    def __init__(self):
+        """Creates an empty telemetry record"""
+        self.steps = []
+
+    def clear(self):
+        """Removes all recorded steps, so the object can be reused for another search"""
+        self.steps = []
+
+    def recordStep(self, solver, status, stepTime):
+        """Takes in the solver that just performed a step, the status message of the step, and the number
+        of seconds it took, and records a row of statistics about the solver's state after the step."""
+        if solver.fringe is None:
+            frontierSize = 0
+        else:
+            frontierSize = solver.fringe.getSize()
+        if solver.visited is None:
+            closedSize = 0
+        else:
+            closedSize = len(solver.visited)
+        row = {"step": len(self.steps) + 1,
+               "status": status,
+               "frontierSize": frontierSize,
+               "closedSize": closedSize,
+               "reopenCount": solver.getReopenCount(),
+               "decreaseKeyCount": solver.getDecreaseKeyCount(),
+               "nodesCreated": solver.getNodesCreated(),
+               "nodesVisited": solver.getNodesVisited(),
+               "stepTime": stepTime}
+        self.steps.append(row)
+
+    def getSteps(self):
+        """Returns the list of recorded rows, each a dictionary keyed by the field names"""
+        return self.steps
+
+    def getTotalTime(self):
+        """Returns the total number of seconds spent in the recorded steps"""
+        return sum(row["stepTime"] for row in self.steps)
+
+    def getMaxFrontierSize(self):
+        """Returns the largest fringe size seen in any recorded step, or 0 if there are none"""
+        return max([row["frontierSize"] for row in self.steps], default=0)
+
+    def writeJSON(self, fileName):
+        """Writes the recorded rows to the given file as a JSON list of objects"""
+        with open(fileName, 'w') as filObj:
+            json.dump(self.steps, filObj, indent=1)
+
+    def writeCSV(self, fileName):
+        """Writes the recorded rows to the given file as CSV, with a header row of field names"""
+        with open(fileName, 'w', newline='') as filObj:
+            writer = csv.DictWriter(filObj, fieldnames=self.fieldNames)
+            writer.writeheader()
+            writer.writerows(self.steps)
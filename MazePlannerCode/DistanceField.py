@@ -0,0 +1,126 @@
+"""  =================================================================
+File: DistanceField.py
+
+This file contains a class that precomputes, for a fixed goal, the cost of
+the best path to the goal from every cell of a maze. After that, the best
+path from any start can be found just by walking downhill through the costs,
+and the costs also make a perfect heuristic for A*.
+ ==================================================================="""
+
+import heapq
+from array import array
+
+inf = float('inf')
+
+
+class GoalDistanceField(object):
+    """Holds the cost-to-go of every cell of a maze: the cost of the best path from that cell to the goal,
+    counting the weight of each cell the path enters, including the goal, but not the weight of the cell it
+    starts in. Adding the weight of the start cell gives the cost that UCSMazeAdvisor would find. The costs are
+    computed by running Dijkstra's algorithm backward from the goal, and stored in a flat array of floats, with
+    infinity for cells that cannot reach the goal.
+    The field listens to the maze for changed cells, and when one changes, the field is thrown out and
+    recomputed the next time it is used. If no goal is given, the field follows the maze's goal position."""
+
+    moveDeltas = {'N': (-1, 0), 'E': (0, 1), 'S': (1, 0), 'W': (0, -1)}
+
+    def __init__(self, maze, goalPos=None):
+        """Takes in the MazeInfo and, optionally, the goal position, and registers with the maze to hear about
+        changed cells. The costs are not computed until they are first needed."""
+        self.maze = maze
+        self.fixedGoal = goalPos
+        self.goalPos = None
+        self.costs = None
+        self.maze.addChangeListener(self.cellChanged)
+
+    def stopListening(self):
+        """Stops listening to the maze for changes. Call this when the field is no longer going to be used."""
+        self.maze.removeChangeListener(self.cellChanged)
+
+    def cellChanged(self, row, col):
+        """This is the change listener: the maze calls it when a cell changes, and the field is marked out
+        of date."""
+        self.costs = None
+
+    def isValid(self):
+        """Returns True if the costs have been computed and are up to date, and False otherwise"""
+        return self.costs is not None and self.goalPos == self._currentGoal()
+
+    def getGoalPos(self):
+        """Returns the goal position that the field is computed for"""
+        return self._currentGoal()
+
+
+    def getCostToGo(self, row, col):
+        """Given a row and column, returns the cost of the best path from there to the goal, not counting the
+        weight of the cell itself. Returns infinity if the cell is blocked, out of bounds, or cannot reach the goal."""
+        if not self.isValid():
+            self._computeField()
+        if self.maze.isOutOfBounds(row, col):
+            return inf
+        return self.costs[row * self.maze.getNumCols() + col]
+
+
+    def getPathCost(self, row, col):
+        """Given a starting row and column, returns the cost of the best path from there to the goal, counting
+        the weight of the starting cell the way UCSMazeAdvisor does. Returns infinity if there is no path."""
+        costToGo = self.getCostToGo(row, col)
+        if costToGo == inf:
+            return inf
+        return self.maze.getWeight(row, col) + costToGo
+
+
+    def getPathFrom(self, row, col):
+        """Given a starting row and column, returns the list of moves ('N', 'E', 'S', 'W') of the best path from
+        there to the goal, or None if there is no path. It starts at the given cell and repeatedly moves to the
+        neighbor through which the cost-to-go is smallest, so it takes time proportional to the path length."""
+        if self.getCostToGo(row, col) == inf:
+            return None
+        numCols = self.maze.getNumCols()
+        (goalRow, goalCol) = self.goalPos
+        moves = []
+        while (row, col) != (goalRow, goalCol):
+            bestMove = None
+            bestCost = inf
+            for (move, (dRow, dCol)) in self.moveDeltas.items():
+                (nRow, nCol) = (row + dRow, col + dCol)
+                if self.maze.isAccessible(nRow, nCol):
+                    cost = self.maze.getWeight(nRow, nCol) + self.costs[nRow * numCols + nCol]
+                    if cost < bestCost:
+                        bestMove = move
+                        bestCost = cost
+            moves.append(bestMove)
+            (row, col) = (row + self.moveDeltas[bestMove][0], col + self.moveDeltas[bestMove][1])
+        return moves
+
+
+    def _currentGoal(self):
+        """A private helper, returns the fixed goal if one was given, or the maze's goal otherwise"""
+        if self.fixedGoal is not None:
+            return tuple(self.fixedGoal)
+        return tuple(self.maze.getGoalPos())
+
+
+    def _computeField(self):
+        """A private helper, runs Dijkstra's algorithm backward from the goal. Moving from a cell into its
+        neighbor costs the neighbor's weight, so the cost-to-go of a cell is the smallest, over its neighbors,
+        of the neighbor's weight plus the neighbor's cost-to-go."""
+        numRows = self.maze.getNumRows()
+        numCols = self.maze.getNumCols()
+        self.goalPos = self._currentGoal()
+        self.costs = array('d', [inf]) * (numRows * numCols)
+        (goalRow, goalCol) = self.goalPos
+        if not self.maze.isAccessible(goalRow, goalCol):
+            return
+        self.costs[goalRow * numCols + goalCol] = 0
+        heap = [(0, goalRow, goalCol)]
+        while heap:
+            (cost, row, col) = heapq.heappop(heap)
+            if cost > self.costs[row * numCols + col]:
+                continue
+            newCost = cost + self.maze.getWeight(row, col)
+            for (dRow, dCol) in self.moveDeltas.values():
+                (nRow, nCol) = (row + dRow, col + dCol)
+                if self.maze.isAccessible(nRow, nCol) and newCost < self.costs[nRow * numCols + nCol]:
+                    self.costs[nRow * numCols + nCol] = newCost
+                    heapq.heappush(heap, (newCost, nRow, nCol))
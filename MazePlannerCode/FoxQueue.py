@@ -7,22 +7,31 @@ Updated Spring 2016 to add methods to priority queue for removing qData from the
 Updated Fall 2018 to make classes consistent, to switch the ordering of inputs to the insert methods,
 and to add a contains method. Now the classes assume that the object being stored implements the == operator
 in a meaningful way.
+Updated to keep the Queue in a deque, with a dictionary of its values, so inserting, deleting, and contains
+are all constant time.
 """
 
+import heapq
+from collections import deque
+
 
 class Queue:
     """A queue is a linear collection used to hold qData that is waiting
     for some purpose.  The first to enter the queue is the first to
-    leave it."""
+    leave it. The values are kept in a deque, and a dictionary maps each
+    value to the values equal to it in the queue, in order, so that contains
+    does not have to search the queue. Values that cannot be hashed are
+    allowed, but contains has to search the queue for them."""
 
     def __init__(self, valList=None):
         """When creating a new queue, you can give a list of values to
         insert in the queue at the start."""
-        if valList is None:
-            self.qData = []
-        else:
-            self.qData = valList[:]
-        self.size = len(self.qData)
+        self.qData = deque()
+        self.members = {}
+        self.size = 0
+        if valList is not None:
+            for val in valList:
+                self.insert(val)
 
     def getSize(self):
         """Return the size of the queue."""
@@ -47,6 +56,10 @@ class Queue:
     def insert(self, val):
         """Inserts a new value at the end of the queue."""
         self.qData.append(val)
+        try:
+            self.members.setdefault(val, deque()).append(val)
+        except TypeError:
+            pass
         self.size = self.size + 1
 
     def enqueue(self, val):
@@ -58,7 +71,14 @@ class Queue:
         if self.isEmpty():
             return None
         else:
-            firstData = self.qData.pop(0)
+            firstData = self.qData.popleft()
+            try:
+                equalVals = self.members[firstData]
+                equalVals.popleft()
+                if len(equalVals) == 0:
+                    del self.members[firstData]
+            except TypeError:
+                pass
             self.size = self.size - 1
             return firstData
 
@@ -67,12 +87,18 @@ class Queue:
         return self.delete()
 
     def contains(self, value):
-        """Takes in a value and returns true if the item is in the queue. Assumes the item implements
-        the __eq__ operation."""
-        for item in self.qData:
-            if value == item:
-                return item
-        return False
+        """Takes in a value and returns the first item in the queue that is equal to it, or False if there is none.
+        Assumes the item implements the __eq__ and __hash__ operations."""
+        try:
+            equalVals = self.members.get(value)
+        except TypeError:
+            for item in self.qData:
+                if value == item:
+                    return item
+            return False
+        if equalVals is None:
+            return False
+        return equalVals[0]
 
 
     def __str__(self):
@@ -268,3 +294,376 @@ class PriorityQueue(Queue):
         return val
 
 
+
+class IndexedPriorityQueue(PriorityQueue):
+    """An indexed priority queue is a priority queue that also keeps a dictionary mapping each value
+    to its position in the heap. The dictionary is kept up to date as values walk up and down the heap,
+    so checking whether a value is in the queue takes constant time, and removing a value or changing its
+    priority takes logarithmic time, rather than requiring a scan of the whole heap.
+    The values must implement the __hash__ and __eq__ methods, and the queue holds at most one entry
+    for each value: inserting a value equal to one already in the queue replaces the old entry."""
+
+    def __init__(self, valList=None):
+        """Has one optional input, a list to populate the queue with, which must be a list of tuples,
+        where each tuple contains a value and that value's priority."""
+        self.positions = {}
+        PriorityQueue.__init__(self, valList)
+
+
+    def insert(self, value, priority):
+        """Inserts a new value into the queue with the given priority. If an equal value is
+        already in the queue, then that entry is removed first."""
+        if value in self.positions:
+            self.removeValue(value)
+        self.qData.append((value, priority))
+        self.positions[value] = self.size
+        self.size = self.size + 1
+        self._walkUp(self.size - 1)
+
+
+    def delete(self):
+        """Removes the first element from the queue, returning it as its value, or returning None if
+        the queue is already empty."""
+        if self.size == 0:
+            return None
+        poppedElement = self.qData[0]
+        del self.positions[poppedElement[0]]
+        self.size = self.size - 1
+        lastItem = self.qData.pop(self.size)
+        if self.size > 0:
+            self._place(0, lastItem)
+            self._walkDown(0)
+        return poppedElement
+
+
+    def _place(self, index, item):
+        """A private method, puts an item at the given position in the heap and records that
+        position in the positions dictionary."""
+        self.qData[index] = item
+        self.positions[item[0]] = index
+
+
+    def _walkUp(self, index):
+        """Walk a value up the heap until it is larger than its parent, updating the positions
+        dictionary for every value that moves. Returns the final position of the value."""
+        curr = self.qData[index]
+        while index > 0:
+            parentIndex = self._parent(index)
+            par = self.qData[parentIndex]
+            if curr[1] >= par[1]:
+                break
+            self._place(index, par)
+            index = parentIndex
+        self._place(index, curr)
+        return index
+
+
+    def _walkDown(self, index):
+        """A private method, walks a value down the tree until it is smaller than both its children,
+        updating the positions dictionary for every value that moves."""
+        curr = self.qData[index]
+        leftInd = self._leftChild(index)
+        while leftInd < self.size:
+            rightInd = leftInd + 1
+            if rightInd < self.size and self.qData[rightInd][1] < self.qData[leftInd][1]:
+                minInd = rightInd
+            else:
+                minInd = leftInd
+            minVal = self.qData[minInd]
+            if curr[1] <= minVal[1]:
+                break
+            self._place(index, minVal)
+            index = minInd
+            leftInd = self._leftChild(index)
+        self._place(index, curr)
+
+
+    def update(self, value, newP):
+        """Update finds the given value in the queue, changes its priority value, and then moves it
+        up or down the tree as appropriate (this is the "decrease-key" operation when the priority drops)."""
+        pos = self._findValue(value)
+        if pos < 0:
+            print("Value not found:", value)
+            return
+        self.qData[pos] = (self.qData[pos][0], newP)
+        if self._walkUp(pos) == pos:
+            self._walkDown(pos)
+
+
+    def removeValue(self, value):
+        """Takes in a value, finds it using the positions dictionary, and removes it from the queue."""
+        pos = self._findValue(value)
+        if pos < 0:
+            # If value not found
+            print("Value not found:", value)
+            return
+        del self.positions[self.qData[pos][0]]
+        self.size = self.size - 1
+        lastItem = self.qData.pop(self.size)
+        if pos < self.size:
+            # the last item fills the hole, and may need to move either way
+            self._place(pos, lastItem)
+            if self._walkUp(pos) == pos:
+                self._walkDown(pos)
+
+
+    def _findValue(self, value):
+        """Find the position of a value in the priority queue, or -1 if it is not there."""
+        return self.positions.get(value, -1)
+
+
+
+class LazyPriorityQueue(Queue):
+    """A lazy priority queue is a priority queue built on Python's heapq module. Instead of moving
+    an entry when its priority changes, it pushes a new entry and remembers, in a table of live entries,
+    which entry is the current one for each value. Entries that are no longer live are simply discarded
+    when they reach the top of the heap. Each entry carries a counter that increases with every insert,
+    so that ties in priority are broken in insertion order and values are never compared to each other.
+    The values must implement the __hash__ and __eq__ methods, and the queue holds at most one live
+    entry for each value."""
+
+    def __init__(self, valList=None):
+        """Has one optional input, a list to populate the queue with, which must be a list of tuples,
+        where each tuple contains a value and that value's priority."""
+        Queue.__init__(self)
+        self.qData = []
+        self.liveEntries = {}
+        self.counter = 0
+        self.size = 0
+        if valList is not None:
+            for (val, prior) in valList:
+                self.insert(val, prior)
+
+
+    def insert(self, value, priority):
+        """Inserts a new value into the queue with the given priority. If an equal value is
+        already in the queue, then its old entry becomes stale and will be discarded later."""
+        entry = (priority, self.counter, value)
+        self.counter = self.counter + 1
+        if value not in self.liveEntries:
+            self.size = self.size + 1
+        self.liveEntries[value] = entry
+        heapq.heappush(self.qData, entry)
+
+    def enqueue(self, val, priority):
+        """Another name for inserting"""
+        self.insert(val, priority)
+
+
+    def firstElement(self):
+        """Returns the first value in the queue and its priority, as a tuple, without removing it."""
+        self._discardStale()
+        if self.size == 0:
+            return None
+        (priority, count, value) = self.qData[0]
+        return (value, priority)
+
+
+    def delete(self):
+        """Removes the first element from the queue, returning it as a tuple of the value and
+        its priority, or returning None if the queue is already empty."""
+        self._discardStale()
+        if self.size == 0:
+            return None
+        (priority, count, value) = heapq.heappop(self.qData)
+        del self.liveEntries[value]
+        self.size = self.size - 1
+        return (value, priority)
+
+    def dequeue(self):
+        """Another name for deleting, removes the first element from the queue, returning it as its value"""
+        return self.delete()
+
+
+    def _discardStale(self):
+        """A private method, pops entries off the top of the heap until the top one is live."""
+        while self.qData:
+            entry = self.qData[0]
+            if self.liveEntries.get(entry[2]) is entry:
+                return
+            heapq.heappop(self.qData)
+
+
+    def update(self, value, newP):
+        """Changes the priority of the given value by pushing a new entry for it."""
+        entry = self.liveEntries.get(value)
+        if entry is None:
+            print("Value not found:", value)
+        else:
+            self.insert(entry[2], newP)
+
+
+    def contains(self, value):
+        """Takes in a value and looks it up in the table of live entries. If it is there, it returns
+        the stored value, otherwise False."""
+        entry = self.liveEntries.get(value)
+        if entry is None:
+            return False
+        else:
+            return entry[2]
+
+
+    def removeValue(self, value):
+        """Takes in a value and removes it from the queue. Its entry stays in the heap, but is no
+        longer live, so it is discarded when it reaches the top. When stale entries outnumber the
+        live ones, the heap is rebuilt from the live entries alone."""
+        if self.liveEntries.pop(value, None) is None:
+            print("Value not found:", value)
+            return
+        self.size = self.size - 1
+        if len(self.qData) > 2 * self.size + 64:
+            self.qData = list(self.liveEntries.values())
+            heapq.heapify(self.qData)
+
+
+    def __str__(self):
+        """Provides a string with just the first element."""
+        val = "LazyPQueue: "
+        if self.isEmpty():
+            val += "<empty>"
+        else:
+            v, p = self.firstElement()
+            val = val + "priority: " + str(p) + ", value: " + str(v)
+        return val
+
+
+
+class BucketPriorityQueue(Queue):
+    """A bucket priority queue (Dial's algorithm) holds values whose priorities are non-negative integers, in a
+    circular array of buckets, one bucket per priority. It is "monotone": a new priority may not be smaller than
+    the priority most recently removed, and may exceed it by at most maxStep. Those rules hold for uniform-cost
+    search when the step costs are integers no larger than maxStep, and then inserting is constant time and
+    removing is constant time on average, because the search through the buckets only ever moves forward.
+    A priority beyond the end of the buckets makes the array grow. Each bucket is a dictionary, so the values
+    must implement the __hash__ and __eq__ methods, and the queue holds at most one entry for each value."""
+
+    def __init__(self, maxStep, valList=None):
+        """Takes in the largest amount by which a priority can exceed the smallest priority in the queue,
+        and optionally a list to populate the queue with, which must be a list of tuples, where each tuple
+        contains a value and that value's priority."""
+        Queue.__init__(self)
+        self.qData = [{} for i in range(maxStep + 1)]
+        self.priorities = {}
+        self.current = None
+        self.lastRemoved = None
+        self.size = 0
+        if valList is not None:
+            for (val, prior) in valList:
+                self.insert(val, prior)
+
+
+    def insert(self, value, priority):
+        """Inserts a new value into the bucket for its priority. If an equal value is already in the queue,
+        then that entry is removed first. Raises a ValueError if the priority is not an integer, or is
+        smaller than the priority most recently removed."""
+        if value in self.priorities:
+            self.removeValue(value)
+        if type(priority) != int or priority < 0:
+            raise ValueError("Bucket queue priorities must be non-negative integers")
+        if self.current is None:
+            self.current = priority
+        elif priority < self.current:
+            if self.lastRemoved is not None:
+                raise ValueError("Bucket queue priorities must not decrease below the last priority removed")
+            # nothing removed yet, so the buckets can still be shifted down
+            self._grow(len(self.qData) + self.current - priority)
+            self.current = priority
+        if priority - self.current >= len(self.qData):
+            self._grow(priority - self.current + 1)
+        self.qData[priority % len(self.qData)][value] = value
+        self.priorities[value] = priority
+        self.size = self.size + 1
+
+    def enqueue(self, val, priority):
+        """Another name for inserting"""
+        self.insert(val, priority)
+
+
+    def _grow(self, minBuckets):
+        """A private method, replaces the buckets with at least twice as many, and refiles every value."""
+        oldBuckets = self.qData
+        self.qData = [{} for i in range(max(minBuckets, 2 * len(oldBuckets)))]
+        for bucket in oldBuckets:
+            for value in bucket:
+                priority = self.priorities[value]
+                self.qData[priority % len(self.qData)][value] = bucket[value]
+
+
+    def _findFirst(self):
+        """A private method, searches forward from the current position for the first non-empty bucket,
+        and returns its priority. The queue must not be empty."""
+        priority = self.current
+        while not self.qData[priority % len(self.qData)]:
+            priority = priority + 1
+        return priority
+
+
+    def firstElement(self):
+        """Returns the first value in the queue and its priority, as a tuple, without removing it."""
+        if self.size == 0:
+            return None
+        priority = self._findFirst()
+        bucket = self.qData[priority % len(self.qData)]
+        value = next(iter(bucket))
+        return (bucket[value], priority)
+
+
+    def delete(self):
+        """Removes the first element from the queue, returning it as a tuple of the value and
+        its priority, or returning None if the queue is already empty. Values with the same
+        priority come out in the order they were inserted."""
+        if self.size == 0:
+            return None
+        self.current = self._findFirst()
+        self.lastRemoved = self.current
+        bucket = self.qData[self.current % len(self.qData)]
+        value = next(iter(bucket))
+        storedValue = bucket.pop(value)
+        del self.priorities[value]
+        self.size = self.size - 1
+        return (storedValue, self.current)
+
+    def dequeue(self):
+        """Another name for deleting, removes the first element from the queue, returning it as its value"""
+        return self.delete()
+
+
+    def update(self, value, newP):
+        """Moves the given value to the bucket for its new priority."""
+        storedValue = self.contains(value)
+        if storedValue is False:
+            print("Value not found:", value)
+        else:
+            self.removeValue(value)
+            self.insert(storedValue, newP)
+
+
+    def contains(self, value):
+        """Takes in a value and looks in the bucket for its priority. If it is there, it returns
+        the stored value, otherwise False."""
+        priority = self.priorities.get(value)
+        if priority is None:
+            return False
+        else:
+            return self.qData[priority % len(self.qData)][value]
+
+
+    def removeValue(self, value):
+        """Takes in a value and removes it from its bucket."""
+        priority = self.priorities.pop(value, None)
+        if priority is None:
+            print("Value not found:", value)
+            return
+        del self.qData[priority % len(self.qData)][value]
+        self.size = self.size - 1
+
+
+    def __str__(self):
+        """Provides a string with just the first element."""
+        val = "BucketPQueue: "
+        if self.isEmpty():
+            val += "<empty>"
+        else:
+            v, p = self.firstElement()
+            val = val + "priority: " + str(p) + ", value: " + str(v)
+        return val
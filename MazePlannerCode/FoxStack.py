@@ -4,19 +4,28 @@ Susan Fox
 Spring 2007
 Revised Spring 2014 to update style.
 Revised Fall 2018 to match changes to Queue and PriorityQueue classes, adding a "contains" method.
+Revised to keep the top of the stack at the end of the list, with a dictionary of its values, so pushing,
+popping, and contains are all constant time.
 """
 
 class Stack:
     """A stack is a linear collection used to hold qData that is waiting
     for some purpose.  Values are added at one end and removed from the
-    same end, like a stack of plates"""
+    same end, like a stack of plates. The values are kept in a list whose
+    last element is the top, and a dictionary maps each value to the values
+    equal to it in the stack, from bottom to top, so that contains does not
+    have to search the stack. Values that cannot be hashed are allowed, but
+    contains has to search the stack for them."""
 
     def __init__(self, vallist=[]):
         """When creating a new stack, you can give a list of values to
         insert in the stack at the start.  The front of the list becomes
         the top of the stack."""
-        self.data = vallist[:]
-        self.size = len(self.data)
+        self.data = []
+        self.members = {}
+        self.size = 0
+        for i in range(len(vallist) - 1, -1, -1):
+            self.insert(vallist[i])
 
     def getSize(self):
         """Returns the size of the stack"""
@@ -41,13 +50,17 @@ class Stack:
         if self.isEmpty():
             return None
         else:
-            return self.data[0]
+            return self.data[-1]
 
 
     def insert(self, val):
-        """Inserts a new value at the end of the stack."""
-        self.data.insert(0,val)
-        self.size = self.size + 1 
+        """Inserts a new value at the top of the stack."""
+        self.data.append(val)
+        try:
+            self.members.setdefault(val, []).append(val)
+        except TypeError:
+            pass
+        self.size = self.size + 1
 
     def push(self, val):
         """Another name for inserting"""
@@ -56,8 +69,14 @@ class Stack:
 
     def delete(self):
         """Removes the first element from the stack, returning its value."""
-        first = self.data[0]
-        self.data.pop(0)
+        first = self.data.pop()
+        try:
+            equalVals = self.members[first]
+            equalVals.pop()
+            if len(equalVals) == 0:
+                del self.members[first]
+        except TypeError:
+            pass
         self.size = self.size - 1
         return first
 
@@ -67,22 +86,29 @@ class Stack:
 
 
     def contains(self, value):
-        """Given a value, it searches the stack for a matching value, returning it if found, or returning False if not found"""
-        for item in self.data:
-            if item == value:
-                return item
-        return False
+        """Given a value, it looks for a matching value in the stack, returning the one nearest the top if found, or
+        returning False if not found"""
+        try:
+            equalVals = self.members.get(value)
+        except TypeError:
+            for i in range(len(self.data) - 1, -1, -1):
+                if self.data[i] == value:
+                    return self.data[i]
+            return False
+        if equalVals is None:
+            return False
+        return equalVals[-1]
 
 
     def __str__(self):
         """Creates a string containing the qData, just for debugging."""
         stackStr = "Stack: <- "
         if self.size <= 3:
-            for val in self.data:
-                stackStr = stackStr + str(val) + " "
+            for i in range(self.size - 1, -1, -1):
+                stackStr = stackStr + str(self.data[i]) + " "
         else:
             for i in range(3):
-                stackStr = stackStr + str(self.data[i]) + " "
+                stackStr = stackStr + str(self.data[-1 - i]) + " "
             stackStr = stackStr + "..."
         stackStr = stackStr + "]"
         return stackStr
@@ -0,0 +1,362 @@
+"""  =================================================================
+File: HierarchicalPlanner.py
+
+This file contains a hierarchical path planner (HPA*) for large mazes. The
+maze is cut into square clusters. Where two clusters meet, the open cells on
+either side of the border give "entrances", and the cells of the entrances
+become the nodes of a small abstract graph, whose edges are the best paths
+within each cluster. A query searches the abstract graph, and then turns the
+abstract path into the usual 'N', 'E', 'S', 'W' moves.
+ ==================================================================="""
+
+import heapq
+import time
+
+inf = float('inf')
+
+
+class HierarchicalMazePlanner(object):
+    """Plans paths through a MazeInfo with HPA*. The abstract graph is built lazily: the entrances on a border,
+    and the best paths between the entrance cells of a cluster, are only computed the first time a query needs
+    them, and then they are kept. The planner listens to the maze for changed cells, and throws out only what
+    a change affects: the paths within that cell's cluster, plus, if the cell is on a border and the entrances
+    on that border change, the paths within the cluster on the other side.
+    Costs follow the UCSMazeAdvisor convention: a path costs the weight of the start cell plus the weight of each
+    cell it enters. The paths are close to the best ones, but not always the best, because a path can only cross
+    from one cluster to another at an entrance cell."""
+
+    oppositeMoves = {'N': 'S', 'E': 'W', 'S': 'N', 'W': 'E'}
+    deltaMoves = {(-1, 0): 'N', (0, 1): 'E', (1, 0): 'S', (0, -1): 'W'}
+
+    def __init__(self, maze, clusterSize = 10, entranceSpacing = 3):
+        """Takes in the MazeInfo, the number of rows and columns in each cluster, and the most open border cells
+        that share one entrance, and registers with the maze to hear about changed cells. Fewer entrances make
+        the abstract graph smaller and the queries faster, but the paths worse."""
+        if clusterSize < 2:
+            raise ValueError("clusterSize must be at least 2")
+        if entranceSpacing < 1:
+            raise ValueError("entranceSpacing must be at least 1")
+        self.maze = maze
+        self.clusterSize = clusterSize
+        self.entranceSpacing = entranceSpacing
+        self.borderCache = {}
+        self.clusterCache = {}
+        self.numClusterBuilds = 0
+        self.lastQueryTime = None
+        self.nodesVisited = 0
+        self.maze.addChangeListener(self.cellChanged)
+
+    def stopListening(self):
+        """Stops listening to the maze for changes. Call this when the planner is no longer going to be used."""
+        self.maze.removeChangeListener(self.cellChanged)
+
+    def getNumClusterBuilds(self):
+        """Returns how many times the paths within a cluster have been computed"""
+        return self.numClusterBuilds
+
+    def getNumAbstractNodes(self):
+        """Returns the number of entrance cells in the clusters built so far"""
+        return sum(len(nodes) for (nodes, paths) in self.clusterCache.values())
+
+    def getLastQueryTime(self):
+        """Returns the number of seconds the last query took, or None if there has not been one"""
+        return self.lastQueryTime
+
+    def getNodesVisited(self):
+        """Returns the number of abstract nodes expanded by the last query"""
+        return self.nodesVisited
+
+
+    def findPath(self, startPos = None, goalPos = None):
+        """Takes in a start and goal position (by default, the maze's own), and returns a tuple of the cost
+        of the path found and its list of moves, or (None, None) if there is no path."""
+        queryStart = time.perf_counter()
+        if startPos is None:
+            startPos = self.maze.getStartPos()
+        if goalPos is None:
+            goalPos = self.maze.getGoalPos()
+        startPos = tuple(startPos)
+        goalPos = tuple(goalPos)
+        self.nodesVisited = 0
+        if not (self.maze.isAccessible(startPos[0], startPos[1]) and self.maze.isAccessible(goalPos[0], goalPos[1])):
+            self.lastQueryTime = time.perf_counter() - queryStart
+            return (None, None)
+
+        # Connect the start to its cluster's entrances, and everything in the goal's cluster to the goal
+        startLinks = self._linksFromStart(startPos)
+        goalLinks = self._linksToGoal(goalPos)
+        result = self._abstractSearch(startPos, goalPos, startLinks, goalLinks)
+        self.lastQueryTime = time.perf_counter() - queryStart
+        return result
+
+
+    def cellChanged(self, row, col):
+        """This is the change listener: the maze calls it with the row and column of a cell that changed. The
+        paths within that cell's cluster are thrown out. If the cell is on a border, that border's entrances are
+        recomputed, and if they changed, the paths within the cluster across the border are thrown out too."""
+        cluster = self._clusterOf(row, col)
+        self.clusterCache.pop(cluster, None)
+        for (border, otherCluster) in self._bordersOfCell(row, col):
+            if border in self.borderCache:
+                oldEntrances = self.borderCache.pop(border)
+                if self._getEntrances(border) == oldEntrances:
+                    continue
+            self.clusterCache.pop(otherCluster, None)
+
+
+    # ----------------------------------------------------------------
+    # The abstract search
+
+    def _abstractSearch(self, startPos, goalPos, startLinks, goalLinks):
+        """A private helper, runs A* on the abstract graph from the start to the goal, and builds the concrete
+        path from the moves stored on the abstract edges. Returns (cost, moves), or (None, None)."""
+        minWeight = max(self.maze.getMinWeight(), 0)
+        startCost = self.maze.getWeight(startPos[0], startPos[1])
+        bestCosts = {startPos: startCost}
+        parents = {startPos: None}
+        counter = 0
+        heap = [(startCost + self._cityBlock(startPos, goalPos) * minWeight, counter, startPos)]
+        while heap:
+            (priority, c, pos) = heapq.heappop(heap)
+            cost = bestCosts[pos]
+            if priority > cost + self._cityBlock(pos, goalPos) * minWeight:
+                continue    # a stale entry
+            if pos == goalPos:
+                return (cost, self._collectMoves(parents, goalPos))
+            self.nodesVisited += 1
+            for (neigh, edgeCost, moves) in self._abstractEdges(pos, startPos, goalPos, startLinks, goalLinks):
+                newCost = cost + edgeCost
+                if newCost < bestCosts.get(neigh, inf):
+                    bestCosts[neigh] = newCost
+                    parents[neigh] = (pos, moves)
+                    counter += 1
+                    heapq.heappush(heap, (newCost + self._cityBlock(neigh, goalPos) * minWeight, counter, neigh))
+        return (None, None)
+
+    def _abstractEdges(self, pos, startPos, goalPos, startLinks, goalLinks):
+        """A private helper, returns a list of the abstract edges leaving pos, as tuples of the neighbor,
+        the cost, and the list of moves."""
+        edges = []
+        cluster = self._clusterOf(pos[0], pos[1])
+        (nodes, paths) = self._getCluster(cluster)
+        if pos in nodes:
+            edges.extend(paths[pos])
+            for (partner, move) in nodes[pos]:
+                edges.append((partner, self.maze.getWeight(partner[0], partner[1]), [move]))
+        if pos == startPos:
+            edges.extend(startLinks)
+        if pos in goalLinks:
+            (cost, moves) = goalLinks[pos]
+            edges.append((goalPos, cost, moves))
+        return edges
+
+    def _collectMoves(self, parents, goalPos):
+        """A private helper, walks back from the goal through the abstract parents and joins the moves."""
+        pieces = []
+        pos = goalPos
+        while parents[pos] is not None:
+            (pos, moves) = parents[pos]
+            pieces.append(moves)
+        pieces.reverse()
+        allMoves = []
+        for moves in pieces:
+            allMoves.extend(moves)
+        return allMoves
+
+    def _linksFromStart(self, startPos):
+        """A private helper, returns abstract edges from the start to each entrance cell of its cluster."""
+        cluster = self._clusterOf(startPos[0], startPos[1])
+        (nodes, paths) = self._getCluster(cluster)
+        (dists, parents) = self._clusterDijkstra(startPos, self._clusterCells(cluster), False)
+        links = []
+        for node in nodes:
+            if node in dists and node != startPos:
+                links.append((node, dists[node], self._movesFrom(parents, startPos, node)))
+        return links
+
+    def _linksToGoal(self, goalPos):
+        """A private helper, returns a dictionary that maps each cell of the goal's cluster that can reach the
+        goal (within the cluster) to a tuple of the cost and the moves from it to the goal."""
+        cluster = self._clusterOf(goalPos[0], goalPos[1])
+        (dists, towardGoal) = self._clusterDijkstra(goalPos, self._clusterCells(cluster), True)
+        links = {}
+        for pos in dists:
+            if pos != goalPos:
+                moves = []
+                cell = pos
+                while cell != goalPos:
+                    nextCell = towardGoal[cell]
+                    moves.append(self._moveBetween(cell, nextCell))
+                    cell = nextCell
+                links[pos] = (dists[pos], moves)
+        return links
+
+
+    # ----------------------------------------------------------------
+    # Clusters, borders, and entrances
+
+    def _clusterOf(self, row, col):
+        """A private helper, returns the (row, col) index of the cluster containing the cell"""
+        return (row // self.clusterSize, col // self.clusterSize)
+
+    def _clusterBounds(self, cluster):
+        """A private helper, returns the first row, the row past the end, the first column, and the column past
+        the end of the cells in the cluster."""
+        (clRow, clCol) = cluster
+        firstRow = clRow * self.clusterSize
+        firstCol = clCol * self.clusterSize
+        return (firstRow, min(firstRow + self.clusterSize, self.maze.getNumRows()),
+                firstCol, min(firstCol + self.clusterSize, self.maze.getNumCols()))
+
+    def _bordersOfCell(self, row, col):
+        """A private helper, returns a list of (border, otherCluster) pairs for the borders the cell lies on.
+        A border is a pair of clusters, the second one east or south of the first."""
+        cluster = self._clusterOf(row, col)
+        (firstRow, endRow, firstCol, endCol) = self._clusterBounds(cluster)
+        (clRow, clCol) = cluster
+        borders = []
+        if col == endCol - 1 and endCol < self.maze.getNumCols():
+            borders.append(((cluster, (clRow, clCol + 1)), (clRow, clCol + 1)))
+        if col == firstCol and clCol > 0:
+            borders.append((((clRow, clCol - 1), cluster), (clRow, clCol - 1)))
+        if row == endRow - 1 and endRow < self.maze.getNumRows():
+            borders.append(((cluster, (clRow + 1, clCol)), (clRow + 1, clCol)))
+        if row == firstRow and clRow > 0:
+            borders.append((((clRow - 1, clCol), cluster), (clRow - 1, clCol)))
+        return borders
+
+    def _getEntrances(self, border):
+        """A private helper, returns the list of entrances on a border, computing it if it is not cached. Each
+        entrance is a pair of cells, one on each side, that are both open. The open pairs along the border form
+        runs, which are cut into pieces of at most entranceSpacing pairs, and each piece gets one entrance at
+        its cheapest pair to cross, so that paths through cheap valleys are not missed."""
+        if border in self.borderCache:
+            return self.borderCache[border]
+        (first, second) = border
+        (firstRow, endRow, firstCol, endCol) = self._clusterBounds(first)
+        if second[1] > first[1]:    # second cluster is to the east
+            pairs = [((row, endCol - 1), (row, endCol)) for row in range(firstRow, endRow)]
+        else:                       # second cluster is to the south
+            pairs = [((endRow - 1, col), (endRow, col)) for col in range(firstCol, endCol)]
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self.maze.isAccessible(pair[0][0], pair[0][1]) and \
+                    self.maze.isAccessible(pair[1][0], pair[1][1]):
+                run.append(pair)
+            elif run:
+                numPieces = -(-len(run) // self.entranceSpacing)
+                for i in range(numPieces):
+                    piece = run[len(run) * i // numPieces:len(run) * (i + 1) // numPieces]
+                    entrances.append(min(piece, key=self._crossingCost))
+                run = []
+        self.borderCache[border] = entrances
+        return entrances
+
+    def _crossingCost(self, pair):
+        """A private helper, returns the cost of crossing a border at a pair of cells, both ways"""
+        ((rowA, colA), (rowB, colB)) = pair
+        return self.maze.getWeight(rowA, colA) + self.maze.getWeight(rowB, colB)
+
+    def _getCluster(self, cluster):
+        """A private helper, returns a tuple of two dictionaries for the cluster, computing them if they are not
+        cached. The first maps each entrance cell to a list of (partner cell, move) pairs for the cells across the
+        border it connects to. The second maps each entrance cell to a list of abstract edges, (other entrance
+        cell, cost, moves), for the best paths within the cluster to the other entrance cells."""
+        if cluster in self.clusterCache:
+            return self.clusterCache[cluster]
+        (clRow, clCol) = cluster
+        nodes = {}
+        for other in [(clRow - 1, clCol), (clRow + 1, clCol), (clRow, clCol - 1), (clRow, clCol + 1)]:
+            if other[0] < 0 or other[1] < 0:
+                continue
+            border = (min(cluster, other), max(cluster, other))
+            if self.maze.isOutOfBounds(other[0] * self.clusterSize, other[1] * self.clusterSize):
+                continue
+            for (cellA, cellB) in self._getEntrances(border):
+                if border[0] == cluster:
+                    (mine, theirs) = (cellA, cellB)
+                else:
+                    (mine, theirs) = (cellB, cellA)
+                nodes.setdefault(mine, []).append((theirs, self._moveBetween(mine, theirs)))
+        # The best path back along a path is the same path reversed, and its cost only differs in which end's
+        # weight is counted, so each search only has to reach the entrance cells after its own in the list
+        cellWeights = self._clusterCells(cluster)
+        nodeList = list(nodes)
+        paths = {node: [] for node in nodeList}
+        for i in range(len(nodeList) - 1):
+            node = nodeList[i]
+            (dists, parents) = self._clusterDijkstra(node, cellWeights, False, set(nodeList[i + 1:]))
+            for other in nodeList[i + 1:]:
+                if other in dists:
+                    moves = self._movesFrom(parents, node, other)
+                    backCost = dists[other] - cellWeights[other] + cellWeights[node]
+                    backMoves = [self.oppositeMoves[move] for move in reversed(moves)]
+                    paths[node].append((other, dists[other], moves))
+                    paths[other].append((node, backCost, backMoves))
+        self.clusterCache[cluster] = (nodes, paths)
+        self.numClusterBuilds += 1
+        return (nodes, paths)
+
+    def _clusterCells(self, cluster):
+        """A private helper, returns a dictionary that maps each open cell of the cluster to its weight. The
+        searches inside a cluster use this instead of asking the maze about each cell again and again."""
+        (firstRow, endRow, firstCol, endCol) = self._clusterBounds(cluster)
+        cellWeights = {}
+        for row in range(firstRow, endRow):
+            for col in range(firstCol, endCol):
+                if self.maze.isAccessible(row, col):
+                    cellWeights[row, col] = self.maze.getWeight(row, col)
+        return cellWeights
+
+    def _clusterDijkstra(self, source, cellWeights, reverse, targets = None):
+        """A private helper, runs Dijkstra's algorithm from the source, staying on the open cells of a cluster,
+        given by cellWeights. Going forward, entering a cell costs its weight, and it returns the costs and each
+        cell's parent. With reverse set to True, it finds the cost from each cell to the source instead, and
+        returns the costs and, for each cell, the next cell on its way to the source. If a set of target cells is
+        given, it stops once all of them are settled, and only the targets' costs are sure to be final."""
+        dists = {source: 0}
+        links = {source: None}
+        heap = [(0, source)]
+        while heap:
+            (cost, pos) = heapq.heappop(heap)
+            if cost > dists[pos]:
+                continue
+            if targets is not None:
+                targets.discard(pos)
+                if not targets:
+                    break
+            (row, col) = pos
+            leaveCost = cost + cellWeights[pos]
+            for neigh in ((row - 1, col), (row, col + 1), (row + 1, col), (row, col - 1)):
+                if neigh not in cellWeights:
+                    continue
+                if reverse:
+                    newCost = leaveCost
+                else:
+                    newCost = cost + cellWeights[neigh]
+                if newCost < dists.get(neigh, inf):
+                    dists[neigh] = newCost
+                    links[neigh] = pos
+                    heapq.heappush(heap, (newCost, neigh))
+        return (dists, links)
+
+    def _movesFrom(self, parents, source, target):
+        """A private helper, returns the list of moves from source to target, using the parents
+        found by a forward search from source."""
+        moves = []
+        pos = target
+        while pos != source:
+            parent = parents[pos]
+            moves.append(self._moveBetween(parent, pos))
+            pos = parent
+        moves.reverse()
+        return moves
+
+    def _moveBetween(self, fromPos, toPos):
+        """A private helper, returns the move that leads from one cell to the next one"""
+        return self.deltaMoves[toPos[0] - fromPos[0], toPos[1] - fromPos[1]]
+
+    def _cityBlock(self, pos, otherPos):
+        """A private helper, returns the city-block distance between two cells"""
+        return abs(pos[0] - otherPos[0]) + abs(pos[1] - otherPos[1])
@@ -0,0 +1,279 @@
+"""  =================================================================
+File: IncrementalPlanner.py
+
+This file contains an incremental planner for the grid world, using
+Lifelong Planning A* (LPA*). Unlike the search solvers, it keeps what it
+learned between searches: it listens to its MazeInfo for changed cells, and
+the next search only repairs the part of the search the changes affect.
+ ==================================================================="""
+
+import time
+
+from FoxQueue import IndexedPriorityQueue
+from MazeStateAdvisors import MazeState
+
+inf = float('inf')
+
+
+class LPAStarPlanner(object):
+    """Plans paths through a maze with LPA*. Every cell has a g value, the cost of the best path to it found so
+    far, and an rhs value, a one-step lookahead computed from the g values of its neighbors. A cell is consistent
+    when the two are equal; the fringe holds exactly the inconsistent cells, ordered like A* by min(g, rhs) plus
+    the heuristic. When a cell changes, only its own rhs and its neighbors' rhs values are recomputed, so a search
+    after a small edit only expands the cells whose costs really changed.
+    Costs follow the UCSMazeAdvisor convention: a path costs the weight of the start cell plus the weight of each
+    cell it enters. The heuristic is the city-block distance to the goal times the smallest weight in the maze.
+    The planner follows the same stepping protocol as the search solvers, so the GUI can animate it: call
+    initSearch, then call searchStep until it returns "Done" or "Fail", or call searchLoop. After the maze is
+    edited, call initSearch again to repair the plan. If the start or goal has moved, the planner starts over."""
+
+    moveDeltas = {'N': (-1, 0), 'E': (0, 1), 'S': (1, 0), 'W': (0, -1)}
+
+    def __init__(self, maze):
+        """Takes in the MazeInfo to plan in, and registers with it to hear about changed cells."""
+        self.maze = maze
+        self.startPos = None
+        self.goalPos = None
+        self.gValues = None
+        self.rhsValues = None
+        self.fringe = None
+        self.visited = None
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
+        self.maze.addChangeListener(self.cellChanged)
+
+    def stopListening(self):
+        """Stops listening to the maze for changes. Call this when the planner is no longer going to be used."""
+        self.maze.removeChangeListener(self.cellChanged)
+
+    def _initializeCounts(self):
+        """A private helper to initialize the counts, since they need to be initialized anew each time
+        a search starts"""
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+
+    def getNodesCreated(self):
+        """Returns the number of times a cell was added to the fringe in this search"""
+        return self.nodesCreated
+
+    def getNodesVisited(self):
+        """Returns the number of cells expanded in this search"""
+        return self.nodesVisited
+
+    def getReopenCount(self):
+        """Returns the number of times in this search a cell's cost went up and its g value had to be reset"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times in this search a cell already on the fringe got a new priority"""
+        return self.decreaseKeyCount
+
+    def getPathCost(self):
+        """Returns the cost of the best path to the goal known so far, or infinity if there is none"""
+        return self._getG(self.goalPos)
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
+
+    def initSearch(self):
+        """Gets ready for a search. If this is the first search, or the start or goal has moved, this starts
+        over with empty tables. Otherwise it keeps the tables from the last search, which were already brought
+        up to date as cells changed."""
+        self._initializeCounts()
+        startPos = tuple(self.maze.getStartPos())
+        goalPos = tuple(self.maze.getGoalPos())
+        if self.gValues is None or startPos != self.startPos or goalPos != self.goalPos:
+            self.startPos = startPos
+            self.goalPos = goalPos
+            self.gValues = {}
+            self.rhsValues = {}
+            self.visited = self.gValues
+            self.fringe = IndexedPriorityQueue()
+            self._updateCell(self.startPos)
+
+
+    def cellChanged(self, row, col):
+        """This is the change listener: the maze calls it with the row and column of a cell whose weight changed
+        or that was blocked or unblocked. The cost of entering that cell changed, and if it was blocked or
+        unblocked, so did the cost of leaving it, so this recomputes the rhs values of the cell and its neighbors."""
+        if self.gValues is None:
+            return
+        self._updateCell((row, col))
+        for (dRow, dCol) in self.moveDeltas.values():
+            self._updateCell((row + dRow, col + dCol))
+
+
+    def searchLoop(self):
+        """This method runs the search, repeatedly calling for the next step until either
+        the search fails and False is returned, or the search completes and the goal state is returned"""
+        while True:
+            (nextState, neighbors, isDone) = self.searchStep()
+            if isDone == "Fail":
+                return False
+            elif isDone == "Done":
+                return nextState
+
+
+    def searchStep(self):
+        """Performs one step of the search: it expands the cell at the front of the fringe, and updates its
+        neighbors. It returns three values: a state for the cell expanded, states for the neighbors put on the
+        fringe, and a status message, "Not Done" for a normal step. Once no cell on the fringe can change the
+        path to the goal, it returns a state for the goal, whose path is the best path, and "Done", or if there
+        is no path, it returns "Fail".
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
+        goalKey = self._calcKey(self.goalPos)
+        if self.fringe.isEmpty() or (self.fringe.firstElement()[1] >= goalKey and
+                                     self._getRhs(self.goalPos) == self._getG(self.goalPos)):
+            goalCost = self._getG(self.goalPos)
+            if goalCost == inf:
+                return (False, False, "Fail")
+            (goalRow, goalCol) = self.goalPos
+            return (MazeState(goalRow, goalCol, self._extractPath(), goalCost), [], "Done")
+
+        (pos, key) = self.fringe.delete()
+        self.nodesVisited += 1
+        gVal = self._getG(pos)
+        rhsVal = self._getRhs(pos)
+        newNeighbors = []
+        if gVal > rhsVal:
+            # overconsistent: its cost went down, so it is settled, as in A*, and can only lower its neighbors' rhs
+            self.gValues[pos] = rhsVal
+            for neigh in self._neighbors(pos):
+                if self._lowerRhs(neigh, rhsVal + self.maze.getWeight(neigh[0], neigh[1])):
+                    newNeighbors.append(MazeState(neigh[0], neigh[1], None, self._calcKey(neigh)[0]))
+        else:
+            # underconsistent: its cost went up, so forget it and let its neighbors find a new cost for it
+            self.gValues[pos] = inf
+            self.reopenCount += 1
+            self._updateCell(pos)
+            for neigh in self._neighbors(pos):
+                if self._updateCell(neigh):
+                    newNeighbors.append(MazeState(neigh[0], neigh[1], None, self._calcKey(neigh)[0]))
+        (row, col) = pos
+        return (MazeState(row, col, None, key[0]), newNeighbors, "Not Done")
+
+
+    def _updateCell(self, pos):
+        """A private helper, recomputes the rhs value of a cell from its neighbors, and then puts it on the fringe
+        if it is inconsistent, or takes it off if it is consistent. Returns True if it is now on the fringe."""
+        (row, col) = pos
+        if self.maze.isOutOfBounds(row, col):
+            return False
+        if not self.maze.isAccessible(row, col):
+            rhsVal = inf
+        elif pos == self.startPos:
+            rhsVal = self.maze.getWeight(row, col)
+        else:
+            bestG = inf
+            for neigh in self._neighbors(pos):
+                neighG = self.gValues.get(neigh, inf)
+                if neighG < bestG:
+                    bestG = neighG
+            rhsVal = bestG + self.maze.getWeight(row, col)
+        if rhsVal == inf:
+            self.rhsValues.pop(pos, None)
+        else:
+            self.rhsValues[pos] = rhsVal
+
+        onFringe = self.fringe.contains(pos)
+        if self._getG(pos) != rhsVal:
+            if onFringe is False:
+                self.nodesCreated += 1
+            else:
+                self.decreaseKeyCount += 1
+            self.fringe.insert(pos, self._calcKey(pos))
+            return True
+        elif onFringe is not False:
+            self.fringe.removeValue(pos)
+        return False
+
+
+    def _lowerRhs(self, pos, newRhs):
+        """A private helper, for when a neighbor of the given cell has just been settled. If the path through
+        that neighbor, costing newRhs, is better than the cell's rhs value, then this lowers the rhs value and
+        puts the cell on the fringe. This gives the same result as _updateCell without looking at all the
+        neighbors. Returns True if the cell was put on the fringe."""
+        if pos == self.startPos or newRhs >= self._getRhs(pos):
+            return False
+        self.rhsValues[pos] = newRhs
+        onFringe = self.fringe.contains(pos)
+        if self._getG(pos) == newRhs:
+            if onFringe is not False:
+                self.fringe.removeValue(pos)
+            return False
+        if onFringe is False:
+            self.nodesCreated += 1
+        else:
+            self.decreaseKeyCount += 1
+        self.fringe.insert(pos, self._calcKey(pos))
+        return True
+
+
+    def _neighbors(self, pos):
+        """A private helper, returns a list of the accessible cells next to the given one."""
+        (row, col) = pos
+        neighs = []
+        for (dRow, dCol) in self.moveDeltas.values():
+            if self.maze.isAccessible(row + dRow, col + dCol):
+                neighs.append((row + dRow, col + dCol))
+        return neighs
+
+
+    def _extractPath(self):
+        """A private helper, builds the list of moves for the best path by starting at the goal and
+        repeatedly stepping back to the neighbor with the smallest g value, until it reaches the start."""
+        moves = []
+        pos = self.goalPos
+        while pos != self.startPos:
+            (row, col) = pos
+            bestMove = None
+            bestG = inf
+            for (move, (dRow, dCol)) in self.moveDeltas.items():
+                neigh = (row - dRow, col - dCol)
+                neighG = self.gValues.get(neigh, inf)
+                if neighG < bestG and self.maze.isAccessible(neigh[0], neigh[1]):
+                    bestMove = move
+                    bestG = neighG
+            moves.append(bestMove)
+            pos = (row - self.moveDeltas[bestMove][0], col - self.moveDeltas[bestMove][1])
+        moves.reverse()
+        return moves
+
+
+    def _calcKey(self, pos):
+        """A private helper, computes the priority of a cell on the fringe: the smaller of its g and rhs values
+        plus the heuristic, with the smaller of g and rhs alone to break ties."""
+        best = min(self._getG(pos), self._getRhs(pos))
+        return (best + self._calcDistToGoal(pos), best)
+
+    def _calcDistToGoal(self, pos):
+        """A private helper, computes the city-block distance to the goal, times the smallest weight
+        any cell can have, so that it never overestimates."""
+        (row, col) = pos
+        dist = abs(row - self.goalPos[0]) + abs(col - self.goalPos[1])
+        return dist * max(self.maze.getMinWeight(), 0)
+
+    def _getG(self, pos):
+        """A private helper, returns the g value of a cell, infinity if it has none"""
+        return self.gValues.get(pos, inf)
+
+    def _getRhs(self, pos):
+        """A private helper, returns the rhs value of a cell, infinity if it has none"""
+        return self.rhsValues.get(pos, inf)
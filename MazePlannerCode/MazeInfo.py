@@ -3,38 +3,63 @@ File: MazeInfo.py
 
 This file contains a class to represent the kind of maze being solved.  
 It really just keeps track of the maze information, and checks if a given
-cell is clear or filled.
+cell is clear or filled. It also contains CompactMazeInfo, which stores the
+same information in flat arrays, for large mazes.
+
+Besides the text format, mazes can be saved in a binary format: a header
+giving the size, the min and max costs, and the start and goal, followed by
+the weights as 32-bit ints in row-major order, and then a bitmap with one bit
+per cell that is set for blocked cells. A CompactMazeInfo opens these files
+with mmap, using the file contents in place rather than copying them.
  ==================================================================="""
 
+import mmap
+import os
 import random
+import struct
+import sys
+from array import array
 from FoxQueue import Queue
 
 
+_HEADER_FORMAT = '<4sIIIiiiiii'
+_MAGIC = b'MAZB'
+_VERSION = 1
+
+
 class MazeInfo:
     """Represents a square grid maze.  You can set it up and then ask about
     which cells are open or filled"""
 
 
-    def __init__(self, mode, reqInput, numCols = None, startPos = (-1, -1), goalPos = (-1, -1), percBlocked = 0.0):
+    def __init__(self, mode, reqInput, numCols = None, startPos = (-1, -1), goalPos = (-1, -1), percBlocked = 0.0,
+                 seed = None):
         """Two inputs are required, all others are optional. First required input is mode, which tells how to make the
         MazeInfo. If reading from a file, then the second required input is the filename. If generating, then the second required
         input is the number of rows. If copying, then the second required is another MazeInfo object.
         Inputs:
-        * mode tells how to make the MazeInfo. Values include 'file' to read from a file, 'gen-flat' or 'gen-hilly'
-        to generate flat or hilly terrain, 'copy' to copy.
+        * mode tells how to make the MazeInfo. Values include 'file' to read from a text file, 'binary' to read
+        from a binary file, 'gen-flat' or 'gen-hilly' to generate flat or hilly terrain, 'gen-hilly-fast' to generate
+        hilly terrain quickly for large mazes, 'copy' to copy.
         * reqInput is the minimum required input, either filename, number of rows, or MazeInfo object
         * numCols is the number of columns. If no numCols is given, then maze is made square
         * robotPos is the starting position, if known. If not, then (-1, -1) is written to file
         * goalPos is the goal position, if known. If not given, then (-1, -1) is written to file
         * percBlocked is the percentage of randomly-scattered locations that are blocked off and cannot be visited
+        * seed is the seed for the random number generator used to generate a maze, so the same maze can be made again
         """
+        self.rng = random.Random(seed)
+        self.changeListeners = []
         if type(mode) != str:
-            raise ValueError("First input must be a string, one of 'file', 'gen-flat', 'gen-hilly', or 'copy")
+            raise ValueError("First input must be a string, one of 'file', 'binary', 'gen-flat', 'gen-hilly', " +
+                             "'gen-hilly-fast', or 'copy")
         elif mode == 'file':  # ignores all other inputs
             self._readMaze(reqInput)
+        elif mode == 'binary':  # ignores all other inputs
+            self._readBinaryMaze(reqInput)
         elif mode == 'copy':
             print("Copying not implemented yet")
-        elif mode in {'gen-hilly', 'gen-flat'}:
+        elif mode in {'gen-hilly', 'gen-hilly-fast', 'gen-flat'}:
             self.numRows = reqInput
             if numCols == None:
                 self.numCols = self.numRows
@@ -44,15 +69,31 @@ class MazeInfo:
             self.startPos = startPos
             self.goalPos = goalPos
             self.percBlocked = percBlocked
-            self.blockedLocs = set()
-            self.weightMatrix = {}
+            self.blockedLocs = self._makeBlockedStorage()
+            self.weightMatrix = self._makeWeightStorage()
 
             if mode == 'gen-hilly':
                 self.generateHillyLandscape()
+            elif mode == 'gen-hilly-fast':
+                self.generateFastHillyLandscape()
             else:
                 self.generateFlatLandscape()
 
 
+    def _makeWeightStorage(self):
+        """Creates and returns the container that maps each (row, col) to its weight. For this class
+        it is a dictionary, subclasses may override this to store the weights differently. The
+        number of rows and columns must be set before this is called."""
+        return {}
+
+
+    def _makeBlockedStorage(self):
+        """Creates and returns the container that holds the (row, col) of each blocked cell. For this
+        class it is a set, subclasses may override this to store the blocked cells differently. The
+        number of rows and columns must be set before this is called."""
+        return set()
+
+
     def generateFlatLandscape(self):
         """Generates a flat landscape of the specified size. All cells have weight = 1"""
         self.minCost = 1
@@ -78,12 +119,87 @@ class MazeInfo:
         # self._printMaze()
 
 
+    def generateFastHillyLandscape(self):
+        """Generates a hilly landscape like generateHillyLandscape does, but much faster, for large mazes. The high
+        points are placed the same way. Instead of flood-filling outward one cell at a time, it finds the distance
+        (in 8-neighbor steps) from every cell to the nearest high point, and computes each weight from that
+        distance, as a random value around an average for that distance. The averages and the amount of noise
+        were measured from mazes made by the flood fill, so the terrain has the same shape, with weights falling
+        to the minimum within a few cells of each peak."""
+        self.minCost = 1
+        self.maxCost = 50
+
+        self._initializeBlocks()
+        self._initializeMaxPoints()
+        # (average, noise) for cells 1, 2, 3, and 4 steps from a peak, as fractions of the max cost
+        levels = [None, (0.5, 0.33), (0.25, 0.31), (0.09, 0.16), (0.04, 0.08)]
+        distances = self._distancesToPeaks(len(levels))
+
+        numCells = self.numRows * self.numCols
+        newWeights = array('i', [0]) * numCells
+        for index in range(numCells):
+            dist = distances[index]
+            if dist == 0:
+                newWeights[index] = self.weightMatrix[divmod(index, self.numCols)]
+            elif dist >= len(levels):
+                newWeights[index] = self.minCost
+            else:
+                (mean, spread) = levels[dist]
+                value = int(self.maxCost * (mean + spread * (2 * self.rng.random() - 1)))
+                newWeights[index] = min(max(value, self.minCost), self.maxCost)
+        if isinstance(self.weightMatrix, GridWeights):
+            self.weightMatrix = GridWeights(self.numRows, self.numCols, newWeights)
+        else:
+            for index in range(numCells):
+                self.weightMatrix[divmod(index, self.numCols)] = newWeights[index]
+
+
+    def _distancesToPeaks(self, maxDist):
+        """Computes the number of 8-neighbor steps from each cell to the nearest cell that has a weight (the high
+        points), up to maxDist, and returns them as a bytearray with one entry per cell in row-major order. Cells
+        farther away than maxDist get maxDist. The grid is held as one big integer with a bit per cell, plus a
+        spare bit at the end of each row so that shifting the bits sideways cannot wrap around into the next row.
+        Each step grows the cells found so far by one cell in every direction, which takes a few shifts."""
+        stride = self.numCols + 1
+        rowBits = (1 << self.numCols) - 1
+        inGrid = 0
+        for row in range(self.numRows):
+            inGrid |= rowBits << (row * stride)
+        found = 0
+        for (row, col) in self.weightMatrix:
+            found |= 1 << (row * stride + col)
+
+        distances = bytearray([maxDist]) * (self.numRows * self.numCols)
+        self._setDistances(distances, found, stride, 0)
+        for dist in range(1, maxDist):
+            grown = (found | (found << 1) | (found >> 1)) & inGrid
+            grown = (grown | (grown << stride) | (grown >> stride)) & inGrid
+            if grown == found:
+                break
+            self._setDistances(distances, grown & ~found, stride, dist)
+            found = grown
+        return distances
+
+
+    def _setDistances(self, distances, cellBits, stride, dist):
+        """A helper for _distancesToPeaks, takes in the distances bytearray, a big integer with the bits set for
+        some cells, the number of bits per row, and a distance. It sets the distance of each of those cells."""
+        bitString = bin(cellBits)[:1:-1]
+        pos = bitString.find('1')
+        while pos >= 0:
+            (row, col) = divmod(pos, stride)
+            distances[row * self.numCols + col] = dist
+            pos = bitString.find('1', pos + 1)
+
+
     def _initializeBlocks(self):
         """This initializes generates random locations for blocked cells, ones the agent cannot enter. The number of
         cells is computed based on the self.percBlocked instance variable, and the values at those locations are set to -1."""
         numPts = self._percentageOfGrid(self.percBlocked)
         pointList = self._generateRandomPoints(numPts)
-        self.blockedLocs = set(pointList)
+        self.blockedLocs = self._makeBlockedStorage()
+        for (row, col) in pointList:
+            self.blockedLocs.add( (row, col) )
 
 
     def _initializeMaxPoints(self):
@@ -94,8 +210,8 @@ class MazeInfo:
         numPts = self._percentageOfGrid(0.05)         # 5% of the grid will be peaks
         pointList = self._generateRandomPoints(numPts)
         for (row, col) in pointList:
-            eightyPerc = 4 * self.maxCost / 5
-            maxPtValue = random.randrange(eightyPerc, (self.maxCost + 1))
+            eightyPerc = 4 * self.maxCost // 5
+            maxPtValue = self.rng.randrange(eightyPerc, (self.maxCost + 1))
             self.weightMatrix[row, col] = maxPtValue
 
 
@@ -115,8 +231,8 @@ class MazeInfo:
             row = -1
             col = -1
             while True:
-                row = random.randrange(self.numRows)
-                col = random.randrange(self.numCols)
+                row = self.rng.randrange(self.numRows)
+                col = self.rng.randrange(self.numCols)
                 if (row, col) not in self.weightMatrix:
                     break
             chosenOnes.append( (row, col) )
@@ -173,8 +289,8 @@ class MazeInfo:
             if (r, c) in self.weightMatrix:
                 vals.append(self.weightMatrix[r, c])
         avgVal = sum(vals) / len(vals)
-        minDelta = -2 * self.maxCost / 5
-        delta = random.randint(minDelta, 1)
+        minDelta = -2 * self.maxCost // 5
+        delta = self.rng.randint(minDelta, 1)
         value = int(avgVal + delta)
         value = min(value, self.maxCost)
         value = max(value, self.minCost)
@@ -230,6 +346,20 @@ class MazeInfo:
         return self.minCost
 
 
+    def hasUniformWeights(self):
+        """Returns True if every open (not blocked) cell has the same weight, and False otherwise"""
+        firstWeight = None
+        for row in range(self.numRows):
+            for col in range(self.numCols):
+                if not self.isBlocked(row, col):
+                    weight = self.weightMatrix[row, col]
+                    if firstWeight is None:
+                        firstWeight = weight
+                    elif weight != firstWeight:
+                        return False
+        return True
+
+
     def getStartPos(self):
         """Returns the current starting position"""
         return self.startPos
@@ -271,12 +401,15 @@ class MazeInfo:
             return
         else:
 
+            oldVal = self.weightMatrix.get((row, col))
             if newVal > self.maxCost:
                 self.weightMatrix[row, col] = self.maxCost
             elif newVal < self.minCost:
                 self.weightMatrix[row, col] = self.minCost
             else:
                 self.weightMatrix[row, col] = newVal
+            if self.weightMatrix[row, col] != oldVal:
+                self._notifyChange(row, col)
 
 
     def increaseWeight(self, row, col):
@@ -299,7 +432,9 @@ class MazeInfo:
 
     def addBlocked(self, row, col):
         """Adds (row, col) to the blocked set"""
-        self.blockedLocs.add( (row, col) )
+        if (row, col) not in self.blockedLocs:
+            self.blockedLocs.add( (row, col) )
+            self._notifyChange(row, col)
 
 
     def delBlocked(self, row, col):
@@ -308,6 +443,27 @@ class MazeInfo:
             self.blockedLocs.remove( (row, col) )
         except:
             pass
+        else:
+            self._notifyChange(row, col)
+
+
+    def addChangeListener(self, listener):
+        """Takes in a function (or other callable) that takes a row and column. From now on, it is called
+        with the row and column of each cell whose weight changes or that becomes blocked or unblocked, so
+        that planners that keep information about the maze can update it."""
+        self.changeListeners.append(listener)
+
+
+    def removeChangeListener(self, listener):
+        """Takes in a function given to addChangeListener, and stops calling it when cells change."""
+        if listener in self.changeListeners:
+            self.changeListeners.remove(listener)
+
+
+    def _notifyChange(self, row, col):
+        """A private helper, calls each change listener with the row and column of a cell that changed."""
+        for listener in self.changeListeners:
+            listener(row, col)
 
 
     def writeGridToFile(self, gridFile):
@@ -340,17 +496,107 @@ class MazeInfo:
         filObj.close()
 
 
+    def writeGridToBinaryFile(self, gridFile):
+        """Takes a filename and writes the grid qData to the file, in the binary format described at the top of
+        this file. The weights and blocked cells are copied out before anything is written, and the file is
+        written under a temporary name and then renamed, because a maze read from a binary file reads its
+        cells from a mapping of that file, and it may be saved back to the same file."""
+        numCells = self.numRows * self.numCols
+        header = struct.pack(_HEADER_FORMAT, _MAGIC, _VERSION, self.numRows, self.numCols,
+                             self.minCost, self.maxCost, self.startPos[0], self.startPos[1],
+                             self.goalPos[0], self.goalPos[1])
+        if isinstance(self.weightMatrix, GridWeights):
+            weights = array('i', self.weightMatrix.cells)
+        else:
+            weights = array('i', [0]) * numCells
+            for r in range(self.numRows):
+                for c in range(self.numCols):
+                    weights[r * self.numCols + c] = self.weightMatrix[r, c]
+        if sys.byteorder == 'big':
+            weights.byteswap()
+        blockedBits = bytearray((numCells + 7) // 8)
+        for (r, c) in self.blockedLocs:
+            if not self.isOutOfBounds(r, c):
+                index = r * self.numCols + c
+                blockedBits[index >> 3] |= 1 << (index & 7)
+
+        tempFile = str(gridFile) + ".tmp" + str(os.getpid())
+        try:
+            filObj = open(tempFile, 'wb')
+        except:
+            raise FileExistsError("ERROR OPENING FILE, ABORTING")
+        try:
+            with filObj:
+                filObj.write(header)
+                weights.tofile(filObj)
+                filObj.write(blockedBits)
+            os.replace(tempFile, gridFile)
+        finally:
+            if os.path.exists(tempFile):
+                os.remove(tempFile)
+
+
+    def _readBinaryMaze(self, mapFile):
+        """Takes in a filename for a binary grid-map file, reads the header, and maps the rest of the file
+        into memory. The mapping is copy-on-write, so changes to the maze never reach the file. The weights
+        and blocked cells are then handed to _loadBinaryCells."""
+        try:
+            filObj = open(mapFile, 'rb')
+        except:
+            raise FileExistsError("ERROR READING FILE, ABORTING")
+        with filObj:
+            headerSize = struct.calcsize(_HEADER_FORMAT)
+            header = filObj.read(headerSize)
+            if len(header) != headerSize:
+                raise ValueError("Not a binary maze file: " + str(mapFile))
+            (magic, version, hgt, wid, minc, maxc, startRow, startCol, goalRow, goalCol) = \
+                struct.unpack(_HEADER_FORMAT, header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Not a binary maze file, or an unknown version: " + str(mapFile))
+            numCells = hgt * wid
+            weightSize = 4 * numCells
+            if headerSize + weightSize + (numCells + 7) // 8 > os.fstat(filObj.fileno()).st_size:
+                raise ValueError("Binary maze file is truncated: " + str(mapFile))
+            self.mazeBuffer = mmap.mmap(filObj.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.numRows = hgt
+        self.numCols = wid
+        self.minCost = minc
+        self.maxCost = maxc
+        self.startPos = (startRow, startCol)
+        self.goalPos = (goalRow, goalCol)
+        buffer = memoryview(self.mazeBuffer)
+        weightBytes = buffer[headerSize:headerSize + weightSize]
+        blockedBytes = buffer[headerSize + weightSize:headerSize + weightSize + (numCells + 7) // 8]
+        self._loadBinaryCells(weightBytes, blockedBytes)
+
+
+    def _loadBinaryCells(self, weightBytes, blockedBytes):
+        """Takes in the bytes holding the weights (little-endian 32-bit ints) and the bytes holding the blocked
+        bitmap, and fills in the weight and blocked storage from them. This copies every cell; CompactMazeInfo
+        overrides it to use the bytes in place."""
+        weights = array('i')
+        weights.frombytes(weightBytes)
+        if sys.byteorder == 'big':
+            weights.byteswap()
+        self.weightMatrix = self._makeWeightStorage()
+        self.blockedLocs = self._makeBlockedStorage()
+        for r in range(self.numRows):
+            for c in range(self.numCols):
+                index = r * self.numCols + c
+                self.weightMatrix[r, c] = weights[index]
+                if (blockedBytes[index >> 3] >> (index & 7)) & 1:
+                    self.blockedLocs.add( (r, c) )
+
+
     def _readMaze(self, mapFile):
         """Takes in a filename for a grid-map file, and it reads in the qData from the file.
-        It creates a grid representation using a dictionary, where the key is the (row, col) of each
-         grid cell, and the value is the weight at the cell."""
+        It creates a grid representation using the weight storage (a dictionary, for this class), where the key
+        is the (row, col) of each grid cell, and the value is the weight at the cell."""
         try:
             filObj = open(mapFile, 'r')
         except:
             raise FileExistsError("ERROR READING FILE, ABORTING")
         seeking = 'grid size'
-        self.weightMatrix = {}
-        self.blockedLocs = set()
         self.minCost = None
         self.maxCost = None
         row = 0
@@ -359,8 +605,10 @@ class MazeInfo:
                 continue
             elif seeking == 'grid size':   # Haven't seen first line, so it must be grid size
                 [hgt, wid] = [int(s) for s in line.split()]
-                self.numRows = wid
-                self.numCols = hgt
+                self.numRows = hgt
+                self.numCols = wid
+                self.weightMatrix = self._makeWeightStorage()
+                self.blockedLocs = self._makeBlockedStorage()
                 seeking = 'minmax'
             elif seeking == 'minmax':
                 [minc, maxc] = [int(s) for s in line.split()]
@@ -411,3 +659,225 @@ class MazeInfo:
                 else:
                     rowStr += "    "
             print(rowStr)
+
+
+
+# ==========================================================================================
+
+
+class GridWeights(object):
+    """Holds the weights of a grid in one flat array of C ints, one slot per cell in row-major order, and
+    acts like the dictionary that MazeInfo normally uses: it can be indexed with a (row, col) tuple, and it
+    supports the in operator, iteration over the (row, col) of the cells that have a weight, and len.
+    A cell that has not been given a weight holds the unsetValue."""
+
+    unsetValue = -2147483648
+
+    def __init__(self, numRows, numCols, cells = None):
+        """Takes in the size of the grid, and sets up an array with every cell unset. Optionally, it takes in
+        an existing buffer of ints (an array or a memoryview), one per cell, which is used as is, and every cell
+        in it is taken to have a weight."""
+        self.numRows = numRows
+        self.numCols = numCols
+        if cells is None:
+            self.cells = array('i', [self.unsetValue]) * (numRows * numCols)
+            self.count = 0
+        else:
+            self.cells = cells
+            self.count = numRows * numCols
+
+
+    def _index(self, pos):
+        """A private method, takes in a (row, col) and returns its position in the array, or raises
+        a KeyError if it is outside the grid."""
+        (row, col) = pos
+        if row < 0 or col < 0 or row >= self.numRows or col >= self.numCols:
+            raise KeyError(pos)
+        return row * self.numCols + col
+
+
+    def __getitem__(self, pos):
+        """Returns the weight at the given (row, col), raising a KeyError if it has not been set."""
+        value = self.cells[self._index(pos)]
+        if value == self.unsetValue:
+            raise KeyError(pos)
+        return value
+
+
+    def __setitem__(self, pos, value):
+        """Sets the weight at the given (row, col)."""
+        index = self._index(pos)
+        if self.cells[index] == self.unsetValue:
+            self.count = self.count + 1
+        self.cells[index] = value
+
+
+    def __contains__(self, pos):
+        """Returns True if the given (row, col) is in the grid and has a weight, and False otherwise."""
+        (row, col) = pos
+        if row < 0 or col < 0 or row >= self.numRows or col >= self.numCols:
+            return False
+        return self.cells[row * self.numCols + col] != self.unsetValue
+
+
+    def __iter__(self):
+        """Generates the (row, col) of every cell that has a weight, in row-major order."""
+        unset = self.unsetValue
+        for index in range(len(self.cells)):
+            if self.cells[index] != unset:
+                yield divmod(index, self.numCols)
+
+
+    def __len__(self):
+        """Returns the number of cells that have a weight."""
+        return self.count
+
+
+    def get(self, pos, default=None):
+        """Returns the weight at the given (row, col), or the default if it has not been set."""
+        if pos in self:
+            return self[pos]
+        return default
+
+
+
+# ==========================================================================================
+
+
+class GridBitmap(object):
+    """Holds a set of grid cells as a bitmap, one bit per cell in row-major order, and acts like the set
+    that MazeInfo normally uses for blocked cells: it supports add, remove, discard, the in operator,
+    iteration over the (row, col) of the cells in the set, and len."""
+
+    def __init__(self, numRows, numCols, bits = None):
+        """Takes in the size of the grid, and sets up a bitmap with no cells in it. Optionally, it takes
+        in an existing writable buffer of bytes holding the bitmap, which is used as is."""
+        self.numRows = numRows
+        self.numCols = numCols
+        if bits is None:
+            self.bits = bytearray((numRows * numCols + 7) // 8)
+            self.count = 0
+        else:
+            self.bits = bits
+            self.count = bin(int.from_bytes(bits, 'little')).count('1')
+
+
+    def _index(self, pos):
+        """A private method, takes in a (row, col) and returns its bit number, or raises
+        a KeyError if it is outside the grid."""
+        (row, col) = pos
+        if row < 0 or col < 0 or row >= self.numRows or col >= self.numCols:
+            raise KeyError(pos)
+        return row * self.numCols + col
+
+
+    def add(self, pos):
+        """Adds the given (row, col) to the set."""
+        index = self._index(pos)
+        mask = 1 << (index & 7)
+        if not self.bits[index >> 3] & mask:
+            self.bits[index >> 3] |= mask
+            self.count = self.count + 1
+
+
+    def remove(self, pos):
+        """Removes the given (row, col) from the set, raising a KeyError if it is not there."""
+        if pos not in self:
+            raise KeyError(pos)
+        index = self._index(pos)
+        self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        self.count = self.count - 1
+
+
+    def discard(self, pos):
+        """Removes the given (row, col) from the set if it is there."""
+        if pos in self:
+            self.remove(pos)
+
+
+    def __contains__(self, pos):
+        """Returns True if the given (row, col) is in the set, and False otherwise."""
+        (row, col) = pos
+        if row < 0 or col < 0 or row >= self.numRows or col >= self.numCols:
+            return False
+        index = row * self.numCols + col
+        return (self.bits[index >> 3] >> (index & 7)) & 1 == 1
+
+
+    def __iter__(self):
+        """Generates the (row, col) of every cell in the set, in row-major order."""
+        for byteNum in range(len(self.bits)):
+            byte = self.bits[byteNum]
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield divmod(byteNum * 8 + bit, self.numCols)
+
+
+    def __len__(self):
+        """Returns the number of cells in the set."""
+        return self.count
+
+
+
+# ==========================================================================================
+
+
+class CompactMazeInfo(MazeInfo):
+    """A MazeInfo that keeps its weights in a GridWeights array and its blocked cells in a GridBitmap,
+    instead of a dictionary and a set of tuples. That takes about 4 bytes per cell rather than a few hundred,
+    which matters for large mazes. It is made the same way as a MazeInfo, and has the same methods; the
+    lookups that the search does for every neighbor work on the array index directly."""
+
+    def _makeWeightStorage(self):
+        """Creates and returns a GridWeights array for the weights."""
+        return GridWeights(self.numRows, self.numCols)
+
+
+    def _makeBlockedStorage(self):
+        """Creates and returns a GridBitmap for the blocked cells."""
+        return GridBitmap(self.numRows, self.numCols)
+
+
+    def isAccessible(self, row, col):
+        """Given a row and column coordinate, returns True if the given cell is neither
+        blocked nor out of bounds, and False otherwise"""
+        if row < 0 or col < 0 or row >= self.numRows or col >= self.numCols:
+            return False
+        index = row * self.numCols + col
+        return not (self.blockedLocs.bits[index >> 3] >> (index & 7)) & 1
+
+
+    def getWeight(self, row, col):
+        """Given a row and column, look up the terrain value for that position."""
+        if not self.isAccessible(row, col):
+            return -1
+        return self.weightMatrix.cells[row * self.numCols + col]
+
+
+    def _loadBinaryCells(self, weightBytes, blockedBytes):
+        """Takes in the bytes holding the weights and the blocked bitmap, and uses them in place as the
+        storage for this maze, so pages of the file are only read in when they are first touched. If this
+        machine is big-endian, the weights have to be copied and byte-swapped instead."""
+        if sys.byteorder == 'little':
+            weights = weightBytes.cast('i')
+        else:
+            weights = array('i')
+            weights.frombytes(weightBytes)
+            weights.byteswap()
+        self.weightMatrix = GridWeights(self.numRows, self.numCols, weights)
+        self.blockedLocs = GridBitmap(self.numRows, self.numCols, blockedBytes)
+
+
+
+# ==========================================================================================
+
+
+def isBinaryMazeFile(mapFile):
+    """Takes in a filename and returns True if the file starts like a binary maze file, and False if it
+    does not (so it should be a text maze file) or cannot be read."""
+    try:
+        with open(mapFile, 'rb') as filObj:
+            return filObj.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
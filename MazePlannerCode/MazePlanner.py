@@ -9,12 +9,25 @@ GUI for this problem.  This must be run in Python 3!
 from tkinter import *
 import tkinter.filedialog as tkFileDialog
 
-from SearchSolver import BestFirstSearchSolver, NoCostSearchSolver
-from  MazeStateAdvisors import MazeTaskAdvisor, UCSMazeAdvisor, GreedyMazeAdvisor, AStarMazeAdvisor, WeightedAStarMazeAdvisor  # TODO: Add Weighted A* task advisor here
-from MazeInfo import MazeInfo
+from SearchSolver import BestFirstSearchSolver, NoCostSearchSolver, IDAStarSearchSolver, AnytimeRepairingAStarSolver
+from  MazeStateAdvisors import MazeTaskAdvisor, UCSMazeAdvisor, GreedyMazeAdvisor, AStarMazeAdvisor, WeightedAStarMazeAdvisor, JumpPointMazeAdvisor  # TODO: Add Weighted A* task advisor here
+from MazeInfo import MazeInfo, CompactMazeInfo, isBinaryMazeFile
+from SearchTelemetry import SearchTelemetry
+from IncrementalPlanner import LPAStarPlanner
 
 showFringeCosts = False
 
+# Change this to True to record statistics about every step of each search, and to write them
+# to the file named below when the search finishes.
+recordTelemetry = False
+telemetryFile = "searchTelemetry.csv"
+
+# The largest number of states the IDA* search keeps in its transposition table (0 turns the table off)
+idaTableSize = 100000
+
+# The number of seconds the anytime (ARA*) search may keep improving its path, or None for no limit
+araTimeLimit = None
+
 class MazeGUI:
     """Set up and manage all the variables for the GUI interface."""
     
@@ -211,11 +224,23 @@ class MazeGUI:
                                   variable=self.searchType, value="astar", state=NORMAL)
         weightedAstarButton = Radiobutton(searchFrame, text = "Weighted A*",
                                      variable=self.searchType, value="weightedastar", state=NORMAL)
+        jumpPointButton = Radiobutton(searchFrame, text = "Jump Point Search",
+                                      variable=self.searchType, value="jps", state=NORMAL)
+        lpaStarButton = Radiobutton(searchFrame, text = "Incremental (LPA*)",
+                                    variable=self.searchType, value="lpastar", state=NORMAL)
+        idaStarButton = Radiobutton(searchFrame, text = "Iterative Deepening A*",
+                                    variable=self.searchType, value="idastar", state=NORMAL)
+        araStarButton = Radiobutton(searchFrame, text = "Anytime A* (ARA*)",
+                                    variable=self.searchType, value="arastar", state=NORMAL)
         ucButton.grid(row=1, column=1, sticky=W)
         greedyButton.grid(row=2, column=1, sticky=W)
         # dfsButton.grid(row=3, column=1, sticky=W)
         aStarButton.grid(row=4, column=1, sticky=W)
         weightedAstarButton.grid(row=5, column=1, sticky=W)
+        jumpPointButton.grid(row=6, column=1, sticky=W)
+        lpaStarButton.grid(row=7, column=1, sticky=W)
+        idaStarButton.grid(row=8, column=1, sticky=W)
+        araStarButton.grid(row=9, column=1, sticky=W)
 
         resetSearch = Button(searchFrame, text = "Set Up Search", command = self.resetSearch)
 
@@ -234,6 +259,7 @@ class MazeGUI:
         self.currentSearch = None
         self.currentSearcher = None
         self.currentNode = None
+        self.incrementalPlanner = None
     # end _initSearchTools
 
 
@@ -553,10 +579,13 @@ class MazeGUI:
         numRows of the maze, and then that many lines. Each line contains
         words separated by spaces that describe the color for the
         corresponding cell. Thus there are numRows number of words per
-        line."""
+        line. Binary maze files are recognized and opened as a CompactMazeInfo instead."""
         fileName = tkFileDialog.askopenfilename(title = "Select the file to load")
         if fileName != None:
-            self.maze = MazeInfo('file', fileName)
+            if isBinaryMazeFile(fileName):
+                self.maze = CompactMazeInfo('binary', fileName)
+            else:
+                self.maze = MazeInfo('file', fileName)
             self._removeMazeCells()
             self.numRows = self.maze.getNumRows()
             self.numCols = self.maze.getNumCols()
@@ -569,10 +598,14 @@ class MazeGUI:
  
     def saveMaze(self):
         """This pops up a dialog box to save a maze to a file.  Note it won't save a maze with no
-        start or goal.  It asks the MazeInfo object to write itself to this file."""
+        start or goal.  It asks the MazeInfo object to write itself to this file, in the binary format if
+        the filename ends in .bin, and in the text format otherwise."""
         fileName = tkFileDialog.asksaveasfilename(title = "Select the file to which to save the current maze",
                                                   initialfile = "maze.txt")
-        self.maze.writeGridToFile(fileName)
+        if fileName.endswith(".bin"):
+            self.maze.writeGridToBinaryFile(fileName)
+        else:
+            self.maze.writeGridToFile(fileName)
 
 
     # ----------------------------------------------------------------
@@ -610,6 +643,25 @@ class MazeGUI:
             taskAdvisor = WeightedAStarMazeAdvisor(self.maze, sRow, sCol, gRow, gCol)
             self.currentSearcher = BestFirstSearchSolver(taskAdvisor)
             # TODO: Here, create a weighted A* task advisor and set up the search solver (analogous to the A* one)
+        elif self.currentSearch == 'jps':
+            # Jump Point Search falls back to plain A* if the maze weights are not uniform
+            taskAdvisor = JumpPointMazeAdvisor(self.maze, sRow, sCol, gRow, gCol)
+            self.currentSearcher = BestFirstSearchSolver(taskAdvisor)
+        elif self.currentSearch == 'lpastar':
+            # The planner is kept from one search to the next, so it only repairs what the edits changed
+            if self.incrementalPlanner is None or self.incrementalPlanner.maze is not self.maze:
+                if self.incrementalPlanner is not None:
+                    self.incrementalPlanner.stopListening()
+                self.incrementalPlanner = LPAStarPlanner(self.maze)
+            self.currentSearcher = self.incrementalPlanner
+        elif self.currentSearch == 'idastar':
+            taskAdvisor = AStarMazeAdvisor(self.maze, sRow, sCol, gRow, gCol)
+            self.currentSearcher = IDAStarSearchSolver(taskAdvisor, idaTableSize)
+        elif self.currentSearch == 'arastar':
+            taskAdvisor = WeightedAStarMazeAdvisor(self.maze, sRow, sCol, gRow, gCol)
+            self.currentSearcher = AnytimeRepairingAStarSolver(taskAdvisor, timeLimit = araTimeLimit)
+        if recordTelemetry:
+            self.currentSearcher.setTelemetry(SearchTelemetry())
         self.currentSearcher.initSearch()
         self.disableEdit()
         self.enableSearch()
@@ -680,6 +732,8 @@ class MazeGUI:
         printStr += "Nodes created = %d      " % self.currentSearcher.getNodesCreated()
         printStr += "Nodes visited = %d" % self.currentSearcher.getNodesVisited()
         self._postMessage(printStr)
+        if recordTelemetry:
+            self.currentSearcher.telemetry.writeCSV(telemetryFile)
         self.currentSearch = None
         self.currentNode = None        
  
@@ -12,21 +12,25 @@ class MazeState(object):
     """This represents the state of a search in a maze.  It does not
     represent the maze, just the current location in the maze, and the
     series of cells that have been traversed to get to this location.  That
-    is represented in the pathToMe instance variable inherited from the parent
-    class.  The cost is determined externally, by the task advisor.
+    is represented by a reference to the parent state and the move that led from it to this one,
+    so that generating a state does not copy the whole path. The path itself is only rebuilt when
+    getPath is called. The cost is determined externally, by the task advisor.
     NOTE: for many search algorithms, we need to store the state object in a set, and to be able to find equivalent
     states that may have different costs, but fundamentally refer to the same place in the map.
     Thus any state class you create MUST implement the __eq__ and __hash__ methods, which are used by Python's set
     data type. These methods should be based on the information about the location in the map. For this
     state, that means the row and column indices of the grid square this state represents."""
 
-    def __init__(self, row, col, path=None, cost=None):
+    def __init__(self, row, col, path=None, cost=None, parent=None, move=None):
         """Given the row and column location of the current state, and optional path
-        and cost, initializes the state for the search"""
-        if path is None:
+        and cost, initializes the state for the search. Instead of a path, a state may be given
+        its parent state and the move ('N', 'E', 'S', or 'W') that leads from the parent to it."""
+        if path is None and parent is None:
             self.pathToMe = []
         else:
             self.pathToMe = path
+        self.parent = parent
+        self.move = move
         self.myCost = cost
         self.row = row
         self.col = col
@@ -34,10 +38,22 @@ class MazeState(object):
     def setPath(self, newPath):
         """This is a method that Dijkstra's needs."""
         self.pathToMe = newPath
+        self.parent = None
+        self.move = None
 
     def getPath(self):
-        """Access the value of the pathToMe instance variable"""
-        return self.pathToMe
+        """Returns the list of moves that leads to this state. If the state only knows its parent,
+        this walks up the parent references to the nearest state that has an explicit path, and
+        builds a new list from that path and the moves collected along the way."""
+        if self.pathToMe is not None:
+            return self.pathToMe
+        moves = []
+        state = self
+        while state.pathToMe is None:
+            moves.append(state.move)
+            state = state.parent
+        moves.reverse()
+        return state.pathToMe + moves
 
     def getCost(self):
         """Access the value of the myCost instance variable"""
@@ -64,7 +80,7 @@ class MazeState(object):
         """To print this object, print the row and column in brackets, followed by the
         path and cost"""
         strng = "[" + str(self.row) + ", " + str(self.col) + "]"
-        strng += "  " + str(self.pathToMe) + " " + str(self.myCost)
+        strng += "  " + str(self.getPath()) + " " + str(self.myCost)
         return strng
 
 
@@ -128,11 +144,10 @@ class MazeTaskAdvisor(object):
 
     def _buildNeighborState(self, currState, direction, neighRow, neighCol):
         """Given the current state and the location of the neighbor, this builds
-        a new state, computing the cost as appropriate for the class.
+        a new state, computing the cost as appropriate for the class. The new state refers back
+        to currState rather than copying its path.
         This will be overridden by most subclasses!"""
-        newPath = currState.getPath()[:]
-        newPath.append(direction)
-        return MazeState(neighRow, neighCol, newPath)
+        return MazeState(neighRow, neighCol, parent=currState, move=direction)
 
 
 # ==========================================================================================
@@ -152,11 +167,18 @@ class UCSMazeAdvisor(MazeTaskAdvisor):
         """Given the current state and the location of the neighbor, this builds
         a new state, computing the cost as appropriate for the class.
         In this case, the cost is the cost in currState plus the cost in the neighbor."""
-        newPath = currState.getPath()[:]
-        newPath.append(direction)
         oldCost = currState.getCost()
         newCost = self.maze.getWeight(neighRow, neighCol)
-        return MazeState(neighRow, neighCol, newPath, oldCost + newCost)
+        return MazeState(neighRow, neighCol, None, oldCost + newCost, currState, direction)
+
+    def getMaxStepCost(self):
+        """Returns the largest cost one step can add, which is the maximum weight in the maze, so that
+        the search solver can pick a bucket queue for the fringe. Returns None if the weights are not
+        non-negative integers."""
+        maxWeight = self.maze.getMaxWeight()
+        if type(maxWeight) != int or self.maze.getMinWeight() < 0:
+            return None
+        return maxWeight
 
 
 # ==========================================================================================
@@ -177,10 +199,8 @@ class GreedyMazeAdvisor(MazeTaskAdvisor):
         """Given the current state and the location of the neighbor, this builds
         a new state, computing the cost as appropriate for the class.
         In this case, the cost is the distance to the goal."""
-        newPath = currState.getPath()[:]
-        newPath.append(direction)
         distToGoal = self._calcDistToGoal(neighRow, neighCol)
-        return MazeState(neighRow, neighCol, newPath, distToGoal)
+        return MazeState(neighRow, neighCol, None, distToGoal, currState, direction)
 
     def _calcDistToGoal(self, row, col):
         """Compute the distance to the goal using the city block metric.  Compute
@@ -196,14 +216,14 @@ class AStarMazeState(MazeState):
     """This represents the state of a search in a maze.  It does not
 represent the maze, just the current location in the maze, and the
 series of cells that have been traversed to get to this location.  That
-is represented in the pathToMe instance variable inherited from the parent
+is represented by the parent state and move inherited from the parent
 class.  The cost is determined externally."""
 
-    def __init__(self, row, col, path=None, costToHere=None, costToGoal=None):
-        """Given the row and column, the current path, and the two costs (cost so far and heuristic
-        cost to come, this creates a state/node for the search"""
+    def __init__(self, row, col, path=None, costToHere=None, costToGoal=None, parent=None, move=None):
+        """Given the row and column, the current path (or the parent state and move), and the two costs
+        (cost so far and heuristic cost to come, this creates a state/node for the search"""
 
-        MazeState.__init__(self, row, col, path, costToHere + costToGoal)
+        MazeState.__init__(self, row, col, path, costToHere + costToGoal, parent, move)
         self.costToHere = costToHere
         self.costToGoal = costToGoal
         self.myCost = self.costToHere + self.costToGoal
@@ -219,7 +239,7 @@ class.  The cost is determined externally."""
     def __str__(self):
         """Create a string for printing that contains the row, col plus path and costs"""
         strng = "[" + str(self.row) + ", " + str(self.col) + "]"
-        strng += "  " + str(self.pathToMe) + " (" + str(self.costToHere)
+        strng += "  " + str(self.getPath()) + " (" + str(self.costToHere)
         strng += " + " + str(self.costToGoal) + ") = " + str(self.myCost)
         return strng
 
@@ -246,11 +266,9 @@ class AStarMazeAdvisor(MazeTaskAdvisor):
         In this case, we need to update both g and h costs for the new state:
         new g = old g + new cell's weight,
         new h = distance to goal of new cell"""
-        newPath = currState.getPath()[:]
-        newPath.append(direction)
         newG = currState.getCostToHere() + self.maze.getWeight(neighRow, neighCol)
         newH = self._calcDistToGoal(neighRow, neighCol)
-        return AStarMazeState(neighRow, neighCol, newPath, newG, newH)
+        return AStarMazeState(neighRow, neighCol, None, newG, newH, currState, direction)
 
     def _calcDistToGoal(self, row, col):
         """Compute the distance to the goal using the city block metric.  Compute
@@ -268,15 +286,16 @@ class WeightedAStarMazeState(MazeState):
     """This represents the state of a search in a maze.  It does not
 represent the maze, just the current location in the maze, and the
 series of cells that have been traversed to get to this location.  That
-is represented in the pathToMe instance variable inherited from the parent
+is represented by the parent state and move inherited from the parent
 class.  The cost is determined externally."""
 
-    def __init__(self, row, col, path=None, costToHere=None, costToGoal=None, weight=10):
-        """Given the row and column, the current path, and the two costs (cost so far and heuristic
-        cost to come, this creates a state/node for the search"""
+    def __init__(self, row, col, path=None, costToHere=None, costToGoal=None, weight=10, parent=None, move=None):
+        """Given the row and column, the current path (or the parent state and move), and the two costs
+        (cost so far and heuristic cost to come, this creates a state/node for the search"""
 
-        MazeState.__init__(self, row, col, path, costToHere + costToGoal)
+        MazeState.__init__(self, row, col, path, costToHere + costToGoal, parent, move)
         self.costToHere = costToHere
+        self.heuristic = costToGoal
         self.costToGoal = costToGoal * weight
         self.myCost = self.costToHere + self.costToGoal
 
@@ -285,13 +304,17 @@ class.  The cost is determined externally."""
         return self.costToHere
 
     def getCostToGoal(self):
-        """Return the heuristic estimate cost to the goal"""
+        """Return the heuristic estimate cost to the goal, multiplied by the weight"""
         return self.costToGoal
 
+    def getHeuristic(self):
+        """Return the heuristic estimate cost to the goal, before it was multiplied by the weight"""
+        return self.heuristic
+
     def __str__(self):
         """Create a string for printing that contains the row, col plus path and costs"""
         strng = "[" + str(self.row) + ", " + str(self.col) + "]"
-        strng += "  " + str(self.pathToMe) + " (" + str(self.costToHere)
+        strng += "  " + str(self.getPath()) + " (" + str(self.costToHere)
         strng += " + " + str(self.costToGoal) + ") = " + str(self.myCost)
         return strng
 
@@ -302,7 +325,17 @@ class.  The cost is determined externally."""
 class WeightedAStarMazeAdvisor(MazeTaskAdvisor):
     """This class is a subclass of the MazeTaskAdvisor. It implements the cost calculations
     used for A* search, using the AStarState, which maintains both g and h costs. It is intended to
-    be paired with a BestFirstSearchSolver."""
+    be paired with a BestFirstSearchSolver. The heuristic is multiplied by a weight, 10 by default."""
+
+    def __init__(self, mazeMap, startRow, startCol, goalRow, goalCol, weight=10):
+        """Given a map of a maze, the starting and goal locations, and optionally the weight for the
+        heuristic, this initializes the variables that hold details of the problem"""
+        self.weight = weight
+        MazeTaskAdvisor.__init__(self, mazeMap, startRow, startCol, goalRow, goalCol)
+
+    def getHeuristicWeight(self):
+        """Returns the weight the heuristic is multiplied by"""
+        return self.weight
 
     def _setupInitialState(self, startRow, startCol):
         """This creates and returns a proper start state for this particular
@@ -313,7 +346,7 @@ class WeightedAStarMazeAdvisor(MazeTaskAdvisor):
         """
         g = self.maze.getWeight(startRow, startCol)
         h = self._calcDistToGoal(startRow, startCol)
-        return WeightedAStarMazeState(startRow, startCol, [], g, h)
+        return WeightedAStarMazeState(startRow, startCol, [], g, h, self.weight)
 
     def _buildNeighborState(self, currState, direction, neighRow, neighCol):
         """Given the current state and the location of the neighbor, this builds
@@ -321,15 +354,124 @@ class WeightedAStarMazeAdvisor(MazeTaskAdvisor):
         In this case, we need to update both g and h costs for the new state:
         new g = old g + new cell's weight,
         new h = distance to goal of new cell"""
-        newPath = currState.getPath()[:]
-        newPath.append(direction)
         newG = currState.getCostToHere() + self.maze.getWeight(neighRow, neighCol)
         newH = self._calcDistToGoal(neighRow, neighCol)
-        return WeightedAStarMazeState(neighRow, neighCol, newPath, newG, newH)
+        return WeightedAStarMazeState(neighRow, neighCol, None, newG, newH, self.weight, currState, direction)
 
     def _calcDistToGoal(self, row, col):
         """Compute the distance to the goal using the city block metric.  Compute
         the difference in row values and in column values, and add them up"""
         yDist = abs(row - self.goalRow)
         xDist = abs(col - self.goalCol)
-        return xDist + yDist
\ No newline at end of file
+        return xDist + yDist
+
+
+# ==========================================================================================
+
+class JumpPointMazeAdvisor(AStarMazeAdvisor):
+    """This class is a subclass of the AStarMazeAdvisor that implements Jump Point Search for mazes where every
+    open cell has the same weight. On such a grid many paths of the same cost differ only in the order of their
+    moves, and plain A* puts all of them on the fringe. Jump Point Search only follows one "canonical" order:
+    vertical moves may branch east or west at any cell, but horizontal moves keep going straight until a cell
+    where a wall behind them has just ended (a "forced" neighbor) or the goal. Rather than returning the adjacent
+    cells, generateNeighbors "jumps" along each allowed direction and returns only the cells where the search
+    has to make a decision, the jump points. Each jump point state is linked back through the cells it jumped
+    over, so its path uses the usual 'N', 'E', 'S', 'W' moves.
+    If the maze weights are not uniform, this advisor behaves exactly like the AStarMazeAdvisor."""
+
+    moveDeltas = {'N': (-1, 0), 'E': (0, 1), 'S': (1, 0), 'W': (0, -1)}
+
+    def __init__(self, mazeMap, startRow, startCol, goalRow, goalCol):
+        """Given a map of a maze, the starting and goal locations, this initializes the variables
+        that hold details of the problem, and checks whether the maze weights are uniform"""
+        AStarMazeAdvisor.__init__(self, mazeMap, startRow, startCol, goalRow, goalCol)
+        self.uniform = mazeMap.hasUniformWeights()
+
+    def generateNeighbors(self, state):
+        """Given a state, finds the jump point in each direction that the canonical ordering allows from it,
+        and generates a state for each jump point found. If the maze weights are not uniform, this generates
+        the ordinary neighbors instead."""
+        if not self.uniform:
+            return AStarMazeAdvisor.generateNeighbors(self, state)
+        (row, col) = state.getLocation()
+        neighs = []
+        for direction in self._allowedDirections(state):
+            jumpPoint = self._jump(row, col, direction)
+            if jumpPoint is not None:
+                neighs.append(self._buildJumpState(state, direction, jumpPoint))
+        return neighs
+
+    def _allowedDirections(self, state):
+        """Returns the list of directions to search from a state, based on the move that reached it. The start
+        state searches all four directions. After a vertical move, the search goes on vertically and also
+        branches east and west. After a horizontal move, the search goes straight on, and turns north or south
+        only where that neighbor is forced, meaning the cell diagonally behind it is not accessible."""
+        lastMove = state.move
+        if lastMove is None:
+            return ['N', 'E', 'S', 'W']
+        elif lastMove in ['N', 'S']:
+            return [lastMove, 'E', 'W']
+        (row, col) = state.getLocation()
+        (dRow, dCol) = self.moveDeltas[lastMove]
+        directions = [lastMove]
+        if self._isForced(row - 1, col, dCol):
+            directions.append('N')
+        if self._isForced(row + 1, col, dCol):
+            directions.append('S')
+        return directions
+
+    def _isForced(self, row, col, dCol):
+        """Given a cell beside a horizontal move, and the column step of that move, returns True if the
+        cell is accessible but the cell behind it is not"""
+        return self.maze.isAccessible(row, col) and not self.maze.isAccessible(row, col - dCol)
+
+    def _jump(self, row, col, direction):
+        """Moves from (row, col) in the given direction until it reaches a jump point, returning its location,
+        or until it runs into a blocked cell or the edge of the maze, returning None."""
+        (dRow, dCol) = self.moveDeltas[direction]
+        while True:
+            row += dRow
+            col += dCol
+            if not self.maze.isAccessible(row, col):
+                return None
+            if row == self.goalRow and col == self.goalCol:
+                return (row, col)
+            if dCol != 0:
+                if self._isForced(row - 1, col, dCol) or self._isForced(row + 1, col, dCol):
+                    return (row, col)
+            elif self._jump(row, col, 'E') is not None or self._jump(row, col, 'W') is not None:
+                return (row, col)
+
+    def _buildJumpState(self, currState, direction, jumpPoint):
+        """Builds the state for a jump point, by building a state for each cell along the way, so that the
+        costs add up as usual and the path contains one move per cell. Only the last state is returned."""
+        (dRow, dCol) = self.moveDeltas[direction]
+        (row, col) = currState.getLocation()
+        state = currState
+        while (row, col) != jumpPoint:
+            row += dRow
+            col += dCol
+            state = self._buildNeighborState(state, direction, row, col)
+        return state
+
+
+# ==========================================================================================
+
+class DistanceFieldMazeAdvisor(AStarMazeAdvisor):
+    """This class is a subclass of the AStarMazeAdvisor that uses a GoalDistanceField as its heuristic. The
+    field holds the true cost from every cell to the goal, so the heuristic is perfect, and A* goes straight
+    along a best path. The field is passed in rather than built here, so that many searches to the same goal
+    can share one field; it must be computed for the same goal as this advisor."""
+
+    def __init__(self, mazeMap, startRow, startCol, goalRow, goalCol, distanceField):
+        """Given a map of a maze, the starting and goal locations, and a GoalDistanceField for that goal,
+        this initializes the variables that hold details of the problem"""
+        if tuple(distanceField.getGoalPos()) != (goalRow, goalCol):
+            raise ValueError("The distance field must be computed for the same goal as the search")
+        self.distanceField = distanceField
+        AStarMazeAdvisor.__init__(self, mazeMap, startRow, startCol, goalRow, goalCol)
+
+    def _calcDistToGoal(self, row, col):
+        """Look up the true cost to the goal from the distance field. This is infinity for cells
+        that cannot reach the goal."""
+        return self.distanceField.getCostToGo(row, col)
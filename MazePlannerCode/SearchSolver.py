@@ -7,8 +7,9 @@ solvers for a specific problem.
  ==================================================================="""
 
 
-from FoxQueue import Queue, PriorityQueue
+from FoxQueue import Queue, IndexedPriorityQueue, LazyPriorityQueue, BucketPriorityQueue
 from FoxStack import Stack
+import time
 
 # Change this to true to see information about the search as it goes.
 verbose = False
@@ -23,7 +24,7 @@ class BestFirstSearchSolver(object):
     should be overridden by the subclass.
     These algorithms assume that the qData stored in the states implement the equality operators properly!"""
     
-    def __init__(self, taskAdvisor):
+    def __init__(self, taskAdvisor, fringeType = "auto"):
         """Creates a Best-First search solver, with the given task advisor. This takes in a "task advisor" and
         sets up the qData needed for the search, the fringe and visited sets, and the counts of
         how many nodes were created and visited.
@@ -31,18 +32,31 @@ class BestFirstSearchSolver(object):
         nodes visited (that corresponds more or less to the number of nodes added to the queue and the number of nodes
         removed from the queue (and not found to be redundant)).  In addition, there are instance variables for the
         search queues for both BFS and PQSearch, so that we can step through the algorithms rather than just running
-        them all at once"""
+        them all at once.
+        The optional fringeType selects the priority queue used for the fringe: "indexed" uses an
+        IndexedPriorityQueue, "heapq" uses a LazyPriorityQueue built on the heapq module, and "bucket" uses a
+        BucketPriorityQueue, which needs the task advisor to have a getMaxStepCost method. The default, "auto",
+        picks the bucket queue when the task advisor reports a bound on its integer step costs, and the indexed
+        queue otherwise."""
+        if fringeType not in {"auto", "indexed", "heapq", "bucket"}:
+            raise ValueError("fringeType must be one of 'auto', 'indexed', 'heapq', or 'bucket'")
         self.taskAdvisor = taskAdvisor
         self.nodesCreated = 0
         self.nodesVisited = 0
         self.fringe = None
         self.visited = None
+        self.fringeType = fringeType
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
 
     def _initializeCounts(self):
         """A private helper to initialize the counts, since they need to be initialized anew each time the
         search algorithms are called"""
         self.nodesCreated = 0
         self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
 
     def getNodesCreated(self):
         """Returns the value of self.nodesCreated"""
@@ -52,6 +66,19 @@ class BestFirstSearchSolver(object):
         """Returns the value of self.nodesVisited"""
         return self.nodesVisited
 
+    def getReopenCount(self):
+        """Returns the number of times a visited state was put back on the fringe with a lower cost"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times a fringe state was replaced by one with a lower cost"""
+        return self.decreaseKeyCount
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
 
     def initSearch(self):
         """This method sets up a priority-queue-based search process, initializing the fringe queue, the set of
@@ -60,18 +87,41 @@ class BestFirstSearchSolver(object):
         startState = self.taskAdvisor.getStartState()
         if self.taskAdvisor.isGoal(startState):
             return startState.getPath()
-        self.visited = set()
-        self.fringe = PriorityQueue()
-        self.fringe.insert(startState, startState.getCost())
+        self.visited = {}
+        self._setupFringe(startState)
         self.nodesCreated += 1
 
+    def _setupFringe(self, startState):
+        """This method sets up the proper kind of fringe set for this particular search.
+        In this case, it creates the priority queue selected by self.fringeType, and it inserts
+        the start state into it."""
+        maxStep = self._getMaxStepCost()
+        if self.fringeType == "heapq":
+            self.fringe = LazyPriorityQueue()
+        elif self.fringeType == "bucket" or (self.fringeType == "auto" and maxStep is not None):
+            if maxStep is None:
+                raise ValueError("The bucket fringe needs a task advisor that reports its maximum step cost")
+            self.fringe = BucketPriorityQueue(maxStep)
+        else:
+            self.fringe = IndexedPriorityQueue()
+        self.fringe.insert(startState, startState.getCost())
+
+
+    def _getMaxStepCost(self):
+        """Asks the task advisor for the largest cost of a single step, if it has a getMaxStepCost method.
+        Advisors only report it when every cost is a non-negative integer that never decreases along a path,
+        which is what the bucket queue needs. Returns None otherwise."""
+        if hasattr(self.taskAdvisor, "getMaxStepCost"):
+            return self.taskAdvisor.getMaxStepCost()
+        return None
+
 
     def searchLoop(self):
         """This method runs the search, repeatedly calling for the next step until either
         the search fails and False is returned, or the search completes"""
         while True:
             (nextState, neighbors, isDone) = self.searchStep()
-            if nextState == "Fail":
+            if isDone == "Fail":
                 return False
             elif isDone == "Done":
                 # is search is done then nextState actually holds the result
@@ -83,7 +133,17 @@ class BestFirstSearchSolver(object):
         """This method performs one step of a priority-queue search. It finds the next node in
         the priority queue, generates its children, and adds the appropriate ones to the priority queue
         It returns three values: the current state, the neighbors of the current state, and a status 
-        message.  The message is either "Done", "Fail", or "Not Done" for a normal step."""
+        message.  The message is either "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
         newNeighbors = []
         if self.fringe.isEmpty():
             return (False, False, "Fail")
@@ -96,7 +156,7 @@ class BestFirstSearchSolver(object):
             print("----------------------")
             print("Current state:", nextState)
         neighbors = self.taskAdvisor.generateNeighbors(nextState)
-        self.visited.add(nextState)
+        self.visited[nextState] = nextState
         self.nodesVisited += 1
 
         for n in neighbors:
@@ -115,10 +175,11 @@ class BestFirstSearchSolver(object):
                 if verbose:
                     print("    Neighbor was already in explored, cost is lower now", n, visitedMatch.getCost(), n.getCost())
                 self.fringe.insert(n, n.getCost())
-                self.visited.discard(visitedMatch)
-                self.visited.add(n)
+                del self.visited[visitedMatch]
+                self.visited[n] = n
                 newNeighbors.append(n)
                 self.nodesCreated += 1
+                self.reopenCount += 1
             elif fringeMatch and fringeMatch.getCost() > n.getCost():
                 # if state is in fringe but this one is better, add this one to fringe AND
                 if verbose:
@@ -129,6 +190,7 @@ class BestFirstSearchSolver(object):
                 self.fringe.insert(n, n.getCost())
                 newNeighbors.append(n)
                 self.nodesCreated += 1
+                self.decreaseKeyCount += 1
             elif visitedMatch:
                 if verbose:
                     print("    Neighbor was already in explored, skipping", n)
@@ -140,18 +202,16 @@ class BestFirstSearchSolver(object):
         return nextState, newNeighbors, "Not Done"
 
     def _hasBeenVisited(self, state):
-        """Given a state, it looks through the visited set and seeks a node
-        that is "equal" to the input state. It is up to the subclass to
-        define what it means for them to be equal. It returns the matching
+        """Given a state, it looks up the visited table and finds the node
+        that is "equal" to the input state. The table is a dictionary that maps each
+        state to the best state found so far for that location, so the lookup uses the
+        __hash__ and __eq__ methods of the state class. It returns the matching
         state, if any, or False if none"""
-        for s in self.visited:
-            if s == state:
-                return s
-        return False
+        return self.visited.get(state, False)
 
     def _hasBeenFringed(self, state):
-        """Given a state, it looks through the fringe set and seeks a node that is "equal" to the
-        input state.  It is up to the objects to define what it means for them to be equal.  It
+        """Given a state, it asks the fringe for a node that is "equal" to the input state. The
+        fringe is an indexed or lazy priority queue, so this is a dictionary lookup rather than a scan. It
         returns the matching state, if any, or False if none"""
         foundInfo = self.fringe.contains(state)
         if foundInfo:
@@ -190,12 +250,17 @@ class NoCostSearchSolver(object):
         self.fringe = None
         self.visited = None
         self.mode = mode
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
 
     def _initializeCounts(self):
         """A private helper to initialize the counts, since they need to be initialized anew each time the
         search algorithms are called"""
         self.nodesCreated = 0
         self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
 
     def getNodesCreated(self):
         """Returns the value of self.nodesCreated"""
@@ -205,6 +270,19 @@ class NoCostSearchSolver(object):
         """Returns the value of self.nodesVisited"""
         return self.nodesVisited
 
+    def getReopenCount(self):
+        """Returns the number of times a visited state was put back on the fringe with a lower cost"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times a fringe state was replaced by one with a lower cost"""
+        return self.decreaseKeyCount
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
     def initSearch(self):
         """This method sets up a priority-queue-based search process, initializing the fringe queue, the set of
         visited states, and adding the start state to the fringe queue."""
@@ -212,7 +290,7 @@ class NoCostSearchSolver(object):
         startState = self.taskAdvisor.getStartState()
         if self.taskAdvisor.isGoal(startState):
             return startState.getPath()
-        self.visited = set()
+        self.visited = {}
         if self.mode == "BFS":
             self.fringe = Queue()
         else:
@@ -235,7 +313,7 @@ class NoCostSearchSolver(object):
         the search fails and False is returned, or the search completes"""
         while True:
             (nextState, neighbors, isDone) = self.searchStep()
-            if nextState == "Fail":
+            if isDone == "Fail":
                 return False
             elif isDone == "Done":
                 # is search is done then nextState actually holds the result
@@ -247,7 +325,17 @@ class NoCostSearchSolver(object):
         """This method performs one step of a stack or queue search. It finds the next node in
         the stack/queue, generates its children, and adds the appropriate ones to the stack/queue.
         It returns three values: the current state, the neighbors of the current state, and a status
-        message.  The message is either "Done", "Fail", or "Not Done" for a normal step."""
+        message.  The message is either "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
         newNeighbors = []
         if self.fringe.isEmpty():
             return (False, False, "Fail")
@@ -260,7 +348,7 @@ class NoCostSearchSolver(object):
             print("----------------------")
             print("Current state:", nextState)
         neighbors = self.taskAdvisor.generateNeighbors(nextState)
-        self.visited.add(nextState)
+        self.visited[nextState] = nextState
         self.nodesVisited += 1
 
         for n in neighbors:
@@ -285,14 +373,11 @@ class NoCostSearchSolver(object):
         return nextState, newNeighbors, "Not Done"
 
     def _hasBeenVisited(self, state):
-        """Given a state, it looks through the visited set and seeks a node
+        """Given a state, it looks up the visited table and finds the node
         that is "equal" to the input state. It is up to the state class to
-        define what it means for them to be equal. It returns the matching
-        state, if any, or False if none"""
-        for s in self.visited:
-            if s == state:
-                return s
-        return False
+        define what it means for them to be equal, and to hash equal states the same way.
+        It returns the matching state, if any, or False if none"""
+        return self.visited.get(state, False)
 
     def _hasBeenFringed(self, state):
         """Given a state, it looks through the fringe set and seeks a node that is "equal" to the
@@ -305,3 +390,410 @@ class NoCostSearchSolver(object):
             return False
 
 
+
+
+
+class IDAStarSearchSolver(object):
+    """This class contains an iterative-deepening A* (IDA*) search. Instead of keeping a fringe and a visited
+    set, it runs a depth-first search that is cut off wherever a state's cost (f = g + h, for the A* states)
+    goes over a threshold. If that finds no goal, the threshold is raised to the smallest cost that was cut off,
+    and the depth-first search starts over. It only keeps the current path and the unexplored neighbors of the
+    states on it, so its memory grows with the depth of the search rather than the number of states. With an
+    admissible heuristic, the first goal found is a best one.
+    The depth-first search may reach the same state along many different paths. An optional transposition table
+    remembers, during each iteration, the cheapest cost-so-far with which each state was expanded, and skips a
+    state reached again without a cheaper cost. The table holds at most tableSize states, so memory stays
+    bounded; once it is full, new states are no longer added to it. A tableSize of 0 turns the table off.
+    Like the other solvers, it works with a task advisor, and it can be stepped through with searchStep."""
+
+    def __init__(self, taskAdvisor, tableSize = 0):
+        """Takes in the task advisor, and an optional maximum size for the transposition table
+        (0, the default, means no table). Sets up the counts of how many nodes were created and visited."""
+        if tableSize < 0:
+            raise ValueError("tableSize must not be negative")
+        self.taskAdvisor = taskAdvisor
+        self.tableSize = tableSize
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.fringe = None
+        self.visited = None
+        self.stack = None
+        self.table = None
+        self.startState = None
+        self.threshold = None
+        self.nextThreshold = None
+        self.startPending = False
+        self.iterations = 0
+        self.telemetry = None
+
+    def _initializeCounts(self):
+        """A private helper to initialize the counts, since they need to be initialized anew each time the
+        search algorithms are called"""
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.iterations = 0
+
+    def getNodesCreated(self):
+        """Returns the value of self.nodesCreated"""
+        return self.nodesCreated
+
+    def getNodesVisited(self):
+        """Returns the value of self.nodesVisited"""
+        return self.nodesVisited
+
+    def getReopenCount(self):
+        """Returns the number of states expanded after the first iteration, most of which repeat the work
+        of earlier iterations"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """IDA* has no fringe, so this is always 0; it is here so telemetry works with every solver"""
+        return self.decreaseKeyCount
+
+    def getIterations(self):
+        """Returns the number of depth-first iterations started so far"""
+        return self.iterations
+
+    def getThreshold(self):
+        """Returns the cost threshold of the current iteration"""
+        return self.threshold
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
+
+    def initSearch(self):
+        """This method sets up the search, starting the first iteration with the cost of the start state as
+        its threshold."""
+        self._initializeCounts()
+        self.startState = self.taskAdvisor.getStartState()
+        self.threshold = self.startState.getCost()
+        self.nodesCreated += 1
+        self._startIteration()
+
+    def _startIteration(self):
+        """A private helper that starts a new depth-first iteration from the start state with the current
+        threshold. The stack holds one entry for each state on the current path: a list of the state, its
+        neighbors, and the index of the next neighbor to try."""
+        self.iterations += 1
+        self.nextThreshold = float('inf')
+        self.stack = []
+        self.visited = {}    # the states on the current path
+        self.table = {}
+        self.startPending = True
+
+
+    def searchLoop(self):
+        """This method runs the search, repeatedly calling for the next step until either
+        the search fails and False is returned, or the search completes"""
+        while True:
+            (nextState, neighbors, isDone) = self.searchStep()
+            if isDone == "Fail":
+                return False
+            elif isDone == "Done":
+                return nextState
+
+
+    def searchStep(self):
+        """This method performs one step of the search: it finds the next state the depth-first search should
+        expand, skipping over states that are over the threshold (and starting a new iteration when this one
+        runs out), and generates its neighbors. It returns three values: the current state, its neighbors, and
+        a status message, "Done", "Fail", or "Not Done" for a normal step.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
+        while True:
+            nextState = self._nextCandidate()
+            if nextState is None:
+                # this iteration is over, so raise the threshold and start again
+                if self.nextThreshold == float('inf'):
+                    return (False, False, "Fail")
+                self.threshold = self.nextThreshold
+                self._startIteration()
+                continue
+            if nextState.getCost() > self.threshold:
+                self.nextThreshold = min(self.nextThreshold, nextState.getCost())
+                continue
+            if self.taskAdvisor.isGoal(nextState):
+                return (nextState, [], "Done")
+            if self._inTable(nextState):
+                continue
+
+            if verbose:
+                print("----------------------")
+                print("Current state:", nextState, "threshold:", self.threshold)
+            neighbors = []
+            for n in self.taskAdvisor.generateNeighbors(nextState):
+                if n not in self.visited:
+                    neighbors.append(n)
+            self.nodesVisited += 1
+            self.nodesCreated += len(neighbors)
+            if self.iterations > 1:
+                self.reopenCount += 1
+            self.stack.append([nextState, neighbors, 0])
+            self.visited[nextState] = nextState
+            return (nextState, neighbors, "Not Done")
+
+    def _nextCandidate(self):
+        """A private helper that returns the next state for the depth-first search to consider: the start
+        state at the beginning of an iteration, and after that the next untried neighbor of the deepest state
+        on the path, backing up as states run out of neighbors. Returns None when the iteration is over."""
+        if self.startPending:
+            self.startPending = False
+            return self.startState
+        while self.stack:
+            frame = self.stack[-1]
+            (state, neighbors, index) = frame
+            if index < len(neighbors):
+                frame[2] = index + 1
+                return neighbors[index]
+            self.stack.pop()
+            del self.visited[state]
+        return None
+
+    def _inTable(self, state):
+        """A private helper that checks the transposition table. If the state was already expanded in this
+        iteration with a cost-so-far no larger than this one's, it returns True, so the state can be skipped.
+        Otherwise it records this state's cost-so-far, if there is room, and returns False."""
+        if self.tableSize == 0:
+            return False
+        if hasattr(state, "getCostToHere"):
+            costToHere = state.getCostToHere()
+        else:
+            costToHere = state.getCost()
+        oldCost = self.table.get(state)
+        if oldCost is not None and oldCost <= costToHere:
+            return True
+        if oldCost is not None or len(self.table) < self.tableSize:
+            self.table[state] = costToHere
+        return False
+
+
+
+class AnytimeRepairingAStarSolver(object):
+    """This class contains Anytime Repairing A* (ARA*). It starts like weighted A*, with the heuristic multiplied
+    by a large epsilon, which finds a path quickly, though maybe not the best one. It then lowers epsilon step by
+    step, down to 1, and searches again each time, publishing a better path whenever one is found. Each new search
+    reuses the costs found by the earlier ones: states whose cost improved after they were expanded are kept on an
+    INCONS list, and only those and the states left on the fringe start the next search.
+    At any time, getBestState returns the best path found so far (as a goal state), and getBound returns a bound
+    on how far from the best possible cost it can be: its cost is at most getBound() times the best cost. The
+    search ends when that bound reaches 1, meaning the path is a best one, or when the time limit has passed.
+    It always keeps going until it finds a first path, though.
+    It works with a task advisor like WeightedAStarMazeAdvisor, whose states provide getCostToHere and getHeuristic
+    (the heuristic before any weight is applied). The starting epsilon defaults to the advisor's heuristic weight."""
+
+    def __init__(self, taskAdvisor, startEpsilon = None, epsilonStep = 0.5, timeLimit = None):
+        """Takes in the task advisor, the starting epsilon (by default, the advisor's heuristic weight), how much
+        to lower epsilon each time, and an optional time limit in seconds, counted from initSearch."""
+        if startEpsilon is None:
+            startEpsilon = taskAdvisor.getHeuristicWeight()
+        if startEpsilon < 1 or epsilonStep <= 0:
+            raise ValueError("startEpsilon must be at least 1, and epsilonStep must be positive")
+        self.taskAdvisor = taskAdvisor
+        self.startEpsilon = startEpsilon
+        self.epsilonStep = epsilonStep
+        self.timeLimit = timeLimit
+        self.deadline = None
+        self.epsilon = None
+        self.bound = None
+        self.bestState = None
+        self.goalState = None
+        self.fringe = None
+        self.visited = None
+        self.closed = None
+        self.incons = None
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+        self.telemetry = None
+
+    def _initializeCounts(self):
+        """A private helper to initialize the counts, since they need to be initialized anew each time the
+        search algorithms are called"""
+        self.nodesCreated = 0
+        self.nodesVisited = 0
+        self.reopenCount = 0
+        self.decreaseKeyCount = 0
+
+    def getNodesCreated(self):
+        """Returns the value of self.nodesCreated"""
+        return self.nodesCreated
+
+    def getNodesVisited(self):
+        """Returns the value of self.nodesVisited"""
+        return self.nodesVisited
+
+    def getReopenCount(self):
+        """Returns the number of times a state whose cost improved after it was expanded was put on INCONS"""
+        return self.reopenCount
+
+    def getDecreaseKeyCount(self):
+        """Returns the number of times a fringe state was replaced by one with a lower cost"""
+        return self.decreaseKeyCount
+
+    def getEpsilon(self):
+        """Returns the epsilon of the current search"""
+        return self.epsilon
+
+    def getBound(self):
+        """Returns the suboptimality bound of the best path found so far: its cost is at most this many times
+        the best possible cost. Returns None if no path has been found yet."""
+        return self.bound
+
+    def getBestState(self):
+        """Returns the goal state for the best path found so far, or None if no path has been found yet"""
+        return self.bestState
+
+    def getBestPath(self):
+        """Returns the best path found so far, or None if no path has been found yet"""
+        if self.bestState is None:
+            return None
+        return self.bestState.getPath()
+
+    def setTelemetry(self, telemetry):
+        """Takes in a SearchTelemetry object (or None to turn recording off). When one is set, every
+        step of the search is timed and recorded in it."""
+        self.telemetry = telemetry
+
+
+    def initSearch(self):
+        """This method sets up the search: the table of best states (self.visited), the fringe with the start
+        state on it, and the first epsilon, and starts the clock for the time limit."""
+        self._initializeCounts()
+        if self.timeLimit is None:
+            self.deadline = None
+        else:
+            self.deadline = time.perf_counter() + self.timeLimit
+        self.epsilon = self.startEpsilon
+        self.bound = None
+        self.bestState = None
+        self.goalState = None
+        startState = self.taskAdvisor.getStartState()
+        if self.taskAdvisor.isGoal(startState):
+            self.goalState = startState
+        self.visited = {startState: startState}
+        self.closed = set()
+        self.incons = {}
+        self.fringe = IndexedPriorityQueue()
+        self.fringe.insert(startState, self._priority(startState))
+        self.nodesCreated += 1
+
+
+    def searchLoop(self):
+        """This method runs the search, repeatedly calling for the next step until either the search fails
+        and False is returned, or it finishes and the goal state for the best path found is returned"""
+        while True:
+            (nextState, neighbors, isDone) = self.searchStep()
+            if isDone == "Fail":
+                return False
+            elif isDone == "Done":
+                return nextState
+
+
+    def searchStep(self):
+        """This method performs one step of the search: it expands the state at the front of the fringe,
+        unless the current search is finished. When the current search finishes, it publishes its path, and
+        either starts the next search with a smaller epsilon, returning the goal state and "Not Done", or
+        returns the goal state of the best path and "Done". It returns "Fail" if there is no path at all.
+        If a telemetry object has been set, the step is timed and recorded in it."""
+        if self.telemetry is None:
+            return self._searchStep()
+        startTime = time.perf_counter()
+        result = self._searchStep()
+        self.telemetry.recordStep(self, result[2], time.perf_counter() - startTime)
+        return result
+
+    def _searchStep(self):
+        """A private helper that does the work of one step of the search, see searchStep."""
+        if self._searchFinished():
+            if self.goalState is None:
+                return (False, False, "Fail")
+            self._publishSolution()
+            if self.bound <= 1 or self._pastDeadline():
+                return (self.bestState, [], "Done")
+            self._startNextSearch()
+            return (self.bestState, [], "Not Done")
+
+        nextState, priority = self.fringe.delete()
+        self.closed.add(nextState)
+        self.nodesVisited += 1
+        newNeighbors = []
+        for n in self.taskAdvisor.generateNeighbors(nextState):
+            oldState = self.visited.get(n)
+            if oldState is not None and oldState.getCostToHere() <= n.getCostToHere():
+                continue
+            self.visited[n] = n
+            self.nodesCreated += 1
+            if self.taskAdvisor.isGoal(n):
+                self.goalState = n
+            if n in self.closed:
+                # already expanded in this search, so it waits for the next one
+                self.incons[n] = n
+                self.reopenCount += 1
+            else:
+                if oldState is not None and self.fringe.contains(n) is not False:
+                    self.decreaseKeyCount += 1
+                self.fringe.insert(n, self._priority(n))
+                newNeighbors.append(n)
+        return (nextState, newNeighbors, "Not Done")
+
+    def _searchFinished(self):
+        """A private helper, returns True if the current search can stop: the fringe is empty, or the goal
+        has been reached and no state on the fringe has a smaller priority."""
+        if self.fringe.isEmpty():
+            return True
+        if self.goalState is None:
+            return False
+        return self.goalState.getCostToHere() <= self.fringe.firstElement()[1]
+
+    def _publishSolution(self):
+        """A private helper, records the goal state found by the search that just finished, and computes its
+        bound: the smaller of epsilon and the goal's cost divided by the smallest g + h on the fringe or INCONS,
+        which is no more than the best possible cost."""
+        self.bestState = self.goalState
+        lowest = float('inf')
+        for (state, priority) in self.fringe.qData:
+            lowest = min(lowest, state.getCostToHere() + state.getHeuristic())
+        # The values, not the keys: assigning to an equal key keeps the old key object, with its old cost
+        for state in self.incons.values():
+            lowest = min(lowest, state.getCostToHere() + state.getHeuristic())
+        if lowest == float('inf'):
+            self.bound = 1
+        else:
+            self.bound = max(1, min(self.epsilon, self.goalState.getCostToHere() / lowest))
+
+    def _startNextSearch(self):
+        """A private helper, lowers epsilon, moves the INCONS states onto the fringe, recomputes every
+        fringe priority for the new epsilon, and clears the set of expanded states."""
+        self.epsilon = max(1, self.epsilon - self.epsilonStep)
+        oldFringe = self.fringe
+        self.fringe = IndexedPriorityQueue()
+        for (state, priority) in oldFringe.qData:
+            self.fringe.insert(state, self._priority(state))
+        for state in self.incons.values():
+            self.fringe.insert(state, self._priority(state))
+        self.incons = {}
+        self.closed = set()
+
+    def _priority(self, state):
+        """A private helper, computes the priority of a state for the current epsilon: g + epsilon * h"""
+        return state.getCostToHere() + self.epsilon * state.getHeuristic()
+
+    def _pastDeadline(self):
+        """A private helper, returns True if there is a time limit and it has passed"""
+        return self.deadline is not None and time.perf_counter() >= self.deadline
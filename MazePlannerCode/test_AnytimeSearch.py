@@ -0,0 +1,52 @@
+"""  =================================================================
+File: test_AnytimeSearch.py
+
+Regression checks for the AnytimeRepairingAStarSolver: once epsilon has come
+down to 1, the path it returns must cost the same as the one UCS finds.
+Run with:  python -m unittest test_AnytimeSearch   (from this folder)
+ ==================================================================="""
+
+import unittest
+
+from MazeInfo import CompactMazeInfo
+from MazeStateAdvisors import UCSMazeAdvisor, WeightedAStarMazeAdvisor
+from SearchSolver import BestFirstSearchSolver, AnytimeRepairingAStarSolver
+
+
+def runSolver(solver):
+    """Runs a search to the end and returns the solver and the state it returned"""
+    solver.initSearch()
+    return (solver, solver.searchLoop())
+
+
+class AnytimeRepairingAStarTest(unittest.TestCase):
+
+    def testMatchesUCSAtEpsilonOne(self):
+        """On seeded hilly mazes, ARA* with no time limit ends at bound 1 with the UCS cost. Several of these
+        seeds used to come out a step or two too expensive, when a state improved while it sat in INCONS."""
+        for seed in [0, 8, 26, 39, 43, 57]:
+            for size in [15, 20]:
+                maze = CompactMazeInfo('gen-hilly', size, size, seed=seed)
+                for (start, goal) in [((0, 6), (12, 0)), ((0, 0), (size - 1, size - 1))]:
+                    if not (maze.isAccessible(*start) and maze.isAccessible(*goal)):
+                        continue
+                    (ucs, ucsGoal) = runSolver(BestFirstSearchSolver(UCSMazeAdvisor(maze, *start, *goal)))
+                    advisor = WeightedAStarMazeAdvisor(maze, *start, *goal, weight=5)
+                    (ara, araGoal) = runSolver(AnytimeRepairingAStarSolver(advisor))
+                    if ucsGoal is False:
+                        self.assertIs(araGoal, False)
+                        continue
+                    self.assertEqual(ara.getBound(), 1)
+                    self.assertEqual(araGoal.getCostToHere(), ucsGoal.getCost(), (seed, size, start, goal))
+
+    def testStartIsGoal(self):
+        """When the start is the goal, the search is done at once with the start state"""
+        maze = CompactMazeInfo('gen-hilly', 10, 10, seed=1)
+        (ara, araGoal) = runSolver(AnytimeRepairingAStarSolver(WeightedAStarMazeAdvisor(maze, 2, 2, 2, 2, weight=5)))
+        self.assertIsNot(araGoal, False)
+        self.assertEqual(araGoal.getPath(), [])
+        self.assertEqual(araGoal.getCostToHere(), maze.getWeight(2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
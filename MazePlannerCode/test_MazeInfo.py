@@ -0,0 +1,44 @@
+"""  =================================================================
+File: test_MazeInfo.py
+
+Regression checks for saving and loading binary maze files.
+Run with:  python -m unittest test_MazeInfo   (from this folder)
+ ==================================================================="""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from MazeInfo import CompactMazeInfo
+
+
+class BinaryMazeFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+    def testSaveOverOwnSource(self):
+        """A maze read from a binary file can be saved back to that same file. Its cells are read from a
+        mapping of the file, so this used to crash while the file was being rewritten."""
+        mazeFile = os.path.join(self.folder, "maze.bin")
+        original = CompactMazeInfo('gen-hilly', 20, 25, percBlocked=0.2, seed=4)
+        original.writeGridToBinaryFile(mazeFile)
+        loaded = CompactMazeInfo('binary', mazeFile)
+        loaded.writeGridToBinaryFile(mazeFile)
+        reloaded = CompactMazeInfo('binary', mazeFile)
+        self.assertEqual((reloaded.numRows, reloaded.numCols), (20, 25))
+        self.assertEqual((reloaded.startPos, reloaded.goalPos), (original.startPos, original.goalPos))
+        for r in range(20):
+            for c in range(25):
+                self.assertEqual(reloaded.isBlocked(r, c), original.isBlocked(r, c), (r, c))
+                self.assertEqual(reloaded.getWeight(r, c), original.getWeight(r, c), (r, c))
+        self.assertEqual(os.listdir(self.folder), ["maze.bin"])
+
+
+if __name__ == '__main__':
+    unittest.main()